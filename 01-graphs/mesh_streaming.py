@@ -0,0 +1,251 @@
+"""
+Mesh Streaming - generating meshes larger than RAM as sharded edge files.
+
+A billion-link mesh cannot exist as an nx.Graph (or even as one set of NumPy
+arrays on most machines). This module runs the same recipe as
+mesh_generators.generate_mesh_edges() - random spanning tree plus random
+extra links - as a stream of fixed-size chunks:
+
+1. Chunks of edges are generated one at a time (each chunk has its own
+   RNG stream derived from the seed, so output is reproducible) and appended
+   to spool files, partitioned by a hash of each link's endpoints (so
+   duplicates meet in the same shard and every shard gets an even share).
+2. Each partition is deduplicated on its own and written as a shard
+   (a .npy record array), together with a manifest.json.
+
+Memory use depends on chunk_size and shard_links, never on the graph size.
+
+The shards can then be streamed back in chunks (memory-mapped) into
+CustomNetworkBuilder.add_links_from_arrays() or the Packet Tracer exporter.
+
+Example:
+    manifest = write_mesh_shards("/data/mesh-1b", num_nodes=250_000_000, target_degree=8)
+    for chunk in read_mesh_shards("/data/mesh-1b"):
+        print(chunk['src'][:5], chunk['latency'][:5])
+"""
+
+import json
+import os
+import sys
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from mesh_generators import LATENCY_RANGE
+
+EDGE_DTYPE = np.dtype([('src', '<i8'), ('dst', '<i8'), ('latency', '<i4')])
+MANIFEST = "manifest.json"
+BLOCK = 1 << 16  # records per RNG stream
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)  # Fibonacci hashing multiplier
+
+
+class NodeNames:
+    """Lazy "Node0", "Node1", ... sequence (no per-node memory)."""
+
+    def __init__(self, num_nodes: int, prefix: str = "Node"):
+        self.num_nodes = num_nodes
+        self.prefix = prefix
+
+    def __len__(self) -> int:
+        return self.num_nodes
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < self.num_nodes:
+            raise IndexError(i)
+        return f"{self.prefix}{i}"
+
+
+def stream_mesh_edges(num_nodes: int, target_degree: int = 3, seed: int = 42,
+                      chunk_size: int = 1_000_000,
+                      latency_range=LATENCY_RANGE) -> Iterator[np.ndarray]:
+    """
+    Yield the edges of a random mesh as EDGE_DTYPE record arrays.
+
+    Spanning-tree links come first, then extra links (src < dst in every
+    record). Extra links are not deduplicated here - write_mesh_shards()
+    does that - so a few may repeat (about links^2 / num_nodes^2 of them).
+
+    Args:
+        num_nodes: Number of routers
+        target_degree: Desired average connections per node
+        seed: Integer seed
+        chunk_size: Records per chunk
+        latency_range: Inclusive (min, max) link latency in ms
+    """
+    if num_nodes < 2:
+        return
+    low, high = latency_range
+    extra = max(0, (num_nodes * target_degree) // 2 - (num_nodes - 1))
+    extra = min(extra, num_nodes * (num_nodes - 1) // 2 - (num_nodes - 1))
+
+    def tree_block(index: int, rng: np.random.Generator) -> np.ndarray:
+        # Child i links to a uniform random node in [0, i)
+        start = 1 + index * BLOCK
+        children = np.arange(start, min(start + BLOCK, num_nodes), dtype=np.int64)
+        block = np.empty(len(children), dtype=EDGE_DTYPE)
+        block['src'] = (rng.random(len(children)) * children).astype(np.int64)
+        block['dst'] = children
+        block['latency'] = rng.integers(low, high + 1, size=len(children))
+        return block
+
+    def extra_block(index: int, rng: np.random.Generator) -> np.ndarray:
+        # Uniform random pairs, self-loops redrawn
+        size = min(BLOCK, extra - index * BLOCK)
+        a = rng.integers(0, num_nodes, size=size, dtype=np.int64)
+        b = rng.integers(0, num_nodes, size=size, dtype=np.int64)
+        loops = a == b
+        while loops.any():
+            b[loops] = rng.integers(0, num_nodes, size=int(loops.sum()), dtype=np.int64)
+            loops = a == b
+        block = np.empty(size, dtype=EDGE_DTYPE)
+        block['src'] = np.minimum(a, b)
+        block['dst'] = np.maximum(a, b)
+        block['latency'] = rng.integers(low, high + 1, size=size)
+        return block
+
+    # Each fixed-size block has its own RNG stream, so the output does not
+    # depend on chunk_size
+    pending, pending_size = [], 0
+    for part, make, count in ((0, tree_block, num_nodes - 1), (1, extra_block, extra)):
+        for index in range(-(-count // BLOCK)):
+            rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(part, index)))
+            block = make(index, rng)
+            pending.append(block)
+            pending_size += len(block)
+            while pending_size >= chunk_size:
+                merged = np.concatenate(pending)
+                yield merged[:chunk_size]
+                pending = [merged[chunk_size:]]
+                pending_size = len(pending[0])
+    if pending_size:
+        yield np.concatenate(pending)
+
+
+def write_mesh_shards(directory: str, num_nodes: int, target_degree: int = 3, seed: int = 42,
+                      shard_links: int = 10_000_000, chunk_size: int = 1_000_000,
+                      latency_range=LATENCY_RANGE) -> Dict:
+    """
+    Generate a mesh straight to sharded files on disk (constant memory).
+
+    Args:
+        directory: Output directory (created if needed)
+        num_nodes: Number of routers
+        target_degree: Desired average connections per node
+        seed: Integer seed
+        shard_links: Approximate links per shard (bounds memory while deduplicating)
+        chunk_size: Links generated per step
+        latency_range: Inclusive (min, max) link latency in ms
+
+    Returns:
+        The manifest dictionary (also written to directory/manifest.json)
+    """
+    if num_nodes > 3_000_000_000:
+        raise ValueError("num_nodes too large for 64-bit link keys")
+    os.makedirs(directory, exist_ok=True)
+    expected = max(num_nodes - 1, (num_nodes * target_degree) // 2)
+    num_shards = max(1, -(-expected // shard_links))
+    spools = [os.path.join(directory, f"shard-{k:05d}.spool") for k in range(num_shards)]
+
+    # Pass 1: generate and partition by a hash of the link. Splitting by the
+    # lower endpoint is uneven (low ids are the lower end of far more links).
+    files = [open(path, 'wb') for path in spools]
+    try:
+        for chunk in stream_mesh_edges(num_nodes, target_degree, seed, chunk_size, latency_range):
+            keys = (chunk['src'] * num_nodes + chunk['dst']).astype(np.uint64)
+            shard = ((keys * _GOLDEN) >> np.uint64(32)) % np.uint64(num_shards)
+            order = np.argsort(shard, kind='stable')
+            bounds = np.searchsorted(shard[order], np.arange(num_shards + 1))
+            for k in range(num_shards):
+                if bounds[k + 1] > bounds[k]:
+                    files[k].write(chunk[order[bounds[k]:bounds[k + 1]]].tobytes())
+    finally:
+        for f in files:
+            f.close()
+
+    # Pass 2: deduplicate each partition (tree links come first, so they win)
+    shards = []
+    for k, spool in enumerate(spools):
+        records = np.fromfile(spool, dtype=EDGE_DTYPE)
+        keys = records['src'] * num_nodes + records['dst']
+        _, first = np.unique(keys, return_index=True)
+        records = records[np.sort(first)]
+        name = f"shard-{k:05d}.npy"
+        np.save(os.path.join(directory, name), records)
+        os.remove(spool)
+        shards.append({'file': name, 'num_links': int(len(records))})
+
+    manifest = {
+        'num_nodes': num_nodes,
+        'num_links': sum(s['num_links'] for s in shards),
+        'target_degree': target_degree,
+        'seed': seed,
+        'latency_range': list(latency_range),
+        'shards': shards,
+    }
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(directory: str) -> Dict:
+    with open(os.path.join(directory, MANIFEST)) as f:
+        return json.load(f)
+
+
+def read_mesh_shards(directory: str, chunk_size: int = 1_000_000) -> Iterator[np.ndarray]:
+    """
+    Stream the links of a sharded mesh as EDGE_DTYPE record arrays.
+
+    Shards are memory-mapped, so only the current chunk is paged in.
+    """
+    for shard in read_manifest(directory)['shards']:
+        records = np.load(os.path.join(directory, shard['file']), mmap_mode='r')
+        for start in range(0, len(records), chunk_size):
+            yield records[start:start + chunk_size]
+
+
+def load_shards_into_builder(builder, directory: str, chunk_size: int = 1_000_000,
+                             names: Optional[NodeNames] = None):
+    """
+    Feed a sharded mesh into a CustomNetworkBuilder chunk by chunk.
+
+    Args:
+        builder: CustomNetworkBuilder (uses add_links_from_arrays)
+        directory: Directory written by write_mesh_shards()
+        chunk_size: Links per bulk-load call
+        names: Node names by id (default: "Node0", "Node1", ...)
+    """
+    names = names or NodeNames(read_manifest(directory)['num_nodes'])
+    for chunk in read_mesh_shards(directory, chunk_size):
+        builder.add_links_from_arrays(chunk['src'], chunk['dst'], latency=chunk['latency'], names=names)
+    return builder
+
+
+def export_shards_to_pkt(directory: str, output_path: str, network_name: str = "AutoMesh Network",
+                         names: Optional[NodeNames] = None, bandwidth: Optional[float] = None) -> str:
+    """
+    Stream a sharded mesh into a Cisco Packet Tracer .pkt file.
+
+    Args:
+        directory: Directory written by write_mesh_shards()
+        output_path: Path of the .pkt file
+        network_name: Name of the network project
+        names: Node names by id (default: "Node0", "Node1", ...)
+        bandwidth: Bandwidth for every link (default: exporter default)
+
+    Returns:
+        Path to the created .pkt file
+    """
+    # Add the Packet Tracer export scripts to the path
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.append(os.path.join(repo_root, "07-packet-tracer-export", "scripts"))
+    from pkt_converter import PacketTracerConverter
+
+    names = names or NodeNames(read_manifest(directory)['num_nodes'])
+
+    def links():
+        for chunk in read_mesh_shards(directory):
+            for u, v, latency in zip(chunk['src'].tolist(), chunk['dst'].tolist(), chunk['latency'].tolist()):
+                yield u, v, latency, bandwidth
+
+    return PacketTracerConverter().convert_stream_to_pkt(names, links(), output_path, network_name)
@@ -11,12 +11,23 @@ This example teaches:
 """
 
 import networkx as nx
-import random
+
+from mesh_generators import generate_mesh_edges
 
 def create_mesh_network(num_nodes, target_degree=3, seed=42):
     """
     Create a random mesh network with controlled connectivity.
     
+    The recipe:
+    1. Start with a connected base (spanning tree): each node connects to a
+       random earlier node. This guarantees the network won't be disconnected.
+    2. Add random extra links (no self-links, no duplicates) until the
+       average degree reaches target_degree.
+    3. Give every link a random latency of 5-30ms.
+    
+    The random draws are done on whole NumPy arrays at once (see
+    mesh_generators.py), so this scales to 100k+ nodes.
+    
     Args:
         num_nodes: Number of routers in the network
         target_degree: Desired connections per node (on average)
@@ -25,39 +36,8 @@ def create_mesh_network(num_nodes, target_degree=3, seed=42):
     Returns:
         NetworkX graph representing the mesh
     """
-    random.seed(seed)
-    G = nx.Graph()
-    
-    # Add all nodes
-    nodes = [f"Node{i}" for i in range(num_nodes)]
-    G.add_nodes_from(nodes)
-    
-    # Start with a connected base (spanning tree)
-    # This guarantees the network won't be disconnected
-    for i in range(1, num_nodes):
-        # Connect each node to a random previous node
-        prev_node = random.randint(0, i-1)
-        latency = random.randint(5, 30)  # Random latency 5-30ms
-        G.add_edge(nodes[prev_node], nodes[i], weight=latency)
-    
-    # Add extra edges to reach target degree
-    max_edges = (num_nodes * target_degree) // 2
-    attempts = 0
-    max_attempts = num_nodes * num_nodes
-    
-    while G.number_of_edges() < max_edges and attempts < max_attempts:
-        # Pick two random nodes
-        node1 = random.choice(nodes)
-        node2 = random.choice(nodes)
-        
-        # Don't connect a node to itself or create duplicate edges
-        if node1 != node2 and not G.has_edge(node1, node2):
-            latency = random.randint(5, 30)
-            G.add_edge(node1, node2, weight=latency)
-        
-        attempts += 1
-    
-    return G
+    edges = generate_mesh_edges(num_nodes, target_degree=target_degree, seed=seed)
+    return edges.to_networkx()
 
 # Create a mesh network
 print("=" * 60)
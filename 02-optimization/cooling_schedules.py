@@ -0,0 +1,303 @@
+"""
+Cooling Schedules - how the annealing temperature falls, and when to stop.
+
+simulated_annealing() in simulated_annealing_intro.py cools geometrically
+(temperature *= cooling_rate). With a fixed rate of 0.95 and T_0 = 100 the
+temperature is below 0.001 after about 225 of its 1000 iterations, and from
+then on it only accepts improvements: the rest of the run is wasted. The
+lesson therefore sizes its rate to the run (see Geometric), and this module
+makes the schedule pluggable:
+
+- Geometric:    T_k = T_0 * r^k (the lesson's schedule)
+- Logarithmic:  T_k = T_0 * log(2) / log(k + 2) (slow, the classic theory schedule)
+- LundyMees:    T_k+1 = T_k / (1 + beta * T_k) (one move per temperature)
+- Adaptive:     adjusts T to hit a target acceptance rate that decays over the run
+
+Given the run length, Geometric and LundyMees pick their rate so the
+temperature reaches final_ratio * T_0 on the last iteration, instead of
+freezing early. Logarithmic has no rate to pick and ignores final_ratio:
+after k iterations it is still at T_0 * log(2) / log(k + 2) (about 0.1 * T_0
+after 1000).
+
+StoppingRule watches the best cost: it reheats the schedule after
+`reheat_after` iterations without improvement and stops the run after
+`patience` iterations without improvement (or once the temperature is
+frozen), and records why the run stopped.
+
+Example:
+    schedule = Adaptive(start_acceptance=0.5, end_acceptance=0.01)
+    stopping = StoppingRule(patience=300, reheat_after=100)
+    simulated_annealing(schedule=schedule, stopping=stopping)
+"""
+
+import inspect
+import math
+from typing import Optional, Union
+
+
+def _settings(obj) -> dict:
+    """Constructor arguments of obj, read back from the attributes of the same names."""
+    names = inspect.signature(type(obj).__init__).parameters
+    return {name: getattr(obj, name) for name in names if name != 'self' and hasattr(obj, name)}
+
+
+class CoolingSchedule:
+    """
+    Base class: start() once, then update() after every iteration.
+
+    Subclasses implement _next(accepted) and may use self.elapsed
+    (iterations since the start or the last reheat) and self.base_temp
+    (temperature at that point).
+    """
+
+    name = "schedule"
+
+    def __init__(self, final_ratio: float = 1e-3):
+        self.final_ratio = final_ratio
+        self.temperature = 0.0
+
+    def start(self, initial_temp: float, iterations: Optional[int] = None) -> float:
+        """Reset to initial_temp for a run of `iterations` steps (if known)."""
+        self.initial_temp = self.base_temp = self.temperature = float(initial_temp)
+        self.iterations = iterations
+        self.iteration = self.elapsed = 0
+        return self.temperature
+
+    def update(self, accepted: bool) -> float:
+        """Temperature for the next iteration."""
+        self.iteration += 1
+        self.elapsed += 1
+        self.temperature = self._next(accepted)
+        return self.temperature
+
+    def reheat(self, temperature: float) -> float:
+        """Restart cooling from a higher temperature."""
+        self.base_temp = self.temperature = max(self.temperature, temperature)
+        self.elapsed = 0
+        return self.temperature
+
+    def _next(self, accepted: bool) -> float:
+        raise NotImplementedError
+
+    def settings(self) -> dict:
+        """Constructor arguments (to tell a checkpoint of another run apart)."""
+        return _settings(self)
+
+    def get_state(self) -> dict:
+        """Progress of the schedule, JSON-serializable (for checkpoints)."""
+        return dict(vars(self))
+
+    def set_state(self, state: dict):
+        """Continue from a get_state() result."""
+        self.__dict__.update(state)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: T = {self.temperature:.4g}>"
+
+
+class Geometric(CoolingSchedule):
+    """T_k = T_0 * cooling_rate^k."""
+
+    name = "geometric"
+
+    def __init__(self, cooling_rate: Optional[float] = None, final_ratio: float = 1e-3):
+        """
+        Args:
+            cooling_rate: Multiplier per iteration (default: reach
+                          final_ratio * T_0 at the end of the run)
+            final_ratio: Final / initial temperature when cooling_rate is derived
+        """
+        super().__init__(final_ratio)
+        self.cooling_rate = cooling_rate
+
+    def start(self, initial_temp: float, iterations: Optional[int] = None) -> float:
+        if self.cooling_rate is None:
+            self.rate = self.final_ratio ** (1 / iterations) if iterations else 0.999
+        else:
+            self.rate = self.cooling_rate
+        return super().start(initial_temp, iterations)
+
+    def _next(self, accepted: bool) -> float:
+        return self.temperature * self.rate
+
+
+class Logarithmic(CoolingSchedule):
+    """T_k = T_0 * log(2) / log(k + 2) - slow enough for the convergence proofs."""
+
+    name = "logarithmic"
+
+    def _next(self, accepted: bool) -> float:
+        return self.base_temp * math.log(2) / math.log(self.elapsed + 2)
+
+
+class LundyMees(CoolingSchedule):
+    """T_k+1 = T_k / (1 + beta * T_k) (Lundy & Mees, 1986)."""
+
+    name = "lundy-mees"
+
+    def __init__(self, beta: Optional[float] = None, final_ratio: float = 1e-3):
+        """
+        Args:
+            beta: Cooling constant (default: reach final_ratio * T_0 at
+                  the end of the run)
+            final_ratio: Final / initial temperature when beta is derived
+        """
+        super().__init__(final_ratio)
+        self.beta = beta
+
+    def start(self, initial_temp: float, iterations: Optional[int] = None) -> float:
+        if self.beta is None:
+            # 1/T grows by beta per step: 1/T_end = 1/T_0 + beta * iterations
+            final = initial_temp * self.final_ratio
+            self.rate = (1 / final - 1 / initial_temp) / (iterations or 1000)
+        else:
+            self.rate = self.beta
+        return super().start(initial_temp, iterations)
+
+    def _next(self, accepted: bool) -> float:
+        return self.temperature / (1 + self.rate * self.temperature)
+
+
+class Adaptive(CoolingSchedule):
+    """
+    Feedback schedule: every `window` iterations, scale T up or down so the
+    acceptance rate tracks a target that decays from start_acceptance to
+    end_acceptance over the run.
+    """
+
+    name = "adaptive"
+
+    def __init__(self, start_acceptance: float = 0.5, end_acceptance: float = 0.01,
+                 window: int = 50, gain: float = 2.0):
+        """
+        Args:
+            start_acceptance: Target acceptance rate at the start
+            end_acceptance: Target acceptance rate at the end
+            window: Iterations between adjustments
+            gain: Strength of each adjustment
+        """
+        super().__init__()
+        self.start_acceptance = start_acceptance
+        self.end_acceptance = end_acceptance
+        self.window = window
+        self.gain = gain
+
+    def start(self, initial_temp: float, iterations: Optional[int] = None) -> float:
+        self.accepted_in_window = 0
+        return super().start(initial_temp, iterations)
+
+    def target(self) -> float:
+        """Target acceptance rate at the current iteration (geometric decay)."""
+        progress = min(self.iteration / self.iterations, 1.0) if self.iterations else 0.0
+        return self.start_acceptance * (self.end_acceptance / self.start_acceptance) ** progress
+
+    def _next(self, accepted: bool) -> float:
+        self.accepted_in_window += accepted
+        if self.elapsed % self.window:
+            return self.temperature
+        rate = self.accepted_in_window / self.window
+        self.accepted_in_window = 0
+        return self.temperature * math.exp(self.gain * (self.target() - rate))
+
+    def reheat(self, temperature: float) -> float:
+        self.accepted_in_window = 0
+        return super().reheat(temperature)
+
+
+SCHEDULES = {
+    'geometric': Geometric,
+    'logarithmic': Logarithmic,
+    'lundy-mees': LundyMees,
+    'adaptive': Adaptive,
+}
+
+
+def get_schedule(schedule: Union[str, CoolingSchedule, None] = None, **options) -> CoolingSchedule:
+    """
+    Schedule from a name ('geometric', 'logarithmic', 'lundy-mees', 'adaptive'),
+    an existing CoolingSchedule, or None (geometric).
+    """
+    if isinstance(schedule, CoolingSchedule):
+        return schedule
+    name = schedule or 'geometric'
+    if name not in SCHEDULES:
+        raise ValueError(f"Unknown cooling schedule '{name}' (choose from {sorted(SCHEDULES)})")
+    return SCHEDULES[name](**options)
+
+
+class StoppingRule:
+    """
+    Reheating on stagnation and convergence-based stopping.
+
+    Call check() once per iteration; it returns the stopping reason, or None
+    to keep going. Possible reasons: 'stalled' (no improvement for
+    `patience` iterations), 'frozen' (temperature below min_temp) and
+    'max_iterations' (set by the caller when the loop simply ends).
+    """
+
+    def __init__(self, patience: Optional[int] = 1000, tolerance: float = 1e-9,
+                 reheat_after: Optional[int] = None, max_reheats: int = 3,
+                 reheat_fraction: float = 0.5, min_temp: float = 0.0):
+        """
+        Args:
+            patience: Stop after this many iterations without improvement
+                      (None: never stop for lack of progress)
+            tolerance: Relative improvement that counts as progress
+            reheat_after: Reheat after this many iterations without improvement
+            max_reheats: Maximum number of reheats per run
+            reheat_fraction: Reheat to this fraction of the initial temperature
+            min_temp: Stop once the temperature falls below this
+        """
+        self.patience = patience
+        self.tolerance = tolerance
+        self.reheat_after = reheat_after
+        self.max_reheats = max_reheats
+        self.reheat_fraction = reheat_fraction
+        self.min_temp = min_temp
+        self.reset()
+
+    def reset(self):
+        self.best_cost = math.inf
+        self.best_iteration = 0
+        self.last_progress = 0
+        self.reheats = 0
+        self.reason: Optional[str] = None
+
+    def check(self, iteration: int, best_cost: float, schedule: CoolingSchedule) -> Optional[str]:
+        """Record progress at `iteration`; reheat the schedule or return a stopping reason."""
+        if best_cost < self.best_cost - self.tolerance * max(abs(self.best_cost), 1.0):
+            self.last_progress = iteration
+        if best_cost < self.best_cost:
+            self.best_cost, self.best_iteration = best_cost, iteration
+        stalled = iteration - self.last_progress
+
+        if self.reheat_after is not None and stalled >= self.reheat_after and self.reheats < self.max_reheats:
+            schedule.reheat(self.reheat_fraction * schedule.initial_temp)
+            self.reheats += 1
+            self.last_progress = iteration
+        elif self.patience is not None and stalled >= self.patience:
+            self.reason = 'stalled'
+        elif schedule.temperature < self.min_temp:
+            self.reason = 'frozen'
+        return self.reason
+
+    def settings(self) -> dict:
+        """Constructor arguments (to tell a checkpoint of another run apart)."""
+        return _settings(self)
+
+    def get_state(self) -> dict:
+        """Progress of the rule, JSON-serializable (for checkpoints)."""
+        return dict(vars(self))
+
+    def set_state(self, state: dict):
+        """Continue from a get_state() result."""
+        self.__dict__.update(state)
+
+    def summary(self, iterations: int) -> dict:
+        """Stopping reason and iteration counts of the finished run."""
+        return {
+            'stop_reason': self.reason or 'max_iterations',
+            'iterations': iterations,
+            'best_iteration': self.best_iteration,
+            'reheats': self.reheats,
+        }
@@ -15,6 +15,8 @@ Simple problem: Find minimum of a mathematical function
 import random
 import math
 
+from cooling_schedules import Geometric, StoppingRule, get_schedule
+
 def objective_function(x):
     """
     A function with multiple local minima.
@@ -24,14 +26,20 @@ def objective_function(x):
     """
     return x**2 + 10 * math.sin(x)
 
-def simulated_annealing(initial_temp=100, cooling_rate=0.95, iterations=1000):
+def simulated_annealing(initial_temp=100, cooling_rate=None, iterations=1000,
+                        schedule=None, stopping=None):
     """
     Use simulated annealing to find the minimum of objective_function.
     
     Args:
         initial_temp: Starting temperature (higher = more exploration)
-        cooling_rate: How fast temperature decreases (0-1)
+        cooling_rate: How fast temperature decreases (0-1); default: the
+                      rate that reaches initial_temp / 1000 on the last iteration
         iterations: Number of steps to take
+        schedule: Cooling schedule name or object (see cooling_schedules.py);
+                  default is geometric cooling with cooling_rate
+        stopping: StoppingRule for reheating and early stopping; default:
+                  stop after 250 iterations without improvement
     """
     # Start with a random solution
     current_solution = random.uniform(-10, 10)
@@ -41,7 +49,10 @@ def simulated_annealing(initial_temp=100, cooling_rate=0.95, iterations=1000):
     best_solution = current_solution
     best_cost = current_cost
     
-    temperature = initial_temp
+    schedule = get_schedule(schedule) if schedule is not None else Geometric(cooling_rate)
+    temperature = schedule.start(initial_temp, iterations)
+    stopping = stopping if stopping is not None else StoppingRule(patience=250)
+    stopping.reset()
     
     print("=" * 60)
     print("SIMULATED ANNEALING OPTIMIZATION")
@@ -81,7 +92,12 @@ def simulated_annealing(initial_temp=100, cooling_rate=0.95, iterations=1000):
                     print(f"\nIter {iteration}: New best! x = {best_solution:.3f}, cost = {best_cost:.3f}")
         
         # Cool down the temperature
-        temperature *= cooling_rate
+        temperature = schedule.update(accept)
+        
+        # Reheat or stop early once the best cost stops improving
+        if stopping.check(iteration, best_cost, schedule):
+            break
+        temperature = schedule.temperature
         
         # Print occasional updates
         if iteration % 200 == 0 and iteration > 0:
@@ -93,6 +109,9 @@ def simulated_annealing(initial_temp=100, cooling_rate=0.95, iterations=1000):
     print(f"Best solution found: x = {best_solution:.3f}")
     print(f"Best cost: {best_cost:.3f}")
     print(f"(True minimum is around x = -1.3, cost ≈ -8.1)")
+    summary = stopping.summary(iteration + 1)
+    print(f"Stopped: {summary['stop_reason']} after {summary['iterations']} iterations "
+          f"(best at {summary['best_iteration']}, {summary['reheats']} reheats)")
     
     return best_solution, best_cost
 
@@ -110,7 +129,10 @@ print("5. Cooling = gradually becoming more conservative")
 print("\n" + "=" * 60)
 print("EXPERIMENTS:")
 print("=" * 60)
-print("- Change cooling_rate to 0.99 (slower cooling)")
+print("- Set cooling_rate=0.95 (fixed rate: frozen after ~225 of 1000 iterations)")
 print("- Change initial_temp to 10 (less exploration)")
+print("- Try schedule='lundy-mees' or schedule='adaptive' (cooling_schedules.py)")
+print("- Pass stopping=StoppingRule(patience=200, reheat_after=100) to reheat before stopping")
+print("- Pass stopping=StoppingRule(patience=None) to always run all iterations")
 print("- Modify objective_function to test different landscapes")
 print("- Track and plot cost over iterations")
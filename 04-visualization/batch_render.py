@@ -0,0 +1,190 @@
+"""
+Batch Render - headless, parallel rendering of many topologies to images.
+
+Render servers have no display: pyplot windows and plt.show() are useless
+there, and creating a new pyplot figure per image leaks memory until it is
+closed. This pipeline never touches pyplot:
+
+- Each worker process creates ONE Agg Figure (network_renderer.py draws on
+  it) in its pool initializer and reuses it for every image: the figure is
+  cleared, redrawn and saved. A warm-up text draw in the initializer loads
+  the font cache and glyph rasterizer once per worker, not per image.
+- Inputs can be graphs, TopologySnapshot objects or topology files written
+  by CustomNetworkBuilder.save() (those are opened in the worker, so only
+  the file name travels between processes).
+- Layouts come from the nodes' 'pos' attributes or the shared layout cache,
+  so re-rendering an unchanged topology does no layout work.
+- Every image reports its load / layout / draw / save times.
+
+Example:
+    report = render_batch(["a.mesh", "b.mesh", builder.G], "renders/", dpi=100)
+    for image in report['images']:
+        print(image['path'], f"{image['total']:.2f}s")
+
+    python batch_render.py renders/ campus.mesh backbone.mesh
+"""
+
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Sequence, Union
+
+import networkx as nx
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from network_renderer import default_positions, draw_figure
+
+# Snapshots and topology files live with the topology tools (06-customization)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "06-customization"))
+from topology_snapshots import TopologySnapshot  # noqa: E402
+from topology_store import open_topology  # noqa: E402
+
+Source = Union[nx.Graph, TopologySnapshot, str]
+
+# Set in each worker process by init_worker so the figure is created only once
+_WORKER_FIGURE: Optional[Figure] = None
+_WORKER_SETTINGS: Dict = {}
+
+
+def init_worker(figsize: Sequence[float], dpi: int, image_format: str, options: Dict):
+    """Pool initializer: one reusable Agg figure per worker, fonts warmed up."""
+    global _WORKER_FIGURE, _WORKER_SETTINGS
+    _WORKER_FIGURE = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(_WORKER_FIGURE)
+    _WORKER_FIGURE.text(0.5, 0.5, "warm-up", fontsize=16, fontweight='bold')
+    _WORKER_FIGURE.canvas.draw()
+    _WORKER_SETTINGS = {'dpi': dpi, 'format': image_format, 'options': options}
+
+
+def load_source(source: Source) -> nx.Graph:
+    """A graph from a graph, a TopologySnapshot or a saved topology file."""
+    if isinstance(source, nx.Graph):
+        return source
+    if isinstance(source, TopologySnapshot):
+        return source.to_networkx()
+    if isinstance(source, (str, os.PathLike)):
+        return open_topology(os.fspath(source)).to_networkx()
+    raise TypeError(f"Cannot render {type(source).__name__}: expected a graph, snapshot or file path")
+
+
+def image_name(source: Source, index: int) -> str:
+    """Output file stem: file name, snapshot label or graph name, else topology_<index>."""
+    if isinstance(source, (str, os.PathLike)):
+        name = os.path.splitext(os.path.basename(os.fspath(source)))[0]
+    elif isinstance(source, TopologySnapshot):
+        name = source.label
+    else:
+        name = source.graph.get('name')
+    name = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(name or ""))
+    return name or f"topology_{index:04d}"
+
+
+def render_job(job) -> Dict:
+    """
+    Render one topology on this worker's figure.
+
+    Args:
+        job: (source, output path, title) tuple
+
+    Returns:
+        Dictionary with 'path', 'nodes', 'links', 'worker' and the 'load',
+        'layout', 'draw' (building artists), 'save' (rasterizing and
+        encoding) and 'total' times in seconds ('error' instead of the
+        times if rendering failed)
+    """
+    source, path, title = job
+    started = time.perf_counter()
+    row = {'path': path, 'worker': os.getpid()}
+    try:
+        G = load_source(source)
+        loaded = time.perf_counter()
+        pos = default_positions(G)
+        placed = time.perf_counter()
+        draw_figure(_WORKER_FIGURE, G, pos, title, **_WORKER_SETTINGS['options'])
+        drawn = time.perf_counter()
+        _WORKER_FIGURE.savefig(path, dpi=_WORKER_SETTINGS['dpi'], format=_WORKER_SETTINGS['format'])
+        saved = time.perf_counter()
+    except Exception as error:      # one bad input must not stop the batch
+        row.update(error=f"{type(error).__name__}: {error}", total=time.perf_counter() - started)
+        return row
+    finally:
+        _WORKER_FIGURE.clear()      # drop the artists, keep the figure and canvas
+    row.update(nodes=G.number_of_nodes(), links=G.number_of_edges(), load=loaded - started,
+               layout=placed - loaded, draw=drawn - placed, save=saved - drawn, total=saved - started)
+    return row
+
+
+def render_batch(sources: List[Source], output_dir: str, image_format: str = 'png', dpi: int = 150,
+                 figsize: Sequence[float] = (12, 12), titles: bool = True,
+                 workers: Optional[int] = None, **options) -> Dict:
+    """
+    Render many topologies to image files in parallel, without a display.
+
+    Args:
+        sources: Graphs, TopologySnapshots and/or topology file paths
+        output_dir: Folder for the images (created if missing)
+        image_format: 'png', 'svg', 'pdf', ... (also the file extension)
+        dpi: Output resolution
+        figsize: Figure size in inches
+        titles: Put the image name on top of each picture
+        workers: Worker processes (default: all cores, at most one per image)
+        **options: draw_network() options (node_color, max_labels, ...)
+
+    Returns:
+        Dictionary with 'images' (one timing row per input, in input order,
+        see render_job), 'rendered', 'failed', 'workers', 'elapsed' and
+        'images_per_second'
+    """
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    jobs, used = [], set()
+    for index, source in enumerate(sources):
+        name = image_name(source, index)
+        if name in used:
+            name = f"{name}_{index:04d}"
+        used.add(name)
+        jobs.append((source, os.path.join(output_dir, f"{name}.{image_format}"),
+                     name if titles else None))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    initargs = (tuple(figsize), dpi, image_format, options)
+    if workers == 1:
+        init_worker(*initargs)
+        images = [render_job(job) for job in jobs]
+    else:
+        with Pool(workers, initializer=init_worker, initargs=initargs) as pool:
+            images = pool.map(render_job, jobs, chunksize=1)
+
+    elapsed = time.perf_counter() - started
+    failed = sum('error' in image for image in images)
+    return {
+        'images': images,
+        'rendered': len(images) - failed,
+        'failed': failed,
+        'workers': workers,
+        'elapsed': elapsed,
+        'images_per_second': (len(images) - failed) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def print_report(report: Dict):
+    """Per-image timing table and batch totals."""
+    print(f"{'image':<40} {'nodes':>7} {'links':>8} {'load':>6} {'layout':>7} {'draw':>6} {'save':>6} {'total':>6}")
+    for image in report['images']:
+        name = os.path.basename(image['path'])
+        if 'error' in image:
+            print(f"{name:<40} ⚠️  {image['error']}")
+            continue
+        print(f"{name:<40} {image['nodes']:>7} {image['links']:>8} {image['load']:>6.2f} "
+              f"{image['layout']:>7.2f} {image['draw']:>6.2f} {image['save']:>6.2f} {image['total']:>6.2f}")
+    print(f"\n✅ {report['rendered']} images ({report['failed']} failed) with {report['workers']} workers "
+          f"in {report['elapsed']:.2f}s ({report['images_per_second']:.1f} images/s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python batch_render.py OUTPUT_DIR TOPOLOGY_FILE [TOPOLOGY_FILE ...]")
+        sys.exit(1)
+    print_report(render_batch(sys.argv[2:], sys.argv[1]))
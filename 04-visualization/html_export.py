@@ -0,0 +1,173 @@
+"""
+HTML Export - interactive WebGL views of large meshes (plotly scattergl).
+
+interactive_self_healing.html is drawn by hand; this module generates an
+interactive page for any topology: pan/zoom, hover info per node, and
+routes drawn on top (toggle them in the legend). The page is a single
+self-contained file (plotly.js included), so it opens offline.
+
+Large meshes stay fast and the file stays small:
+- Nodes are one scattergl trace (WebGL), with numeric hover data in a
+  compact array instead of one HTML string per node.
+- Links are NOT stored as plotly coordinates (x1, x2, gap, y1, y2, gap per
+  link). The page carries node positions as float32 and link endpoints as
+  uint32 arrays in base64, about 8 bytes per link.
+- Links are decimated by zoom: a small script shows at most max_links
+  links that touch the visible area, in a fixed random order. Zoomed out
+  that is an even sample of the whole mesh; zoomed in, every link in view.
+
+plotly is optional for the rest of the repository; only this export
+needs it (pip install plotly).
+
+Example:
+    export_network_html(G, "mesh.html", routes={"Primary": path})
+"""
+
+import base64
+import json
+import os
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import networkx as nx
+import numpy as np
+
+try:
+    import plotly.graph_objects as go
+except ImportError:  # optional dependency, see export_network_html()
+    go = None
+
+from network_renderer import default_positions, graph_arrays
+
+ROUTE_COLORS = ['#e11d48', '#2563eb', '#16a34a', '#d97706', '#7c3aed']
+
+# Runs in the page after plotting ({plot_id} is filled in by plotly):
+# rebuilds the link trace for the visible area on every zoom/pan
+_DECIMATION_SCRIPT = """
+(function () {
+    var gd = document.getElementById('{plot_id}');
+    var data = __DATA__;
+    function decode(text, Type) {
+        var raw = atob(text), bytes = new Uint8Array(raw.length);
+        for (var i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+        return new Type(bytes.buffer);
+    }
+    var pos = decode(data.positions, Float32Array);
+    var links = decode(data.links, Uint32Array);
+    var total = links.length / 2;
+    function showLinks() {
+        var xr = gd._fullLayout.xaxis.range, yr = gd._fullLayout.yaxis.range;
+        var xs = [], ys = [], shown = 0;
+        for (var k = 0; k < total && shown < data.maxLinks; k++) {
+            var a = 2 * links[2 * k], b = 2 * links[2 * k + 1];
+            var x1 = pos[a], y1 = pos[a + 1], x2 = pos[b], y2 = pos[b + 1];
+            if (Math.max(x1, x2) < xr[0] || Math.min(x1, x2) > xr[1] ||
+                Math.max(y1, y2) < yr[0] || Math.min(y1, y2) > yr[1]) continue;
+            xs.push(x1, x2, null);
+            ys.push(y1, y2, null);
+            shown++;
+        }
+        var name = shown < total ? 'links (' + shown.toLocaleString() + ' of ' + total.toLocaleString() + ')'
+                                 : 'links (' + total.toLocaleString() + ')';
+        Plotly.restyle(gd, {x: [xs], y: [ys], name: name}, [data.trace]);
+    }
+    gd.on('plotly_relayout', showLinks);
+    showLinks();
+})();
+"""
+
+
+def _base64(array: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+
+
+def export_network_html(G: nx.Graph, path: str, pos: Optional[Dict[Hashable, Sequence[float]]] = None,
+                        title: str = "Mesh Network", highlight_path: Optional[List[Hashable]] = None,
+                        routes: Optional[Dict[str, List[Hashable]]] = None, max_links: int = 20_000,
+                        weight: str = 'weight', include_plotlyjs=True, seed: int = 42) -> Dict:
+    """
+    Write an interactive WebGL view of a network to an HTML file.
+
+    Args:
+        G: Network
+        path: Output .html file
+        pos: Node positions (default: the nodes' 'pos' attribute if every
+             node has one, else a cached layout)
+        title: Page and plot title
+        highlight_path: Nodes of one route to highlight (shown as "Route")
+        routes: More routes to draw, {legend name: node list}
+        max_links: Most links drawn at once (decimation budget)
+        weight: Link latency attribute, for the hover info
+        include_plotlyjs: True embeds plotly.js (self-contained, ~4 MB);
+                          'cdn' loads it from the web (small file)
+        seed: Seed of the link decimation order
+
+    Returns:
+        Dictionary with 'path', 'nodes', 'links' and 'bytes' (file size)
+
+    Raises:
+        ImportError: If plotly is not installed
+    """
+    if go is None:
+        raise ImportError("export_network_html() needs plotly: pip install plotly")
+    if pos is None:
+        pos = default_positions(G)
+    nodes, positions, src, dst = graph_arrays(G, pos)
+    n = len(nodes)
+    index = {u: k for k, u in enumerate(nodes)}
+
+    # Hover data: degree and mean link latency per node
+    degree = np.bincount(np.concatenate([src, dst]), minlength=n)
+    latency = np.fromiter((w for _, _, w in G.edges(data=weight, default=0)), dtype=np.float64,
+                          count=len(src))
+    total_latency = (np.bincount(src, weights=latency, minlength=n)
+                     + np.bincount(dst, weights=latency, minlength=n))
+    hover = np.stack([degree, total_latency / np.maximum(degree, 1)], axis=1).astype(np.float32)
+
+    size = float(np.clip(20 * np.sqrt(10 / max(n, 1)), 3, 20))
+    traces = [
+        go.Scattergl(x=[], y=[], mode='lines', name='links', hoverinfo='skip',
+                     line=dict(color='rgba(120, 120, 120, 0.5)', width=1)),
+        go.Scattergl(x=positions[:, 0], y=positions[:, 1], mode='markers', name='nodes',
+                     text=[str(u) for u in nodes], customdata=hover,
+                     hovertemplate="<b>%{text}</b><br>degree %{customdata[0]}"
+                                   "<br>mean link latency %{customdata[1]:.1f} ms<extra></extra>",
+                     marker=dict(size=size, color=degree.astype(np.float32), colorscale='YlOrRd',
+                                 colorbar=dict(title='Degree'), line=dict(width=0))),
+    ]
+
+    routes = dict(routes or {})
+    if highlight_path:
+        routes = {'Route': highlight_path, **routes}
+    for k, (name, route) in enumerate(routes.items()):
+        ids = np.array([index[u] for u in route], dtype=np.int64)
+        traces.append(go.Scattergl(x=positions[ids, 0], y=positions[ids, 1], mode='lines+markers',
+                                   name=name, text=[str(u) for u in route],
+                                   hovertemplate="%{text}<extra>" + name + "</extra>",
+                                   line=dict(color=ROUTE_COLORS[k % len(ROUTE_COLORS)], width=4),
+                                   marker=dict(size=max(size, 8), color=ROUTE_COLORS[k % len(ROUTE_COLORS)])))
+
+    if n:
+        low, high = positions.min(axis=0), positions.max(axis=0)
+    else:
+        low, high = np.full(2, -1.0), np.full(2, 1.0)     # empty graph: any visible range
+    margin = np.maximum((high - low) * 0.05, 1e-3)
+    fig = go.Figure(traces)
+    fig.update_layout(
+        title=title, template='plotly_white', hovermode='closest', margin=dict(l=10, r=10, t=50, b=10),
+        xaxis=dict(visible=False, range=[float(low[0] - margin[0]), float(high[0] + margin[0])]),
+        yaxis=dict(visible=False, range=[float(low[1] - margin[1]), float(high[1] + margin[1])],
+                   scaleanchor='x'),
+    )
+
+    # Links in a fixed random order: any prefix is an even sample of the mesh
+    order = np.random.default_rng(seed).permutation(len(src))
+    data = {
+        'positions': _base64(positions.astype('<f4')),
+        'links': _base64(np.stack([src[order], dst[order]], axis=1).astype('<u4')),
+        'maxLinks': int(max_links),
+        'trace': 0,
+    }
+    fig.write_html(path, include_plotlyjs=include_plotlyjs, full_html=True,
+                   config={'scrollZoom': True, 'displaylogo': False},
+                   post_script=_DECIMATION_SCRIPT.replace('__DATA__', json.dumps(data)))
+    return {'path': path, 'nodes': n, 'links': len(src), 'bytes': os.path.getsize(path)}
@@ -0,0 +1,217 @@
+"""
+Incremental Layout - keep node positions stable while the topology changes.
+
+Recomputing a force-directed layout after every failure or new link makes
+animations jump: the layout starts from scratch and lands on a different
+picture each time. IncrementalLayout keeps the previous positions and only
+moves what the change affects:
+
+1. Diff the new graph against the last one: added/removed nodes and links.
+2. Place new nodes at the mean position of their already placed neighbours.
+3. Relax only the neighbourhood (`hops` hops) of the changed elements with
+   a few Fruchterman-Reingold iterations: springs along links, weak
+   repulsion from nearby nodes and damped steps that cool to zero. The forces
+   of the old graph at the old positions are subtracted, so the previous
+   picture counts as balanced and only the change moves nodes.
+   Everything else stays exactly where it was.
+
+The spring length is the median link length of the current picture, so
+the relaxed region keeps the scale of the rest of the layout. The first
+layout is a full cached one (spring, or multilevel for large graphs).
+
+Example:
+    layout = IncrementalLayout()
+    pos = layout.update(network.G)          # full layout
+    network.simulate_node_failure("Node7")
+    pos = layout.update(network.G)          # only Node7's neighbourhood moves
+"""
+
+import os
+import sys
+import time
+from typing import Dict, Hashable, Optional, Set
+
+import networkx as nx
+import numpy as np
+
+from layout_cache import auto_layout
+
+# Snapshots live with the topology tools (06-customization)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "06-customization"))
+from topology_snapshots import link_key  # noqa: E402
+
+
+class IncrementalLayout:
+    """
+    Warm-started layout that relaxes only around topology changes.
+
+    Example:
+        layout = IncrementalLayout(steps=30, hops=1)
+        pos = layout.update(builder.G)
+        builder.add_link("R1", "R9")
+        pos = layout.update(builder.G)
+        print(layout.last_update)      # nodes moved, seconds
+    """
+
+    def __init__(self, steps: int = 30, hops: int = 1, seed: int = 42, **layout_params):
+        """
+        Args:
+            steps: Relaxation steps per update
+            hops: Size of the relaxed neighbourhood around changed elements
+            seed: Seed of the first layout and of new node placement
+            **layout_params: Parameters of the first (spring) layout, e.g. k, iterations
+        """
+        self.steps = steps
+        self.hops = hops
+        self.seed = seed
+        self.layout_params = layout_params
+        self.rng = np.random.default_rng(seed)
+        self.positions: Dict[Hashable, np.ndarray] = {}
+        self._links: Set = set()
+        self.last_update: Dict = {}
+
+    def update(self, G: nx.Graph, steps: Optional[int] = None) -> Dict[Hashable, np.ndarray]:
+        """
+        Positions for the current state of G, moving as little as possible.
+
+        Args:
+            G: Network in its new state
+            steps: Override the relaxation steps for this update
+
+        Returns:
+            Dictionary node -> position array (a copy)
+        """
+        started = time.perf_counter()
+        links = {link_key(u, v) for u, v in G.edges()}
+        placed = [u for u in G.nodes() if u in self.positions]
+        if not placed:
+            pos = auto_layout(G, seed=self.seed, **self.layout_params)
+            self.positions = {u: np.asarray(p, dtype=np.float64) for u, p in pos.items()}
+            self._links = links
+            self.last_update = {'mode': 'full', 'moved': G.number_of_nodes(),
+                                'elapsed': time.perf_counter() - started}
+            return self._copy()
+
+        # What changed since the last update
+        old_links = self._links
+        changed = links ^ old_links
+        removed_nodes = {u for u in self.positions if u not in G}
+        seeds = {u for link in changed for u in link if u in G}
+        seeds.update(u for u in G.nodes() if u not in self.positions)
+        self._links = links
+        if not seeds:
+            for u in removed_nodes:
+                del self.positions[u]
+            self.last_update = {'mode': 'unchanged', 'moved': 0, 'elapsed': time.perf_counter() - started}
+            return self._copy()
+
+        spring = self._spring_length(G)
+        old_nodes = set(self.positions)
+        self._place_new_nodes(G, spring)
+        affected = set(seeds)
+        frontier = set(seeds)
+        for _ in range(self.hops):
+            frontier = {v for u in frontier for v in G.neighbors(u)} - affected
+            affected |= frontier
+        self._relax(G, old_nodes, old_links, affected, spring,
+                    self.steps if steps is None else steps)
+        for u in removed_nodes:
+            del self.positions[u]
+        self.last_update = {'mode': 'incremental', 'moved': len(affected),
+                            'elapsed': time.perf_counter() - started}
+        return self._copy()
+
+    def _copy(self) -> Dict[Hashable, np.ndarray]:
+        return {u: p.copy() for u, p in self.positions.items()}
+
+    def _spring_length(self, G: nx.Graph) -> float:
+        """Median length of the links whose ends are both placed."""
+        lengths = [np.linalg.norm(self.positions[u] - self.positions[v]) for u, v in G.edges()
+                   if u in self.positions and v in self.positions]
+        if lengths:
+            return float(np.median(lengths)) or 1e-3
+        return 1 / np.sqrt(max(G.number_of_nodes(), 1))
+
+    def _place_new_nodes(self, G: nx.Graph, spring: float):
+        """New nodes go next to their placed neighbours (or near the centre)."""
+        centre = np.mean(list(self.positions.values()), axis=0)
+        # Nodes joined to placed ones first, so chains of new nodes grow outwards
+        pending = [u for u in G.nodes() if u not in self.positions]
+        while pending:
+            still = []
+            for u in pending:
+                anchors = [self.positions[v] for v in G.neighbors(u) if v in self.positions]
+                if anchors:
+                    self.positions[u] = np.mean(anchors, axis=0) + self.rng.normal(scale=0.3 * spring,
+                                                                                  size=len(centre))
+                else:
+                    still.append(u)
+            if len(still) == len(pending):
+                # Only isolated nodes / detached new parts left
+                for u in still:
+                    self.positions[u] = centre + self.rng.normal(scale=spring, size=len(centre))
+                break
+            pending = still
+
+    def _relax(self, G: nx.Graph, old_nodes: Set, old_links: Set, affected: Set,
+               spring: float, steps: int):
+        """
+        Fruchterman-Reingold steps that move only the affected nodes.
+
+        The previous picture is not an exact equilibrium of these forces, so
+        the forces the OLD graph exerted at the old positions are subtracted:
+        only the change itself (new/removed links and nodes) moves anything.
+        """
+        nodes = list(G.nodes()) + [u for u in old_nodes if u not in G]
+        index = {u: k for k, u in enumerate(nodes)}
+        P = np.array([self.positions[u] for u in nodes], dtype=np.float64)
+        moving = np.array(sorted(index[u] for u in affected), dtype=np.int64)
+        slot = np.full(len(nodes), -1, dtype=np.int64)
+        slot[moving] = np.arange(len(moving))
+        in_new = np.zeros(len(nodes), dtype=bool)
+        in_new[:G.number_of_nodes()] = True
+        in_old = np.array([u in old_nodes for u in nodes])
+
+        # Links with at least one moving end, as (moving end, other end)
+        new_pairs = np.array([(index[u], index[v]) for u in affected for v in G.neighbors(u)],
+                             dtype=np.int64).reshape(-1, 2)
+        old_pairs = np.array([(index[a], index[b]) for link in old_links for a, b in (link, link[::-1])
+                              if a in affected and b in index], dtype=np.int64).reshape(-1, 2)
+
+        baseline = self._forces(P, moving, slot, in_old, old_pairs, spring)
+        baseline[~in_old[moving]] = 0.0
+        for step in range(steps):
+            # Damped gradient step, capped by a cooling limit (spring/10 down to 0)
+            move = 0.1 * (self._forces(P, moving, slot, in_new, new_pairs, spring) - baseline)
+            limit = 0.1 * spring * (1 - step / steps)
+            length = np.sqrt(np.einsum('ij,ij->i', move, move))
+            P[moving] += move * (np.minimum(length, limit) / np.maximum(length, 1e-12))[:, None]
+
+        for k in moving.tolist():
+            self.positions[nodes[k]] = P[k]
+
+    @staticmethod
+    def _forces(P: np.ndarray, moving: np.ndarray, slot: np.ndarray, present: np.ndarray,
+                pairs: np.ndarray, spring: float) -> np.ndarray:
+        """FR forces on the moving nodes from the `present` nodes and the given links."""
+        # Weak, short-range repulsion: only keeps nodes from piling up. The
+        # layout itself is already spread out, and a full-strength field
+        # around a picture that is not its equilibrium is unstable.
+        k2 = (spring / 3) ** 2
+        force = np.zeros((len(moving), P.shape[1]))
+        others = P[present]
+        chunk = max(1, 4_000_000 // max(len(others), 1))
+        # Repulsion k^2 / d from nodes within 1.5 spring lengths
+        for start in range(0, len(moving), chunk):
+            rows = moving[start:start + chunk]
+            delta = P[rows, None, :] - others[None, :, :]
+            dist2 = np.einsum('ijk,ijk->ij', delta, delta)
+            dist2[dist2 == 0] = np.inf                     # the node itself
+            weight = np.where(dist2 < 2.25 * spring * spring, k2 / dist2, 0.0)
+            force[start:start + len(rows)] += np.einsum('ij,ijk->ik', weight, delta)
+        # Attraction d^2 / k along links
+        if len(pairs):
+            delta = P[pairs[:, 1]] - P[pairs[:, 0]]
+            dist = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+            np.add.at(force, slot[pairs[:, 0]], delta * (dist / spring)[:, None])
+        return force
@@ -0,0 +1,257 @@
+"""
+Layout Cache - compute each network layout once, reuse it on every render.
+
+Force-directed layouts are the slowest part of drawing a network: one
+nx.spring_layout() call on a 5k-node mesh takes tens of seconds, and the
+plotting code here used to call it again for every subplot and every
+render. The layout only depends on the topology (plus link latencies for
+weighted algorithms) and the layout parameters, so it can be memoized:
+
+- The key is the Zobrist fingerprint of the topology
+  (06-customization/topology_fingerprint.py), a digest of the link weights
+  if the algorithm uses them, the algorithm name and its parameters.
+- Positions are kept in memory (a small LRU of recent layouts) and, if a
+  cache folder is set, on disk as one .npz file per layout, so they also
+  survive the process. The disk cache is opt-in: set
+  $AUTOMESH_LAYOUT_CACHE (or pass LayoutCache(directory=...)).
+- The disk cache is bounded in bytes; the least recently used layouts are
+  deleted first.
+
+Example:
+    pos = cached_layout(G, 'spring', seed=42, k=0.5, iterations=50)
+    nx.draw_networkx(G, pos)      # second call: no layout work at all
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, Hashable, Optional
+
+import networkx as nx
+import numpy as np
+
+# Fingerprints and the LRU cache live with the topology tools (06-customization)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "06-customization"))
+from topology_fingerprint import LRUCache, link_code, topology_fingerprint  # noqa: E402
+from topology_store import default_file_mode  # noqa: E402
+from multilevel_layout import multilevel_layout  # noqa: E402
+
+LAYOUTS = {
+    'spring': nx.spring_layout,
+    'multilevel': multilevel_layout,
+    'kamada_kawai': nx.kamada_kawai_layout,
+    'spectral': nx.spectral_layout,
+    'circular': nx.circular_layout,
+    'shell': nx.shell_layout,
+    'random': nx.random_layout,
+}
+
+# Algorithms whose result depends on the edge weight attribute
+WEIGHTED = {'spring', 'multilevel', 'kamada_kawai', 'spectral'}
+
+# nx.spring_layout is O(n^2) per iteration (and needs scipy above 500 nodes):
+# larger graphs get the multilevel Barnes-Hut layout instead
+SPRING_LIMIT = 500
+
+# Disk cache folder of the process-wide cache (None: memory only)
+DEFAULT_DIRECTORY = os.environ.get('AUTOMESH_LAYOUT_CACHE') or None
+
+
+def weight_digest(G: nx.Graph, weight: str = 'weight') -> int:
+    """Order-independent 64-bit digest of the link weights."""
+    value = 0
+    for u, v, w in G.edges(data=weight):
+        item = f"{link_code(u, v)}:{w!r}".encode('utf-8')
+        value ^= int.from_bytes(hashlib.blake2b(item, digest_size=8).digest(), 'little')
+    return value
+
+
+def _canonical(value):
+    """JSON-ready form of a layout parameter (pos=/fixed= may have tuple node keys)."""
+    if isinstance(value, dict):
+        return sorted(([repr(k), _canonical(v)] for k, v in value.items()), key=lambda item: item[0])
+    if isinstance(value, (set, frozenset)):
+        return sorted(repr(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return value
+
+
+def layout_key(G: nx.Graph, algorithm: str, params: Dict) -> str:
+    """Cache key of a layout: topology, weights (if used), algorithm and parameters."""
+    parts = [f"{topology_fingerprint(G):016x}", algorithm, json.dumps(_canonical(params), default=repr)]
+    if algorithm in WEIGHTED and params.get('weight', 'weight') is not None:
+        parts.append(f"{weight_digest(G, params.get('weight', 'weight')):016x}")
+    return hashlib.blake2b("|".join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class LayoutCache:
+    """
+    Memoized network layouts, in memory and on disk.
+
+    Example:
+        cache = LayoutCache(max_bytes=64 * 2**20)
+        pos = cache.layout(builder.G, 'spring', seed=42, k=1, iterations=50)
+        print(cache.stats())
+    """
+
+    def __init__(self, directory: Optional[str] = DEFAULT_DIRECTORY, max_bytes: int = 256 * 2**20,
+                 memory_entries: int = 32):
+        """
+        Args:
+            directory: Folder for the disk cache (None: memory only). Default:
+                       $AUTOMESH_LAYOUT_CACHE if set, else memory only
+            max_bytes: Size limit of the disk cache
+            memory_entries: Layouts kept in memory
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory = LRUCache(memory_entries)
+        self.disk_hits = 0
+        self.computed = 0
+
+    def layout(self, G: nx.Graph, algorithm: str = 'spring', **params) -> Dict[Hashable, np.ndarray]:
+        """
+        Positions of G's nodes, computed only if this layout is not cached.
+
+        Args:
+            G: Network
+            algorithm: 'spring', 'multilevel', 'kamada_kawai', 'spectral',
+                       'circular', 'shell' or 'random'
+            **params: Parameters of the networkx layout function (seed, k,
+                      iterations, weight, ...)
+
+        Returns:
+            Dictionary node -> position array, as from networkx
+        """
+        if algorithm not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{algorithm}' (choose from {sorted(LAYOUTS)})")
+        nodes = list(G.nodes())
+        if not nodes:
+            return {}
+        key = layout_key(G, algorithm, params)
+
+        positions = self.memory.get(key)
+        if positions is None:
+            positions = self._load(key, nodes)
+            if positions is None:
+                pos = LAYOUTS[algorithm](G, **params)
+                positions = np.array([pos[u] for u in nodes], dtype=np.float64).reshape(len(nodes), -1)
+                self.computed += 1
+                self._save(key, nodes, positions)
+            else:
+                self.disk_hits += 1
+            self.memory.put(key, (nodes, positions))
+        else:
+            positions = self._reorder(*positions, nodes)
+        # Copy so callers can move nodes without touching the cache
+        return dict(zip(nodes, positions.copy()))
+
+    @staticmethod
+    def _reorder(cached_nodes: list, positions: np.ndarray, nodes: list) -> np.ndarray:
+        if cached_nodes == nodes:
+            return positions
+        row = {u: k for k, u in enumerate(cached_nodes)}
+        return positions[[row[u] for u in nodes]]
+
+    # --- disk ------------------------------------------------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _load(self, key: str, nodes: list) -> Optional[np.ndarray]:
+        """Positions from the disk cache in `nodes` order, or None."""
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with np.load(self._path(key)) as data:
+                names = json.loads(data['nodes'].tobytes().decode('utf-8'))
+                positions = data['positions']
+        except (OSError, ValueError, KeyError):
+            return None                       # unreadable entry: recompute and overwrite
+        row = {name: k for k, name in enumerate(names)}
+        try:
+            positions = positions[[row[repr(u)] for u in nodes]]
+        except KeyError:
+            return None                       # different node set (fingerprint collision)
+        os.utime(self._path(key))             # mark as recently used
+        return positions
+
+    def _save(self, key: str, nodes: list, positions: np.ndarray):
+        """Write a layout atomically (temp file + os.replace), then enforce max_bytes."""
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        names = np.frombuffer(json.dumps([repr(u) for u in nodes]).encode('utf-8'), dtype=np.uint8)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, nodes=names, positions=positions)
+            default_file_mode(tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used layouts until the disk cache fits in max_bytes."""
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.npz')]
+        stats = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries]
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass                          # removed by another process
+            total -= size
+
+    def clear(self):
+        """Forget all layouts, in memory and on disk."""
+        self.memory.data.clear()
+        if self.directory is not None and os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.npz'):
+                    os.remove(entry.path)
+
+    def stats(self) -> Dict:
+        """Layouts served from memory and disk, and layouts computed."""
+        return {
+            'memory_hits': self.memory.hits,
+            'disk_hits': self.disk_hits,
+            'computed': self.computed,
+            'memory_size': len(self.memory),
+        }
+
+
+_default_cache: Optional[LayoutCache] = None
+
+
+def default_cache() -> LayoutCache:
+    """Process-wide LayoutCache used by cached_layout()."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LayoutCache()
+    return _default_cache
+
+
+def cached_layout(G: nx.Graph, algorithm: str = 'spring', **params) -> Dict[Hashable, np.ndarray]:
+    """LayoutCache.layout() on the process-wide cache."""
+    return default_cache().layout(G, algorithm, **params)
+
+
+def auto_layout(G: nx.Graph, seed=42, **spring_params) -> Dict[Hashable, np.ndarray]:
+    """
+    Cached spring layout for small graphs, multilevel layout above SPRING_LIMIT
+    nodes (spring_params such as k only apply to the spring layout).
+    """
+    if G.number_of_nodes() > SPRING_LIMIT:
+        return cached_layout(G, 'multilevel', seed=seed)
+    return cached_layout(G, 'spring', seed=seed, **spring_params)
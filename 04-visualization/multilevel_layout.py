@@ -0,0 +1,418 @@
+"""
+Multilevel Layout - force-directed layout for 100k-node meshes in NumPy.
+
+nx.spring_layout() compares every node with every other node in every
+iteration (O(n^2)), and starts from random positions, so it needs many
+iterations. This layout follows the multilevel spring-electrical scheme
+(Walshaw; Hu's sfdp):
+
+1. Coarsening: nodes are paired along short links by a handshake matching
+   (each node picks its shortest free link, mutual picks are merged), and
+   leftover nodes join a matched neighbour. Repeating this gives a
+   hierarchy of ever smaller graphs down to a few dozen nodes.
+2. The coarsest graph is laid out from random positions, which is cheap.
+3. Each finer level starts from its coarse parent's position (scaled up
+   to the larger graph) and only needs a few refinement iterations - the
+   fewer, the larger the level (iterations * sqrt(FULL_REFINEMENT / n)
+   above FULL_REFINEMENT nodes), since that is where iterations are
+   expensive and the parent layout is already good.
+
+Repulsion uses a Barnes-Hut approximation on a quadtree built from
+bincounts, one level at a time (cell masses and centres of mass). A node
+feels each cell of its interaction list - the children of its parent
+cell's neighbours that are not next to its own cell - as one point mass at
+the cell's centre of mass, and the nodes of neighbouring finest cells
+exactly. The far field is gathered per cell as a short Taylor series and
+handed down the tree, so the cost is O(n log n) per iteration and every
+step is a whole-array NumPy operation: about 0.3 s per iteration for 100k
+nodes. A whole layout of a 100k-node, 200k-link grid took about 20 s on
+one core here (about 35 s with the full 50 iterations on every level);
+expect more on slower machines.
+
+Link latencies set the natural link length (relative to the median
+latency), so slow links are drawn longer.
+
+Example:
+    pos = multilevel_layout(G, seed=42)                 # weight='weight'
+    pos = cached_layout(G, 'multilevel', seed=42)       # memoized
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+# Spring-electrical model: repulsion C K^2 / d, attraction d^2 / (K l^3),
+# so two linked nodes settle at a distance proportional to l (K = 1)
+REPULSION = 0.2
+# Relative link lengths are clipped to this range
+LENGTH_RANGE = (0.25, 4.0)
+# Stop coarsening at this many nodes, or when a level shrinks less than this
+COARSEST = 50
+MIN_REDUCTION = 0.9
+# Levels up to this many nodes get all refinement iterations; larger ones
+# start from a good parent layout and get iterations * sqrt(this / nodes)
+FULL_REFINEMENT = 20_000
+# Deepest quadtree level (a 2048 x 2048 grid)
+MAX_DEPTH = 11
+
+
+def _best_incident(n: int, src: np.ndarray, dst: np.ndarray, key: np.ndarray) -> np.ndarray:
+    """For each node the other end of its lowest-key link (-1 if it has none)."""
+    u = np.concatenate([src, dst])
+    v = np.concatenate([dst, src])
+    k = np.concatenate([key, key])
+    order = np.lexsort((k, u))
+    u, v = u[order], v[order]
+    first = np.ones(len(u), dtype=bool)
+    first[1:] = u[1:] != u[:-1]
+    best = np.full(n, -1, dtype=np.int64)
+    best[u[first]] = v[first]
+    return best
+
+
+def match_nodes(n: int, src: np.ndarray, dst: np.ndarray, length: np.ndarray,
+                rng: np.random.Generator, rounds: int = 3) -> np.ndarray:
+    """
+    Group nodes for coarsening.
+
+    Handshake matching: every unmatched node picks its shortest link to
+    another unmatched node (ties broken randomly) and mutual picks become
+    pairs. Nodes still unmatched after `rounds` join the group of their
+    shortest-linked neighbour, so stars and trees coarsen quickly too.
+
+    Returns:
+        Coarse node id per node (0..groups-1)
+    """
+    group = np.full(n, -1, dtype=np.int64)
+    key = length * (1 + 1e-3 * rng.random(len(length)))
+    ids = np.arange(n, dtype=np.int64)
+    for _ in range(rounds):
+        free = (group[src] < 0) & (group[dst] < 0)
+        if not free.any():
+            break
+        best = _best_incident(n, src[free], dst[free], key[free])
+        mutual = (best >= 0) & (best[np.maximum(best, 0)] == ids) & (ids < best)
+        group[ids[mutual]] = ids[mutual]
+        group[best[mutual]] = ids[mutual]
+
+    # Leftovers join a matched neighbour (or stay on their own)
+    best = _best_incident(n, src, dst, key)
+    left = (group < 0) & (best >= 0)
+    left &= group[np.maximum(best, 0)] >= 0
+    group[left] = group[best[left]]
+    alone = group < 0
+    group[alone] = ids[alone]
+    return np.unique(group, return_inverse=True)[1].ravel()
+
+
+def coarsen(n: int, src: np.ndarray, dst: np.ndarray, length: np.ndarray, group: np.ndarray):
+    """
+    Contract the groups into single nodes.
+
+    Returns:
+        Tuple of (coarse node count, src, dst, length) - parallel links are
+        merged (mean length) and links inside a group dropped
+    """
+    nc = int(group.max()) + 1 if n else 0
+    a, b = group[src], group[dst]
+    keep = a != b
+    a, b, length = np.minimum(a[keep], b[keep]), np.maximum(a[keep], b[keep]), length[keep]
+    keys, inverse = np.unique(a * nc + b, return_inverse=True)
+    inverse = inverse.ravel()
+    total = np.bincount(inverse, weights=length, minlength=len(keys))
+    count = np.bincount(inverse, minlength=len(keys))
+    return nc, keys // nc, keys % nc, total / count
+
+
+def _near_pairs(cell: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Node pairs in the same or adjacent cells of a size x size grid, each
+    pair once (same half-stencil idea as mesh_generators.radius_pairs).
+    """
+    n = len(cell)
+    width = size + 2                                   # one empty cell of padding on each side
+    keys = (cell[:, 0] + 1) * width + cell[:, 1] + 1
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    ids = np.arange(n, dtype=np.int64)
+    first_i, first_j = [], []
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        target = keys + dx * width + dy
+        start = np.searchsorted(keys, target, side='left')
+        end = np.searchsorted(keys, target, side='right')
+        if dx == 0 and dy == 0:
+            start = np.maximum(start, ids + 1)         # same cell: each pair once
+        counts = np.maximum(end - start, 0)
+        total = int(counts.sum())
+        if total:
+            i = np.repeat(ids, counts)
+            j = np.repeat(start - (np.cumsum(counts) - counts), counts) + np.arange(total)
+            first_i.append(order[i])
+            first_j.append(order[j])
+    if not first_i:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(first_i), np.concatenate(first_j)
+
+
+# Interaction lists: the children of the parent cell's 3 x 3 neighbourhood
+# that are not next to the cell itself - 27 offsets from the parent's first
+# child, depending only on which child (0..3) the cell is
+_INTERACTION_OFFSETS = np.array([[(x, y) for x in range(-2, 4) for y in range(-2, 4)
+                                  if abs(x - cx) > 1 or abs(y - cy) > 1]
+                                 for cx in (0, 1) for cy in (0, 1)], dtype=np.int64)
+_BINOMIAL = [[float(math.comb(k, j)) for j in range(16)] for k in range(16)]
+
+
+def _shift(local: np.ndarray, h: np.ndarray) -> np.ndarray:
+    """Re-centre polynomials sum_k a_k (z - c)^k to c + h (one row per cell)."""
+    terms = local.shape[1]
+    powers = [np.ones_like(h)]
+    for _ in range(terms - 1):
+        powers.append(powers[-1] * h)
+    shifted = np.zeros_like(local)
+    for j in range(terms):
+        for k in range(j, terms):
+            shifted[:, j] += _BINOMIAL[k][j] * local[:, k] * powers[k - j]
+    return shifted
+
+
+def repulsion(P: np.ndarray, strength: float = REPULSION, occupancy: float = 4.0,
+              terms: int = 4) -> np.ndarray:
+    """
+    Barnes-Hut approximation of the repulsive forces strength / d (K = 1).
+
+    In complex coordinates the force of a unit mass at w on a node at z is
+    conj(1 / (z - w)), an analytic function of z away from w. So the far
+    field is collected per CELL rather than per node: each cell of the
+    interaction list contributes its point mass to a short Taylor series
+    around the target cell's centre, series are shifted from parent to
+    child cells level by level, and each node evaluates its finest cell's
+    series once.
+
+    Args:
+        P: (n, 2) positions
+        strength: Repulsion constant
+        occupancy: Target nodes per cell of the finest quadtree level
+        terms: Taylor terms per cell (4: about 1e-3 relative error)
+
+    Returns:
+        (n, 2) forces
+    """
+    n = len(P)
+    force = np.zeros_like(P)
+    if n < 2:
+        return force
+    low = P.min(axis=0)
+    span = float((P.max(axis=0) - low).max()) or 1.0
+    z = P[:, 0] + 1j * P[:, 1]
+    corner = low[0] + 1j * low[1]
+
+    # Finest level: deep enough that a node has about `occupancy` nodes per
+    # cell around it - layouts are dense in the middle, so the uniform
+    # estimate is only the starting point
+    depth = int(np.clip(np.ceil(0.5 * np.log2(max(n / occupancy, 1))), 2, MAX_DEPTH))
+    while True:
+        cell = np.minimum(((P - low) * ((1 << depth) / span)).astype(np.int64), (1 << depth) - 1)
+        keys, inverse, counts = np.unique(cell[:, 0] << depth | cell[:, 1], return_inverse=True,
+                                          return_counts=True)
+        if depth == MAX_DEPTH or float(counts @ counts) <= 2 * occupancy * n:
+            break
+        depth += 1
+
+    # Quadtree, bottom-up: occupied cells per level with mass and centre of
+    # mass, each level from the one below
+    tree = []
+    inverse = inverse.ravel()
+    mass = counts.astype(np.float64)
+    moment = (np.bincount(inverse, weights=z.real, minlength=len(keys))
+              + 1j * np.bincount(inverse, weights=z.imag, minlength=len(keys)))
+    for level in range(depth, 1, -1):
+        coords = np.stack([keys >> level, keys & ((1 << level) - 1)], axis=1)
+        parent_keys, parent = np.unique((coords[:, 0] >> 1) << (level - 1) | (coords[:, 1] >> 1),
+                                        return_inverse=True)
+        tree.append((level, coords, mass, moment / mass, parent.ravel()))
+        mass = np.bincount(parent.ravel(), weights=mass, minlength=len(parent_keys))
+        moment = (np.bincount(parent.ravel(), weights=moment.real, minlength=len(parent_keys))
+                  + 1j * np.bincount(parent.ravel(), weights=moment.imag, minlength=len(parent_keys)))
+        keys = parent_keys
+
+    # Top-down: parent series re-centred on each cell, plus its interaction list
+    local = parent_centre = None
+    for level, coords, mass, com, parent in reversed(tree):
+        size = 1 << level
+        width = size + 4                               # two empty cells of padding on each side
+        lookup = np.full(width * width, -1, dtype=np.int64)
+        lookup[(coords[:, 0] + 2) * width + coords[:, 1] + 2] = np.arange(len(coords))
+        centre = corner + (coords[:, 0] + 0.5 + 1j * (coords[:, 1] + 0.5)) * (span / size)
+        if local is None:
+            local = np.zeros((len(coords), terms), dtype=np.complex128)
+        else:
+            local = _shift(local[parent], centre - parent_centre[parent])
+
+        # Interaction list: m / (z - w) = -sum_k m (z - c)^k / (w - c)^(k+1)
+        child = (coords[:, 0] & 1) * 2 + (coords[:, 1] & 1)
+        candidates = (coords >> 1 << 1)[:, None, :] + _INTERACTION_OFFSETS[child]
+        source = lookup[(candidates[..., 0] + 2) * width + candidates[..., 1] + 2]
+        # Empty cells (-1) pick the zero-mass sentinel at the end
+        source_mass = np.append(mass, 0.0)[source]
+        inverse_distance = 1.0 / (np.append(com, corner - 4 * span)[source] - centre[:, None])
+        term = -source_mass * inverse_distance
+        for k in range(terms):
+            local[:, k] += term.sum(axis=1)
+            term = term * inverse_distance
+        parent_centre = centre
+
+    # Evaluate each node's cell series (Horner), then the near field exactly
+    series = local[inverse]
+    offset = z - centre[inverse]
+    field = series[:, terms - 1]
+    for k in range(terms - 2, -1, -1):
+        field = field * offset + series[:, k]
+    force[:, 0], force[:, 1] = field.real, -field.imag
+
+    i, j = _near_pairs(cell, 1 << depth)
+    delta = P[i] - P[j]
+    dist2 = np.maximum(np.einsum('ij,ij->i', delta, delta), 1e-9)
+    pair = delta / dist2[:, None]
+    for axis in range(2):
+        force[:, axis] += np.bincount(i, weights=pair[:, axis], minlength=n)
+        force[:, axis] -= np.bincount(j, weights=pair[:, axis], minlength=n)
+    return strength * force
+
+
+def attraction(P: np.ndarray, src: np.ndarray, dst: np.ndarray, stiffness: np.ndarray) -> np.ndarray:
+    """Spring forces d^2 * stiffness along the links (stiffness = 1 / l^3)."""
+    delta = P[dst] - P[src]
+    pull = delta * (np.sqrt(np.einsum('ij,ij->i', delta, delta)) * stiffness)[:, None]
+    force = np.zeros_like(P)
+    for axis in range(2):
+        force[:, axis] += np.bincount(src, weights=pull[:, axis], minlength=len(P))
+        force[:, axis] -= np.bincount(dst, weights=pull[:, axis], minlength=len(P))
+    return force
+
+
+def refine(P: np.ndarray, src: np.ndarray, dst: np.ndarray, length: np.ndarray,
+           iterations: int, step: float, tolerance: float = 0.01) -> np.ndarray:
+    """
+    Spring-electrical iterations with Hu's adaptive step length.
+
+    Every node moves `step` along its net force. The step grows after five
+    consecutive iterations that lowered the total force, and shrinks after
+    any that did not; iteration stops early when the average move is
+    below `tolerance` (in units of the natural link length).
+    """
+    stiffness = 1.0 / length ** 3
+    energy, progress = np.inf, 0
+    for _ in range(iterations):
+        force = repulsion(P) + attraction(P, src, dst, stiffness)
+        norm = np.sqrt(np.einsum('ij,ij->i', force, force))
+        moved = step * force / np.maximum(norm, 1e-12)[:, None]
+        P += moved
+        new_energy = float(np.einsum('i,i->', norm, norm))
+        if new_energy < energy:
+            progress += 1
+            if progress >= 5:
+                progress = 0
+                step /= 0.9
+        else:
+            progress = 0
+            step *= 0.9
+        energy = new_energy
+        if np.sqrt(np.einsum('ij,ij->i', moved, moved)).mean() < tolerance:
+            break
+    return P
+
+
+def multilevel_positions(n: int, src: np.ndarray, dst: np.ndarray, length: Optional[np.ndarray] = None,
+                         seed=None, iterations: int = 50, coarse_iterations: int = 300) -> np.ndarray:
+    """
+    Multilevel layout of a graph given as link arrays.
+
+    Args:
+        n: Number of nodes (ids 0..n-1)
+        src, dst: Link endpoint arrays
+        length: Natural length per link (default 1)
+        seed: Random seed (int or np.random.Generator)
+        iterations: Refinement iterations per level (upper bound; fewer on
+                    levels above FULL_REFINEMENT nodes)
+        coarse_iterations: Iterations for the coarsest graph
+
+    Returns:
+        (n, 2) positions, in units of the natural link length
+    """
+    rng = np.random.default_rng(seed)
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    length = np.ones(len(src)) if length is None else np.asarray(length, dtype=np.float64)
+    loops = src != dst
+    src, dst, length = src[loops], dst[loops], length[loops]
+
+    # Coarsening: a stack of (nodes, src, dst, length) plus the group maps
+    levels = [(n, src, dst, length)]
+    groups: List[np.ndarray] = []
+    while levels[-1][0] > COARSEST and len(levels[-1][1]):
+        level_n, level_src, level_dst, level_length = levels[-1]
+        group = match_nodes(level_n, level_src, level_dst, level_length, rng)
+        coarse = coarsen(level_n, level_src, level_dst, level_length, group)
+        if coarse[0] > MIN_REDUCTION * level_n:
+            break
+        groups.append(group)
+        levels.append(coarse)
+
+    # Coarsest graph from random positions, spread over the area it will need
+    level_n, level_src, level_dst, level_length = levels[-1]
+    P = (rng.random((level_n, 2)) - 0.5) * np.sqrt(level_n)
+    P = refine(P, level_src, level_dst, level_length, coarse_iterations, step=0.1 * np.sqrt(level_n) + 1)
+
+    # Prolongation and refinement, coarse to fine. Area grows with the node
+    # count, so parent positions are scaled by sqrt(fine / coarse)
+    for (level_n, level_src, level_dst, level_length), group in zip(levels[-2::-1], groups[::-1]):
+        scale = np.sqrt(level_n / len(P))
+        P = P[group] * scale + rng.normal(scale=0.1, size=(level_n, 2))
+        level_iterations = max(1, round(iterations * min(1.0, math.sqrt(FULL_REFINEMENT / level_n))))
+        P = refine(P, level_src, level_dst, level_length, level_iterations, step=1.0)
+    return P
+
+
+def multilevel_layout(G: nx.Graph, weight: Optional[str] = 'weight', seed=None, iterations: int = 50,
+                      scale: float = 1.0, center=None, dim: int = 2) -> Dict[Hashable, np.ndarray]:
+    """
+    Multilevel Barnes-Hut layout, a drop-in for nx.spring_layout on large graphs.
+
+    Args:
+        G: Network
+        weight: Link latency attribute; links are drawn with a length
+                proportional to latency / median latency (clipped to
+                LENGTH_RANGE). None: all links equally long
+        seed: Random seed
+        iterations: Refinement iterations per level (upper bound; fewer on
+                    levels above FULL_REFINEMENT nodes)
+        scale: Half-width of the output box, as in networkx layouts
+        center: Centre of the output box (default: origin)
+        dim: Only 2 is supported
+
+    Returns:
+        Dictionary node -> position array, like networkx layouts
+    """
+    if dim != 2:
+        raise ValueError("multilevel_layout only supports dim=2")
+    nodes = list(G.nodes())
+    if not nodes:
+        return {}
+    index = {u: k for k, u in enumerate(nodes)}
+    m = G.number_of_edges()
+    links = np.fromiter((index[x] for edge in G.edges() for x in edge), dtype=np.int64,
+                        count=2 * m).reshape(-1, 2)
+    length = None
+    if weight is not None and m:
+        latency = np.fromiter((w for _, _, w in G.edges(data=weight, default=1)), dtype=np.float64, count=m)
+        median = np.median(latency[latency > 0]) if (latency > 0).any() else 1.0
+        length = np.clip(latency / median, *LENGTH_RANGE)
+
+    P = multilevel_positions(len(nodes), links[:, 0], links[:, 1], length, seed=seed, iterations=iterations)
+    P = nx.rescale_layout(P, scale=scale)
+    if center is not None:
+        P += np.asarray(center, dtype=np.float64)
+    return dict(zip(nodes, P))
@@ -0,0 +1,247 @@
+"""
+Network Renderer - batched matplotlib drawing for large meshes.
+
+nx.draw_networkx_edges() builds per-edge colour/width lists in Python, and
+nx.draw_networkx_edge_labels() creates one text artist per edge. That is
+fine for the 10-node lesson graphs but stalls at a few thousand links. This
+renderer draws the same pictures with a constant number of artists:
+
+- all links in ONE PathCollection. A LineCollection would still build one
+  Path object per link in Python, so links are packed instead into a few
+  compound paths (MOVETO/LINETO pairs, 10k links each, one group per
+  colour) straight from NumPy index arrays,
+- all nodes in ONE scatter call,
+- labels by level of detail: every label on small graphs, otherwise only
+  the highest-degree node per grid cell (at most max_labels in total), and
+  link labels only below max_link_labels links,
+- the link and node layers rasterized above `rasterize_above` links, so
+  vector outputs (PDF/SVG) do not carry 200k path objects either.
+
+render_png() draws on a bare Agg Figure (no pyplot, no window), so memory
+is released as soon as the figure is saved.
+
+Example:
+    fig, ax = plt.subplots()
+    draw_network(ax, G, pos, highlight_path=['A', 'C', 'F'])
+
+    render_png(G, "mesh.png", pos=pos, title="200k links")
+"""
+
+import time
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import networkx as nx
+import numpy as np
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PathCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
+from matplotlib.path import Path
+
+from layout_cache import auto_layout
+
+# Backends that render to files only; plt.show() is pointless there
+NON_INTERACTIVE_BACKENDS = {'agg', 'cairo', 'pdf', 'pgf', 'ps', 'svg', 'template'}
+
+
+def graph_arrays(G: nx.Graph, pos: Dict[Hashable, Sequence[float]]):
+    """
+    Node list, (nodes, 2) position array and (src, dst) link index arrays.
+    """
+    nodes = list(G.nodes())
+    index = {u: k for k, u in enumerate(nodes)}
+    positions = np.array([pos[u][:2] for u in nodes], dtype=np.float32).reshape(len(nodes), 2)
+    links = np.fromiter((index[x] for edge in G.edges() for x in edge), dtype=np.int64,
+                        count=2 * G.number_of_edges()).reshape(-1, 2)
+    return nodes, positions, links[:, 0], links[:, 1]
+
+
+def link_collection(positions: np.ndarray, src: np.ndarray, dst: np.ndarray, color='gray',
+                    width: float = 1.0, chunk: int = 10_000, **options) -> PathCollection:
+    """
+    All links (src[k], dst[k]) as one PathCollection of compound paths.
+
+    Links are grouped by colour (one colour or one per link) and packed
+    `chunk` links per Path, which also keeps each path below Agg's cell limit.
+    """
+    colors = to_rgba_array(color)
+    if len(colors) == 1:
+        groups, group_colors = [np.arange(len(src))], colors
+    else:
+        group_colors, inverse = np.unique(colors, axis=0, return_inverse=True)
+        order = np.argsort(inverse.ravel(), kind='stable')
+        groups = np.split(order, np.cumsum(np.bincount(inverse.ravel(), minlength=len(group_colors)))[:-1])
+
+    paths, edgecolors = [], []
+    for links, rgba in zip(groups, group_colors):
+        for start in range(0, len(links), chunk):
+            part = links[start:start + chunk]
+            vertices = np.empty((2 * len(part), 2), dtype=np.float64)
+            vertices[0::2], vertices[1::2] = positions[src[part]], positions[dst[part]]
+            codes = np.empty(2 * len(part), dtype=Path.code_type)
+            codes[0::2], codes[1::2] = Path.MOVETO, Path.LINETO
+            paths.append(Path(vertices, codes))
+            edgecolors.append(rgba)
+    return PathCollection(paths, facecolors='none', edgecolors=edgecolors, linewidths=width, **options)
+
+
+def _auto_node_size(n: int) -> float:
+    return float(np.clip(700 * np.sqrt(10 / max(n, 1)), 1.0, 700.0))
+
+
+def _auto_link_width(m: int) -> float:
+    return float(np.clip(2 * np.sqrt(30 / max(m, 1)), 0.1, 2.0))
+
+
+def label_subset(positions: np.ndarray, degrees: np.ndarray, max_labels: int) -> np.ndarray:
+    """
+    Indices of the nodes to label: the highest-degree node of each cell of a
+    grid with about max_labels cells, so labels are spread out and rarely overlap.
+    """
+    n = len(positions)
+    if n <= max_labels:
+        return np.arange(n)
+    cells = max(1, int(np.sqrt(max_labels)))
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    scaled = (positions - low) / np.maximum(high - low, 1e-12)
+    cell = np.minimum((scaled * cells).astype(np.int64), cells - 1)
+    cell_id = cell[:, 0] * cells + cell[:, 1]
+    # Sort by cell, then degree (descending): the first node of each cell wins
+    order = np.lexsort((-degrees, cell_id))
+    first = np.ones(n, dtype=bool)
+    first[1:] = cell_id[order][1:] != cell_id[order][:-1]
+    chosen = order[first]
+    return chosen[np.argsort(-degrees[chosen], kind='stable')][:max_labels]
+
+
+def draw_network(ax, G: nx.Graph, pos: Dict[Hashable, Sequence[float]],
+                 node_color='lightblue', node_size: Optional[float] = None,
+                 link_color='gray', link_width: Optional[float] = None,
+                 highlight_path: Optional[List[Hashable]] = None, highlight_color: str = 'red',
+                 labels: bool = True, max_labels: int = 200, font_size: Optional[float] = None,
+                 link_labels: Optional[Dict] = None, max_link_labels: int = 150,
+                 rasterize_above: int = 5000, cmap=None):
+    """
+    Draw a network on a matplotlib Axes with a fixed number of artists.
+
+    Args:
+        ax: Matplotlib Axes
+        G: Network
+        pos: Node -> (x, y) position
+        node_color: One colour, or one colour/value per node (in G.nodes() order)
+        node_size: Marker area (default: shrinks with the number of nodes)
+        link_color: One colour, or one colour per link (in G.edges() order)
+        link_width: Line width (default: shrinks with the number of links)
+        highlight_path: Nodes of a route to draw on top in highlight_color
+        highlight_color: Colour of the highlighted route
+        labels: Draw node labels (level of detail: at most max_labels)
+        max_labels: Label budget for large graphs
+        font_size: Label font size (default: smaller for larger graphs)
+        link_labels: Optional {(u, v): text} link labels, drawn only if the
+                     graph has at most max_link_labels links
+        max_link_labels: Link count above which link labels are skipped
+        rasterize_above: Rasterize link and node layers above this many links
+        cmap: Colormap for numeric node colours
+
+    Returns:
+        The node PathCollection (e.g. for a colorbar)
+    """
+    nodes, positions, src, dst = graph_arrays(G, pos)
+    n, m = len(nodes), len(src)
+    rasterized = m > rasterize_above
+    node_size = _auto_node_size(n) if node_size is None else node_size
+    link_width = _auto_link_width(m) if link_width is None else link_width
+
+    ax.add_collection(link_collection(positions, src, dst, link_color, link_width,
+                                      rasterized=rasterized, zorder=1), autolim=False)
+
+    if highlight_path and len(highlight_path) > 1:
+        index = {u: k for k, u in enumerate(nodes)}
+        route = np.array([index[u] for u in highlight_path])
+        ax.add_collection(link_collection(positions, route[:-1], route[1:], highlight_color,
+                                          2 * link_width + 1, zorder=2), autolim=False)
+
+    drawn = ax.scatter(positions[:, 0], positions[:, 1], s=node_size, c=node_color, cmap=cmap,
+                       rasterized=rasterized, zorder=3, linewidths=0)
+    if highlight_path:
+        index = {u: k for k, u in enumerate(nodes)}
+        on_path = positions[[index[u] for u in highlight_path]]
+        ax.scatter(on_path[:, 0], on_path[:, 1], s=node_size * 1.4, c=highlight_color, zorder=4, linewidths=0)
+
+    if labels and n:
+        degrees = np.bincount(np.concatenate([src, dst]), minlength=n)
+        chosen = label_subset(positions, degrees, max_labels)
+        size = font_size or (10 if len(chosen) == n and n <= 50 else 7)
+        for k in chosen.tolist():
+            ax.text(positions[k, 0], positions[k, 1], str(nodes[k]), fontsize=size, fontweight='bold',
+                    ha='center', va='center', zorder=5, clip_on=True)
+
+    if link_labels and m <= max_link_labels:
+        index = {u: k for k, u in enumerate(nodes)}
+        for (u, v), text in link_labels.items():
+            x, y = (positions[index[u]] + positions[index[v]]) / 2
+            ax.text(x, y, text, fontsize=7, ha='center', va='center', zorder=5,
+                    bbox=dict(boxstyle='round,pad=0.2', fc='white', ec='none', alpha=0.8))
+
+    if n:
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        margin = np.maximum((high - low) * 0.05, 1e-3)
+        ax.set_xlim(low[0] - margin[0], high[0] + margin[0])
+        ax.set_ylim(low[1] - margin[1], high[1] + margin[1])
+    ax.axis('off')
+    return drawn
+
+
+def render_png(G: nx.Graph, path: str, pos: Optional[Dict[Hashable, Sequence[float]]] = None,
+               title: Optional[str] = None, figsize=(12, 12), dpi: int = 150, **options) -> Dict:
+    """
+    Render a network straight to an image file on a headless Agg canvas.
+
+    Args:
+        G: Network
+        path: Output file (format from the extension)
+        pos: Node positions (default: the nodes' 'pos' attribute if every
+             node has one, else a cached spring / multilevel layout)
+        title: Optional figure title
+        figsize: Figure size in inches
+        dpi: Output resolution
+        **options: draw_network() options
+
+    Returns:
+        Dictionary with 'path', 'nodes', 'links' and the 'draw' / 'save'
+        times in seconds
+    """
+    if pos is None:
+        pos = default_positions(G)
+    started = time.perf_counter()
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw_figure(fig, G, pos, title, **options)
+    drawn = time.perf_counter()
+    fig.savefig(path, dpi=dpi)
+    return {'path': path, 'nodes': G.number_of_nodes(), 'links': G.number_of_edges(),
+            'draw': drawn - started, 'save': time.perf_counter() - drawn}
+
+
+def draw_figure(fig: Figure, G: nx.Graph, pos: Dict[Hashable, Sequence[float]],
+                title: Optional[str] = None, **options):
+    """Clear a figure and draw the network on one full-size Axes (plus title)."""
+    fig.clear()
+    ax = fig.add_axes((0, 0, 1, 0.95 if title else 1))
+    if title:
+        fig.suptitle(title, fontsize=16, fontweight='bold')
+    return draw_network(ax, G, pos, **options)
+
+
+def interactive_backend() -> bool:
+    """True if pyplot can open windows (False on Agg, PDF, SVG, ... servers)."""
+    return matplotlib.get_backend().lower() not in NON_INTERACTIVE_BACKENDS
+
+
+def default_positions(G: nx.Graph) -> Dict[Hashable, Sequence[float]]:
+    """The nodes' 'pos' attributes if all have one, else a cached layout (see auto_layout)."""
+    pos = nx.get_node_attributes(G, 'pos')
+    if len(pos) == G.number_of_nodes():
+        return pos
+    return auto_layout(G, seed=42)
@@ -9,10 +9,14 @@ This example teaches:
 - Node and edge styling
 """
 
+import os
 import networkx as nx
 import matplotlib.pyplot as plt
 import random
 
+from layout_cache import cached_layout
+from network_renderer import interactive_backend
+
 # Create a sample mesh network
 random.seed(42)
 G = nx.Graph()
@@ -42,9 +46,13 @@ print(f"Creating visualization with {G.number_of_nodes()} nodes and {G.number_of
 fig, axes = plt.subplots(2, 2, figsize=(14, 12))
 fig.suptitle('Mesh Network - Different Layouts', fontsize=16, fontweight='bold')
 
+# The spring layout is the expensive part: compute it once for the three
+# spring plots (set AUTOMESH_LAYOUT_CACHE to also reuse it on the next run)
+spring_pos = cached_layout(G, 'spring', seed=42, k=0.5, iterations=50)
+
 # 1. Spring layout (force-directed)
 ax1 = axes[0, 0]
-pos1 = nx.spring_layout(G, seed=42, k=0.5, iterations=50)
+pos1 = spring_pos
 nx.draw_networkx_nodes(G, pos1, node_color='lightblue', node_size=700, ax=ax1)
 nx.draw_networkx_labels(G, pos1, font_size=10, font_weight='bold', ax=ax1)
 nx.draw_networkx_edges(G, pos1, edge_color='gray', width=2, ax=ax1)
@@ -62,7 +70,7 @@ ax2.axis('off')
 
 # 3. Color nodes by degree (number of connections)
 ax3 = axes[1, 0]
-pos3 = nx.spring_layout(G, seed=42, k=0.5, iterations=50)
+pos3 = spring_pos
 node_degrees = dict(G.degree())
 node_colors = [node_degrees[node] for node in G.nodes()]
 nodes_drawn = nx.draw_networkx_nodes(G, pos3, node_color=node_colors, 
@@ -75,7 +83,7 @@ ax3.axis('off')
 
 # 4. Show edge weights (latencies)
 ax4 = axes[1, 1]
-pos4 = nx.spring_layout(G, seed=42, k=0.5, iterations=50)
+pos4 = spring_pos
 nx.draw_networkx_nodes(G, pos4, node_color='lightyellow', node_size=700, ax=ax4)
 nx.draw_networkx_labels(G, pos4, font_size=10, font_weight='bold', ax=ax4)
 nx.draw_networkx_edges(G, pos4, edge_color='gray', width=2, ax=ax4)
@@ -88,13 +96,16 @@ ax4.axis('off')
 
 plt.tight_layout()
 
-# Save to file
-output_file = '/Users/dally/automesh-learning/04-visualization/network_plot.png'
+# Save to file (next to this script)
+output_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'network_plot.png')
 plt.savefig(output_file, dpi=150, bbox_inches='tight')
 print(f"\n✅ Visualization saved to: {output_file}")
-print("\n💡 Opening plot window... (close it to continue)")
 
-plt.show()
+# Headless (Agg) runs, e.g. on render servers, just keep the saved file
+if interactive_backend():
+    print("\n💡 Opening plot window... (close it to continue)")
+    plt.show()
+plt.close(fig)
 
 print("\n" + "=" * 60)
 print("VISUALIZATION TIPS:")
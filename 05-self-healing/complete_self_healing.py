@@ -10,42 +10,50 @@ This example teaches:
 - Recovery metrics
 """
 
+import os
+import sys
 import networkx as nx
 import random
 
+# Copy-on-write topology versions (06-customization/topology_snapshots.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "06-customization"))
+from topology_snapshots import TrackedGraph, take_snapshot  # noqa: E402
+
 class SelfHealingNetwork:
     """A mesh network that can heal itself when failures occur."""
     
-    def __init__(self, num_nodes, target_degree=3):
-        """Create a mesh network."""
-        self.G = nx.Graph()
+    def __init__(self, num_nodes, target_degree=3, seed=42):
+        """Create a mesh network (own RNG: the global random module is untouched)."""
+        self.G = TrackedGraph()  # nx.Graph that records changes since its last snapshot
         self.failed_nodes = set()
         self.failed_edges = set()
-        self.backup_G = None  # Store original for recovery
+        self.backup_G = None  # Snapshot of the original, for recovery
+        self.layout = None  # IncrementalLayout, created by layout_positions()
         
         # Generate random mesh
-        random.seed(42)
+        rng = random.Random(seed)
         nodes = [f"Node{i}" for i in range(num_nodes)]
         self.G.add_nodes_from(nodes)
         
         # Build connected mesh
         for i in range(1, num_nodes):
-            prev = random.randint(0, i-1)
-            latency = random.randint(5, 30)
+            prev = rng.randint(0, i-1)
+            latency = rng.randint(5, 30)
             self.G.add_edge(nodes[prev], nodes[i], weight=latency)
         
         # Add extra edges
         max_edges = (num_nodes * target_degree) // 2
         attempts = 0
         while self.G.number_of_edges() < max_edges and attempts < num_nodes * 10:
-            n1 = random.choice(nodes)
-            n2 = random.choice(nodes)
+            n1 = rng.choice(nodes)
+            n2 = rng.choice(nodes)
             if n1 != n2 and not self.G.has_edge(n1, n2):
-                self.G.add_edge(n1, n2, weight=random.randint(5, 30))
+                self.G.add_edge(n1, n2, weight=rng.randint(5, 30))
             attempts += 1
         
-        # Backup original topology
-        self.backup_G = self.G.copy()
+        # Backup original topology: a snapshot instead of a full copy; later
+        # failures are only recorded, and backup_G.to_networkx() rebuilds it
+        self.backup_G = take_snapshot(self.G, label="original")
     
     def find_route(self, source, target):
         """Find a route between two nodes."""
@@ -72,9 +80,24 @@ class SelfHealingNetwork:
             return True
         return False
     
+    def layout_positions(self):
+        """
+        Node positions for drawing the current state.
+        
+        The first call lays out the whole network; after failures only the
+        neighbourhood of the failed nodes/links moves, so before/after
+        pictures line up. Needs 04-visualization/incremental_layout.py.
+        """
+        if self.layout is None:
+            sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                         "04-visualization"))
+            from incremental_layout import IncrementalLayout
+            self.layout = IncrementalLayout()
+        return self.layout.update(self.G)
+    
     def get_network_health(self):
         """Calculate network health metrics."""
-        total_nodes = self.backup_G.number_of_nodes()
+        total_nodes = self.backup_G.num_nodes
         active_nodes = self.G.number_of_nodes()
         
         # Check if network is still connected
@@ -26,10 +26,30 @@ This is the foundation for building self-healing mesh networks!
    real-time visualization, and route testing.
 """
 
+import os
+import sys
 import networkx as nx
 import matplotlib.pyplot as plt
+from itertools import islice
 from typing import List, Tuple, Optional, Dict
 
+from fault_tolerance import analyze_fault_tolerance, link_disjoint_paths
+from link_placement import LinkPlacement
+from mesh_metrics import MeshMetricsEngine
+from path_sampling import estimate_path_latency
+from topology_annealing import TopologyAnnealer, apply_links
+from topology_engines import get_engine
+from topology_pareto import ParetoSearch
+from topology_tempering import parallel_tempering
+from topology_snapshots import TopologySnapshot, TrackedGraph, diff_snapshots, take_snapshot
+from topology_store import open_topology, save_topology
+
+# Layout cache and batched renderer live with the visualization lesson
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "04-visualization"))
+from html_export import export_network_html  # noqa: E402
+from incremental_layout import IncrementalLayout  # noqa: E402
+from network_renderer import draw_network, interactive_backend  # noqa: E402
+
 class CustomNetworkBuilder:
     """
     A tool for building custom MESH networks with full control.
@@ -49,7 +69,10 @@ class CustomNetworkBuilder:
     
     def __init__(self):
         """Initialize an empty mesh network."""
-        self.G = nx.Graph()
+        self.G = TrackedGraph()
+        self._last_snapshot: Optional[TopologySnapshot] = None
+        # Positions survive edits: visualize() only moves what changed
+        self._layout = IncrementalLayout(k=1, iterations=50)
         print("✅ Created new empty mesh network")
     
     def add_node(self, node_name: str, **attributes):
@@ -155,6 +178,45 @@ class CustomNetworkBuilder:
                 bandwidth = attrs.pop('bandwidth', None)
                 self.add_link(node1, node2, latency=latency, bandwidth=bandwidth, **attrs)
     
+    def add_links_from_arrays(self, src, dst, latency=None, bandwidth=None,
+                              names: Optional[List[str]] = None, **columns):
+        """
+        Bulk-add links from parallel arrays (no per-link checks or output).
+        
+        Meant for large generated or loaded topologies where add_link() would
+        be far too slow.
+        
+        Args:
+            src: Array of first endpoints (node ids if names is given, else node names)
+            dst: Array of second endpoints
+            latency: Optional array (or scalar) of link latencies
+            bandwidth: Optional array (or scalar) of bandwidths
+            names: Optional list mapping node ids to node names
+            **columns: Other per-link attribute arrays
+        
+        Example:
+            builder.add_links_from_arrays(src_ids, dst_ids, latency=lat, names=router_names)
+        """
+        src = src.tolist() if hasattr(src, 'tolist') else list(src)
+        dst = dst.tolist() if hasattr(dst, 'tolist') else list(dst)
+        if names is not None:
+            src = [names[i] for i in src]
+            dst = [names[i] for i in dst]
+        
+        attr_columns = {'weight': latency, 'bandwidth': bandwidth, **columns}
+        keys, values = [], []
+        for key, column in attr_columns.items():
+            if column is None:
+                continue
+            keys.append(key)
+            values.append(column.tolist() if hasattr(column, 'tolist') else column)
+        values = [column if isinstance(column, list) else [column] * len(src) for column in values]
+        
+        self.G.add_edges_from(
+            (u, v, dict(zip(keys, attrs))) for u, v, *attrs in zip(src, dst, *values)
+        )
+        print(f"✅ Added {len(src)} links (total: {self.G.number_of_edges()})")
+    
     def remove_node(self, node_name: str):
         """Remove a node and all its connections."""
         if node_name in self.G.nodes():
@@ -323,21 +385,27 @@ class CustomNetworkBuilder:
         
         redundant_paths = 0
         for source, target in sample_pairs[:5]:  # Check up to 5 pairs
-            try:
-                # Count number of simple paths
-                paths = list(nx.all_simple_paths(self.G, source, target, cutoff=len(nodes_list)))
-                if len(paths) >= 2:  # At least 2 different paths
-                    redundant_paths += 1
-            except:
-                pass
+            # Only need to know whether a second simple path exists
+            paths = list(islice(nx.all_simple_paths(self.G, source, target, cutoff=len(nodes_list)), 2))
+            if len(paths) >= 2:  # At least 2 different paths
+                redundant_paths += 1
         
         # At least 60% of checked pairs should have redundancy
         return redundant_paths >= max(1, len(sample_pairs) * 0.6) if sample_pairs else True
     
-    def get_mesh_metrics(self) -> Dict:
+    def get_mesh_metrics(self, latency: bool = False, workers: Optional[int] = None) -> Dict:
         """
         Calculate mesh network specific metrics.
         
+        Diameter, radius and average path length all come from a single
+        all-pairs sweep (see mesh_metrics.MeshMetricsEngine). The redundancy
+        ratio is the average number of link-disjoint paths between sampled
+        node pairs (fault_tolerance.link_disjoint_paths).
+        
+        Args:
+            latency: Also compute latency-weighted diameter and average latency
+            workers: Worker processes for the sweep (default: all cores)
+        
         Returns:
             Dictionary with mesh network metrics
         """
@@ -348,8 +416,12 @@ class CustomNetworkBuilder:
             'avg_degree': 0.0,
             'redundancy_ratio': 0.0,
             'diameter': 0,
+            'radius': 0,
             'average_path_length': 0.0,
-            'node_fault_tolerance': 0
+            'node_connectivity': 0,
+            'edge_connectivity': 0,
+            'node_fault_tolerance': 0,
+            'link_fault_tolerance': 0
         }
         
         if self.G.number_of_nodes() == 0:
@@ -364,45 +436,325 @@ class CustomNetworkBuilder:
             metrics['avg_degree'] = sum(degrees.values()) / len(degrees)
         
         if metrics['is_connected']:
-            metrics['diameter'] = nx.diameter(self.G)
-            metrics['average_path_length'] = nx.average_shortest_path_length(self.G)
+            sweep = MeshMetricsEngine(self.G, workers=workers).sweep(latency=latency)
+            metrics['diameter'] = sweep['diameter']
+            metrics['radius'] = sweep['radius']
+            metrics['average_path_length'] = sweep['average_path_length']
+            if latency:
+                metrics['latency_diameter'] = sweep['latency_diameter']
+                metrics['average_latency'] = sweep['average_latency']
             
-            # Calculate redundancy ratio (average paths between nodes)
+            # Calculate redundancy ratio (average link-disjoint paths between
+            # sampled node pairs - one small max-flow each, unlike counting
+            # simple paths, of which dense meshes have exponentially many)
             nodes_list = list(self.G.nodes())
-            total_paths = 0
-            checked_pairs = 0
-            
-            for i in range(min(10, len(nodes_list))):
-                for j in range(i+1, min(i+6, len(nodes_list))):
-                    if j < len(nodes_list):
-                        try:
-                            paths = list(nx.all_simple_paths(
-                                self.G, nodes_list[i], nodes_list[j], 
-                                cutoff=metrics['diameter'] + 2
-                            ))
-                            total_paths += len(paths)
-                            checked_pairs += 1
-                        except:
-                            pass
-            
-            if checked_pairs > 0:
-                metrics['redundancy_ratio'] = total_paths / checked_pairs
+            pairs = [(nodes_list[i], nodes_list[j])
+                     for i in range(min(10, len(nodes_list)))
+                     for j in range(i+1, min(i+6, len(nodes_list)))]
+            if pairs:
+                metrics['redundancy_ratio'] = sum(link_disjoint_paths(self.G, pairs)) / len(pairs)
             
-            # Node fault tolerance: how many nodes can fail before disconnection
-            # Simplified: minimum node cut size
-            try:
-                if len(nodes_list) > 2:
-                    # Approximate: check if removing any single node keeps network connected
-                    fault_tolerant = sum(
-                        1 for node in nodes_list[:min(10, len(nodes_list))]
-                        if nx.is_connected(self.G.subgraph([n for n in nodes_list if n != node]))
-                    )
-                    metrics['node_fault_tolerance'] = fault_tolerant
-            except:
-                pass
+            # Fault tolerance: how many arbitrary failures the mesh always survives
+            # (exact vertex/edge connectivity, see fault_tolerance.py)
+            tolerance = analyze_fault_tolerance(self.G)
+            metrics['node_connectivity'] = tolerance['node_connectivity']
+            metrics['edge_connectivity'] = tolerance['edge_connectivity']
+            metrics['node_fault_tolerance'] = tolerance['survivable_node_failures']
+            metrics['link_fault_tolerance'] = tolerance['survivable_link_failures']
         
         return metrics
     
+    def get_fault_tolerance(self) -> Dict:
+        """
+        Exact fault tolerance with witnesses.
+        
+        Returns:
+            Dictionary with 'node_connectivity', 'edge_connectivity',
+            'survivable_node_failures', 'survivable_link_failures' and the
+            minimum cut sets 'min_node_cut' / 'min_edge_cut' - the routers or
+            links whose failure would split the network.
+        
+        Example:
+            tolerance = builder.get_fault_tolerance()
+            print(f"Weakest point: {tolerance['min_node_cut']}")
+        """
+        return analyze_fault_tolerance(self.G)
+    
+    def estimate_path_latency(self, rel_error: float = 0.05, **options) -> Dict:
+        """
+        Estimate path latency statistics by sampling source nodes.
+        
+        Much cheaper than exact all-pairs metrics on very large meshes:
+        Dijkstra runs from random pivots (in parallel) until the confidence
+        intervals are within rel_error of the estimates.
+        
+        Args:
+            rel_error: Target relative half-width of the confidence intervals
+            **options: See path_sampling.estimate_path_latency (seed, workers,
+                       confidence, max_sources, time_budget, ...)
+        
+        Returns:
+            Dictionary with 'mean', 'p50', 'p95', 'p99' (each with a '_ci'
+            interval), 'max_lower'/'max_upper' and 'sources_used'
+        
+        Example:
+            stats = builder.estimate_path_latency(rel_error=0.02, seed=1)
+            print(f"p99 latency: {stats['p99']}ms (CI {stats['p99_ci']})")
+        """
+        return estimate_path_latency(self.G, rel_error=rel_error, **options)
+    
+    def suggest_links(self, k: int, apply: bool = False, latency: float = 10.0,
+                      **options) -> Dict:
+        """
+        Suggest the k new links that best protect against single failures.
+        
+        Scores a design by the router pairs disconnected over all single
+        link and single router failures, and picks links greedily with lazy
+        (CELF) evaluation on the block-cut tree (see link_placement.py).
+        Fast enough for 5k-node designs.
+        
+        Args:
+            k: Link budget
+            apply: Add the suggested links to the network
+            latency: Latency of added links in ms (when apply=True)
+            **options: See link_placement.LinkPlacement (candidate_links,
+                       link_weight, node_weight, max_candidates, seed)
+        
+        Returns:
+            Dictionary with 'links' [(u, v, gain), ...], 'before' and 'after'
+            resilience scores, and 'evaluations' (candidate gains computed)
+        
+        Example:
+            result = builder.suggest_links(3)
+            for u, v, gain in result['links']:
+                print(f"{u} - {v}: {gain:.0f} fewer disconnected pairs")
+        """
+        placement = LinkPlacement(self.G, **options)
+        links = placement.suggest(k)
+        if apply:
+            for u, v, _ in links:
+                self.add_link(u, v, latency=latency)
+        before, after = placement.history[0]['scores'], placement.history[-1]['scores']
+        print(f"✅ Suggested {len(links)} links: bridges {before['bridges']} -> {after['bridges']}, "
+              f"cut vertices {before['cut_vertices']} -> {after['cut_vertices']}")
+        return {'links': links, 'before': before, 'after': after, 'evaluations': placement.evaluations}
+    
+    def save(self, path: str):
+        """
+        Save the network in the compact binary topology format.
+        
+        Node names are interned, links stored as CSR arrays and attributes
+        column by column (see topology_store.py). Much smaller and faster
+        to load than JSON for large topologies.
+        
+        Args:
+            path: Output file path (e.g., "campus.mesh")
+        
+        Example:
+            builder.save("06-customization/campus.mesh")
+        """
+        save_topology(self.G, path)
+        print(f"✅ Saved network to: {path} ({self.G.number_of_nodes()} nodes, "
+              f"{self.G.number_of_edges()} links)")
+    
+    @classmethod
+    def load(cls, path: str) -> 'CustomNetworkBuilder':
+        """
+        Load a network saved with save().
+        
+        The file is memory-mapped; use topology_store.open_topology() directly
+        to inspect a huge topology lazily without building the graph.
+        
+        Args:
+            path: File written by save()
+        
+        Returns:
+            A new CustomNetworkBuilder holding the network
+        
+        Example:
+            builder = CustomNetworkBuilder.load("06-customization/campus.mesh")
+        """
+        builder = cls()
+        builder.G = open_topology(path).to_networkx(create_using=TrackedGraph)
+        print(f"✅ Loaded network from: {path} ({builder.G.number_of_nodes()} nodes, "
+              f"{builder.G.number_of_edges()} links)")
+        return builder
+    
+    def snapshot(self, label: Optional[str] = None) -> TopologySnapshot:
+        """
+        Take a copy-on-write snapshot of the current network.
+        
+        Only the nodes/links changed since the previous snapshot are copied;
+        everything else is shared, so keeping many versions is cheap.
+        
+        Args:
+            label: Optional name for the snapshot
+        
+        Returns:
+            TopologySnapshot (pass it to diff() or restore())
+        
+        Example:
+            before = builder.snapshot("baseline")
+            builder.add_link("Router1", "Router4", latency=12.0)
+            print(builder.diff(before)['added_links'])
+        """
+        self._last_snapshot = take_snapshot(self.G, base=self._last_snapshot, label=label)
+        print(f"✅ Snapshot taken: {self._last_snapshot}")
+        return self._last_snapshot
+    
+    def diff(self, old: TopologySnapshot, new: Optional[TopologySnapshot] = None) -> Dict:
+        """
+        Compare two snapshots (or a snapshot against the current network).
+        
+        Args:
+            old: Earlier snapshot
+            new: Later snapshot (default: the network as it is now)
+        
+        Returns:
+            Dictionary with 'added_nodes', 'removed_nodes', 'changed_nodes',
+            'added_links', 'removed_links' and 'changed_links'
+        """
+        if new is None:
+            new = self._last_snapshot = take_snapshot(self.G, base=self._last_snapshot)
+        return diff_snapshots(old, new)
+    
+    def restore(self, snapshot: TopologySnapshot):
+        """
+        Roll the network back (or forward) to a snapshot.
+        
+        Example:
+            checkpoint = builder.snapshot()
+            builder.remove_node("Router2")
+            builder.restore(checkpoint)
+        """
+        self.G = snapshot.to_networkx(create_using=TrackedGraph)
+        self.G.track_from(snapshot)
+        self._last_snapshot = snapshot
+        print(f"✅ Restored network to {snapshot}")
+    
+    def optimize_topology(self, iterations: int = 5000, seed: Optional[int] = None,
+                          initial_temp: Optional[float] = None, cooling_rate: float = 0.999,
+                          schedule=None, stopping=None, checkpoint: Optional[str] = None,
+                          checkpoint_interval: float = 60.0, replicas: int = 1,
+                          exchange_interval: int = 50, verbose: bool = True,
+                          engine: str = 'annealing', **options) -> Dict:
+        """
+        Improve the network with simulated annealing over link additions/removals.
+        
+        Cost = average path latency + link_cost per link + a penalty for nodes
+        below min_degree. Moves are delta-evaluated (see topology_annealing.py),
+        so thousands of iterations are practical on 500-node meshes. Removals
+        that would disconnect the network are never made. The best topology
+        found replaces the current links.
+        
+        With replicas > 1 it runs parallel tempering instead: one chain per
+        temperature in its own process, swapping states between neighbouring
+        temperatures every exchange_interval moves (see topology_tempering.py).
+        
+        engine='tabu' or engine='genetic' runs one of the other engines of
+        topology_engines.py for `iterations` steps instead (compare_engines()
+        there tells which one is fastest for a network size). The annealing
+        options (initial_temp, schedule, stopping, checkpoint, replicas) do
+        not apply to them and raise ValueError.
+        
+        Args:
+            iterations: Number of moves to try (per chain)
+            seed: Random seed
+            initial_temp: Starting (or hottest replica's) temperature (default: estimated)
+            cooling_rate: Temperature multiplier per iteration (single chain only)
+            schedule: Cooling schedule name or object, single chain only
+                      (see 02-optimization/cooling_schedules.py)
+            stopping: StoppingRule for reheating and early stopping (single chain
+                      only; default: stop after 1000 iterations without improvement)
+            checkpoint: Checkpoint file; written every checkpoint_interval seconds,
+                        resumed from if it exists (same network, options, seed
+                        and schedule only) and deleted when the run finishes
+                        (single chain only)
+            checkpoint_interval: Minimum seconds between checkpoints
+            replicas: Number of parallel tempering chains/processes
+            exchange_interval: Moves per chain between swap attempts
+            verbose: Print progress
+            engine: 'annealing', 'tabu' or 'genetic'
+            **options: See topology_annealing.TopologyAnnealer (cache_size),
+                       topology_engines (neighbourhood, tenure, population, ...) and
+                       TopologyState (candidate_links, link_cost, min_degree,
+                       degree_penalty, default_latency, ...)
+        
+        Returns:
+            Dictionary with 'initial_cost', 'best_cost', 'best_average_latency',
+            'links', 'iterations', 'elapsed', 'added' and 'removed', plus
+            'stop_reason'/'best_iteration'/'reheats'/'cache_hit_rate' for a
+            single chain and 'swap_rates'/'temperatures'/'cache_hit_rate' for
+            parallel tempering
+        
+        Example:
+            result = builder.optimize_topology(iterations=3000, link_cost=2.0, seed=1)
+            print(f"Cost {result['initial_cost']:.1f} -> {result['best_cost']:.1f}")
+            
+            result = builder.optimize_topology(iterations=3000, replicas=16, seed=1)
+            print(f"Swap rates: {result['swap_rates']}")
+        """
+        if engine != 'annealing':
+            annealing_only = {'initial_temp': initial_temp is not None, 'schedule': schedule is not None,
+                              'stopping': stopping is not None, 'checkpoint': checkpoint is not None,
+                              'replicas': replicas != 1}
+            given = [name for name, used in annealing_only.items() if used]
+            if given:
+                raise ValueError(f"{', '.join(given)} only apply to engine='annealing', not '{engine}'")
+            result = get_engine(engine)(self.G, seed=seed, **options).run(iterations=iterations)
+        elif replicas > 1:
+            result = parallel_tempering(self.G, replicas=replicas,
+                                        rounds=-(-iterations // exchange_interval),
+                                        exchange_interval=exchange_interval, t_max=initial_temp,
+                                        seed=seed, verbose=verbose, **options)
+        else:
+            annealer = TopologyAnnealer(self.G, seed=seed, **options)
+            result = annealer.run(iterations=iterations, initial_temp=initial_temp,
+                                  cooling_rate=cooling_rate, schedule=schedule,
+                                  stopping=stopping, checkpoint=checkpoint,
+                                  checkpoint_interval=checkpoint_interval, verbose=verbose)
+        result['added'], result['removed'] = apply_links(self.G, result['links'])
+        print(f"✅ Optimized topology: cost {result['initial_cost']:.2f} -> {result['best_cost']:.2f} "
+              f"(+{result['added']} / -{result['removed']} links, {result['elapsed']:.1f}s)")
+        return result
+    
+    def pareto_search(self, population: int = 200, generations: int = 100,
+                      seed: Optional[int] = None, verbose: bool = True, **options) -> Dict:
+        """
+        Find the trade-off curve between latency, link count and resilience.
+        
+        Runs NSGA-II (see topology_pareto.py): every design is scored on
+        average path latency, number of links and router pairs disconnected
+        by single link/router failures, and the search returns the designs
+        no other design beats on all three. Each generation is evaluated as
+        one batch over a process pool. The network itself is not changed;
+        pick a design and apply it with topology_annealing.apply_links.
+        
+        Args:
+            population: Designs per generation
+            generations: Number of generations
+            seed: Random seed
+            verbose: Print progress
+            **options: See topology_pareto.ParetoSearch (candidate_links,
+                       default_latency, crossover_rate, mutation_flips,
+                       workers)
+        
+        Returns:
+            Dictionary with 'front' (designs sorted by link count, each with
+            'links', 'num_links', 'average_latency' and 'disconnected_pairs'),
+            'front_sizes', 'generations', 'evaluations' and 'elapsed'
+        
+        Example:
+            result = builder.pareto_search(population=100, generations=50, seed=1)
+            robust = [d for d in result['front'] if d['disconnected_pairs'] == 0]
+            apply_links(builder.G, min(robust, key=lambda d: d['num_links'])['links'])
+        """
+        search = ParetoSearch(self.G, population=population, seed=seed, **options)
+        result = search.run(generations=generations, verbose=verbose)
+        print(f"✅ Pareto front: {len(result['front'])} designs from {result['evaluations']} "
+              f"evaluations ({result['elapsed']:.1f}s)")
+        return result
+    
     def get_network_info(self):
         """Print comprehensive mesh network information."""
         print("\n" + "=" * 70)
@@ -421,8 +773,11 @@ class CustomNetworkBuilder:
         
         if mesh_metrics['is_connected']:
             print(f"   Network Diameter: {mesh_metrics['diameter']} hops")
+            print(f"   Network Radius: {mesh_metrics['radius']} hops")
             print(f"   Average Path Length: {mesh_metrics['average_path_length']:.2f} hops")
             print(f"   Redundancy Ratio: {mesh_metrics['redundancy_ratio']:.2f} paths/node-pair")
+            print(f"   Survives Any: {mesh_metrics['node_fault_tolerance']} node / "
+                  f"{mesh_metrics['link_fault_tolerance']} link failure(s)")
             
             if mesh_metrics['min_degree'] < 2:
                 print(f"\n⚠️  WARNING: Some nodes have degree < 2. This reduces mesh redundancy!")
@@ -464,7 +819,7 @@ class CustomNetworkBuilder:
             return None, float('inf')
     
     def visualize(self, title: str = "Custom Network", save_path: Optional[str] = None,
-                  highlight_path: Optional[List[str]] = None):
+                  highlight_path: Optional[List[str]] = None, show: bool = True):
         """
         Visualize the network with matplotlib.
         
@@ -472,6 +827,8 @@ class CustomNetworkBuilder:
             title: Plot title
             save_path: Optional path to save the image
             highlight_path: Optional list of nodes to highlight as a path
+            show: Open a plot window (skipped anyway on headless backends
+                  such as Agg; see batch_render.py for bulk rendering)
         """
         if self.G.number_of_nodes() == 0:
             print("⚠️  Cannot visualize: network is empty")
@@ -480,63 +837,32 @@ class CustomNetworkBuilder:
         fig, axes = plt.subplots(1, 2, figsize=(16, 7))
         fig.suptitle(title, fontsize=16, fontweight='bold')
         
-        # Use spring layout for both
-        pos = nx.spring_layout(self.G, seed=42, k=1, iterations=50)
+        # Same layout for both. After edits only the changed neighbourhood
+        # moves, so successive pictures stay comparable (incremental_layout.py)
+        pos = self._layout.update(self.G)
         
-        # Left plot: Basic network
+        # Left plot: Basic network, with the path highlighted if provided.
+        # draw_network batches all links/nodes into single artists, so this
+        # stays fast on meshes with thousands of links (see network_renderer.py)
         ax1 = axes[0]
-        node_colors = ['lightblue'] * self.G.number_of_nodes()
-        node_sizes = [700] * self.G.number_of_nodes()
-        
-        # Highlight path if provided
-        if highlight_path:
-            path_set = set(highlight_path)
-            node_colors = ['red' if node in path_set else 'lightblue' 
-                          for node in self.G.nodes()]
-            node_sizes = [1000 if node in path_set else 700 
-                         for node in self.G.nodes()]
-        
-        nx.draw_networkx_nodes(self.G, pos, node_color=node_colors, 
-                              node_size=node_sizes, ax=ax1)
-        nx.draw_networkx_labels(self.G, pos, font_size=10, font_weight='bold', ax=ax1)
-        
-        # Highlight path edges
-        edge_colors = ['gray'] * self.G.number_of_edges()
-        edge_widths = [2] * self.G.number_of_edges()
-        
-        if highlight_path and len(highlight_path) > 1:
-            path_edges = [(highlight_path[i], highlight_path[i+1]) 
-                         for i in range(len(highlight_path)-1)]
-            edge_colors = ['red' if (u, v) in path_edges or (v, u) in path_edges 
-                          else 'gray' for u, v in self.G.edges()]
-            edge_widths = [4 if (u, v) in path_edges or (v, u) in path_edges 
-                          else 2 for u, v in self.G.edges()]
-        
-        nx.draw_networkx_edges(self.G, pos, edge_color=edge_colors, 
-                              width=edge_widths, ax=ax1)
+        draw_network(ax1, self.G, pos, highlight_path=highlight_path)
         ax1.set_title('Network Topology')
-        ax1.axis('off')
         
-        # Right plot: With edge weights
+        # Right plot: With edge weights (labels are skipped on large meshes)
         ax2 = axes[1]
-        nx.draw_networkx_nodes(self.G, pos, node_color='lightgreen', 
-                              node_size=700, ax=ax2)
-        nx.draw_networkx_labels(self.G, pos, font_size=10, font_weight='bold', ax=ax2)
-        nx.draw_networkx_edges(self.G, pos, edge_color='gray', width=2, ax=ax2)
-        
-        # Add edge labels
         edge_labels = {}
-        for u, v, data in self.G.edges(data=True):
-            weight = data.get('weight', 'N/A')
-            bandwidth = data.get('bandwidth', None)
-            label = f"{weight}ms"
-            if bandwidth:
-                label += f"\n{bandwidth}Mbps"
-            edge_labels[(u, v)] = label
-        
-        nx.draw_networkx_edge_labels(self.G, pos, edge_labels, font_size=8, ax=ax2)
+        if self.G.number_of_edges() <= 150:
+            for u, v, data in self.G.edges(data=True):
+                weight = data.get('weight', 'N/A')
+                bandwidth = data.get('bandwidth', None)
+                label = f"{weight}ms"
+                if bandwidth:
+                    label += f"\n{bandwidth}Mbps"
+                edge_labels[(u, v)] = label
+        
+        draw_network(ax2, self.G, pos, node_color='lightgreen', link_labels=edge_labels,
+                     max_link_labels=150)
         ax2.set_title('With Link Properties')
-        ax2.axis('off')
         
         plt.tight_layout()
         
@@ -544,8 +870,48 @@ class CustomNetworkBuilder:
             plt.savefig(save_path, dpi=150, bbox_inches='tight')
             print(f"\n✅ Visualization saved to: {save_path}")
         
-        print("\n💡 Opening plot window... (close it to continue)")
-        plt.show()
+        if show and interactive_backend():
+            print("\n💡 Opening plot window... (close it to continue)")
+            plt.show()
+        plt.close(fig)
+    
+    def export_html(self, path: str = "mesh_network.html", title: str = "Custom Network",
+                    highlight_path: Optional[List[str]] = None,
+                    routes: Optional[Dict[str, List[str]]] = None, **options) -> Optional[Dict]:
+        """
+        Save an interactive WebGL view of the network as one HTML file.
+        
+        Pan/zoom, hover info per node (degree, mean link latency) and routes
+        drawn on top. Links are stored as compact typed arrays and thinned
+        out when zoomed out, so 100k-link meshes stay responsive (see
+        04-visualization/html_export.py). Needs plotly.
+        
+        Args:
+            path: Output .html file
+            title: Page title
+            highlight_path: Optional list of nodes to highlight as a route
+            routes: More routes, {legend name: list of nodes}
+            **options: export_network_html() options (max_links, include_plotlyjs, ...)
+        
+        Returns:
+            Dictionary with 'path', 'nodes', 'links' and 'bytes', or None
+        
+        Example:
+            path, _ = builder.find_route("R1", "R9")
+            builder.export_html("campus.html", highlight_path=path)
+        """
+        if self.G.number_of_nodes() == 0:
+            print("⚠️  Cannot export: network is empty")
+            return None
+        try:
+            # Same positions as visualize()
+            info = export_network_html(self.G, path, pos=self._layout.update(self.G), title=title,
+                                       highlight_path=highlight_path, routes=routes, **options)
+        except ImportError as error:
+            print(f"⚠️  {error}")
+            return None
+        print(f"✅ Interactive view saved to: {path} ({info['bytes'] / 2**20:.1f} MB)")
+        return info
 
 
 # ============================================================================
@@ -0,0 +1,499 @@
+"""
+Fault Tolerance - exact vertex and edge connectivity with min-cut witnesses.
+
+How many failures can a mesh ALWAYS survive?
+
+- Node connectivity k: the fewest routers whose failure disconnects the
+  mesh. Any k - 1 router failures are survivable.
+- Edge connectivity l: the same for links. Any l - 1 link failures are
+  survivable.
+
+Both come with a witness: an actual minimum set of routers (or links) whose
+failure splits the network, so you know exactly where to add redundancy.
+
+How it stays fast:
+1. Sparsification - connectivity never exceeds the minimum degree d, and
+   the union of d breadth-first forests (a sparse certificate) has the same
+   connectivity as the full graph with at most d * (n - 1) links.
+2. Unit-capacity max-flow with a cutoff - we only need to know whether
+   fewer than the best-so-far disjoint paths exist, so each flow stops early.
+   Augmenting paths are found with bidirectional BFS, which touches only a
+   small neighbourhood of the two endpoints in a well-connected mesh.
+3. Few flows - the Esfahanian-Hakimi scheme fixes one minimum-degree node
+   (vertex case) or a dominating set (edge case) instead of all node pairs,
+   and a node with enough already-verified neighbours needs no flow at all.
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+
+Arc = Tuple[int, int]
+
+FAN_BUDGET = 32  # nodes a local fan search may explore per path
+
+
+def sparse_certificate(G: nx.Graph, k: int) -> nx.Graph:
+    """
+    Union of k breadth-first (scan-first search) spanning forests.
+
+    The result has at most k * (n - 1) links and is k-vertex-connected
+    (and k-edge-connected) exactly when G is.
+
+    Args:
+        G: Undirected network
+        k: Connectivity level to preserve
+    """
+    H = nx.Graph()
+    H.add_nodes_from(G.nodes())
+    remaining = {u: set(G.adj[u]) - {u} for u in G.nodes()}
+
+    for _ in range(k):
+        marked: Set[Hashable] = set()
+        added = False
+        for root in G.nodes():
+            if root in marked:
+                continue
+            marked.add(root)
+            queue = deque([root])
+            while queue:
+                u = queue.popleft()
+                for v in list(remaining[u]):
+                    if v not in marked:
+                        marked.add(v)
+                        queue.append(v)
+                        H.add_edge(u, v)
+                        remaining[u].discard(v)
+                        remaining[v].discard(u)
+                        added = True
+        if not added:
+            break
+
+    return H
+
+
+class _UnitFlow:
+    """
+    Unit-capacity max-flow on a fixed directed graph given as successor and
+    predecessor lists. Flow state is a set of arcs carrying flow, so starting
+    a new flow costs nothing.
+
+    With split=True the graph is a vertex-split graph (node i -> in 2i,
+    out 2i + 1): only the in -> out arcs have capacity 1, link arcs are
+    uncapacitated so that minimum cuts consist of nodes only.
+    """
+
+    def __init__(self, succ: List[List[int]], pred: List[List[int]], split: bool = False):
+        self.succ = succ
+        self.pred = pred
+        self.split = split
+
+    def _has_room(self, flow: Set[Arc], a: int, b: int) -> bool:
+        if (a, b) not in flow:
+            return True
+        return self.split and not (a % 2 == 0 and b == a + 1)
+
+    def _residual_out(self, flow: Set[Arc], a: int):
+        for b in self.succ[a]:
+            if self._has_room(flow, a, b):
+                yield b
+        for b in self.pred[a]:
+            if (b, a) in flow:
+                yield b
+
+    def _residual_in(self, flow: Set[Arc], b: int):
+        for a in self.pred[b]:
+            if self._has_room(flow, a, b):
+                yield a
+        for a in self.succ[b]:
+            if (b, a) in flow:
+                yield a
+
+    def _find_path(self, flow: Set[Arc], s: int, t: int):
+        """
+        Bidirectional BFS in the residual graph.
+
+        Returns:
+            ('path', arcs) if an augmenting path exists, otherwise
+            ('source', reached) or ('sink', reached) naming the side whose
+            search was exhausted and the nodes it reached.
+        """
+        fwd = {s: None}
+        bwd = {t: None}
+        fwd_frontier = [s]
+        bwd_frontier = [t]
+        meet = None
+
+        while meet is None:
+            if not fwd_frontier:
+                return 'source', fwd
+            if not bwd_frontier:
+                return 'sink', bwd
+            forward = len(fwd_frontier) <= len(bwd_frontier)
+            frontier, seen, other = (fwd_frontier, fwd, bwd) if forward else (bwd_frontier, bwd, fwd)
+            step = self._residual_out if forward else self._residual_in
+            nxt = []
+            for a in frontier:
+                for b in step(flow, a):
+                    if b not in seen:
+                        seen[b] = a
+                        nxt.append(b)
+                        if b in other:
+                            meet = b
+                            break
+                if meet is not None:
+                    break
+            if forward:
+                fwd_frontier = nxt
+            else:
+                bwd_frontier = nxt
+
+        arcs = []
+        node = meet
+        while fwd[node] is not None:
+            arcs.append((fwd[node], node))
+            node = fwd[node]
+        arcs.reverse()
+        node = meet
+        while bwd[node] is not None:
+            arcs.append((node, bwd[node]))
+            node = bwd[node]
+        return 'path', arcs
+
+    def fan(self, s: int, is_target, cutoff: int, budget: int) -> bool:
+        """
+        Look for `cutoff` disjoint paths from s to a set of target nodes,
+        exploring at most `budget` nodes per path (a purely local search).
+
+        Returns:
+            True if the paths were found, False if not or over budget
+        """
+        flow: Set[Arc] = set()
+        for _ in range(cutoff):
+            parent = {s: None}
+            frontier = [s]
+            end = None
+            while frontier and end is None:
+                nxt = []
+                for a in frontier:
+                    for b in self._residual_out(flow, a):
+                        if b not in parent:
+                            parent[b] = a
+                            if is_target(b):
+                                end = b
+                                break
+                            nxt.append(b)
+                    if end is not None:
+                        break
+                if len(parent) > budget:
+                    return False
+                frontier = nxt
+            if end is None:
+                return False
+            while parent[end] is not None:
+                a = parent[end]
+                if (end, a) in flow:
+                    flow.discard((end, a))
+                else:
+                    flow.add((a, end))
+                end = a
+        return True
+
+    def max_flow(self, s: int, t: int, cutoff: int) -> Tuple[int, str, Dict]:
+        """
+        Push up to `cutoff` units of flow from s to t.
+
+        Returns:
+            Tuple of (flow value, exhausted side or 'cutoff', reached nodes)
+        """
+        flow: Set[Arc] = set()
+        value = 0
+        while value < cutoff:
+            kind, result = self._find_path(flow, s, t)
+            if kind != 'path':
+                return value, kind, result
+            for a, b in result:
+                if (b, a) in flow:
+                    flow.discard((b, a))
+                else:
+                    flow.add((a, b))
+            value += 1
+        return value, 'cutoff', {}
+
+
+class _NodeCutSearch:
+    """Local minimum vertex cuts between node pairs of one graph."""
+
+    def __init__(self, G: nx.Graph):
+        self.nodes = list(G.nodes())
+        self.index = {u: i for i, u in enumerate(self.nodes)}
+        n = len(self.nodes)
+
+        # Split graph: node i -> in = 2i, out = 2i + 1, arc in -> out carries the node
+        succ: List[List[int]] = [[] for _ in range(2 * n)]
+        pred: List[List[int]] = [[] for _ in range(2 * n)]
+        for i in range(n):
+            succ[2 * i].append(2 * i + 1)
+            pred[2 * i + 1].append(2 * i)
+        for u, v in G.edges():
+            if u == v:
+                continue
+            i, j = self.index[u], self.index[v]
+            succ[2 * i + 1].append(2 * j)
+            pred[2 * j].append(2 * i + 1)
+            succ[2 * j + 1].append(2 * i)
+            pred[2 * i].append(2 * j + 1)
+        self.flow = _UnitFlow(succ, pred, split=True)
+
+    def cut(self, s: Hashable, t: Hashable, cutoff: int) -> Tuple[int, Optional[Set]]:
+        """
+        Returns:
+            Tuple of (local connectivity capped at cutoff, min vertex cut if
+            the connectivity is below cutoff, else None)
+        """
+        value, side, reached = self.flow.max_flow(2 * self.index[s] + 1, 2 * self.index[t], cutoff)
+        if side == 'cutoff':
+            return value, None
+        inside, outside = (0, 1) if side == 'source' else (1, 0)
+        cut = {self.nodes[i] for i in range(len(self.nodes))
+               if 2 * i + inside in reached and 2 * i + outside not in reached}
+        return value, cut
+
+    def fan(self, w: Hashable, verified: Set, cutoff: int, budget: int) -> bool:
+        """True if w has `cutoff` vertex-disjoint paths to distinct verified nodes."""
+        nodes = self.nodes
+        # Ending at the out-copy forces the path through the node arc, so
+        # every verified node absorbs at most one path
+        return self.flow.fan(2 * self.index[w] + 1,
+                             lambda b: b % 2 == 1 and nodes[b // 2] in verified,
+                             cutoff, budget)
+
+
+class _EdgeCutSearch:
+    """Local minimum edge cuts between node pairs of one graph."""
+
+    def __init__(self, G: nx.Graph):
+        self.nodes = list(G.nodes())
+        self.index = {u: i for i, u in enumerate(self.nodes)}
+        self.adj = [[self.index[v] for v in G.adj[u] if v != u] for u in self.nodes]
+        self.flow = _UnitFlow(self.adj, self.adj)
+
+    def cut(self, s: Hashable, t: Hashable, cutoff: int) -> Tuple[int, Optional[Set]]:
+        value, side, reached = self.flow.max_flow(self.index[s], self.index[t], cutoff)
+        if side == 'cutoff':
+            return value, None
+        cut = {(self.nodes[a], self.nodes[b]) for a in reached for b in self.adj[a] if b not in reached}
+        return value, cut
+
+    def fan(self, w: Hashable, verified: Set, cutoff: int, budget: int) -> bool:
+        """True if w has `cutoff` link-disjoint paths into the verified set."""
+        nodes = self.nodes
+        return self.flow.fan(self.index[w], lambda b: nodes[b] in verified, cutoff, budget)
+
+
+def _scan_from(G: nx.Graph, v: Hashable, search, best: int, verified: Set,
+               needs_flow=lambda w: True) -> Tuple[int, Optional[Set], Optional[Tuple]]:
+    """
+    Find the smallest v-w cut below `best` over all nodes w.
+
+    Nodes are visited in BFS order from v. A node with `best` disjoint
+    paths into the set of already verified nodes cannot be separated from v
+    by fewer than `best` failures (one path always survives and leads to a
+    node on v's side), so it is verified without a full v-w flow. Having
+    `best` verified neighbours is the cheapest such case; otherwise a small
+    local fan search is tried first.
+
+    Returns:
+        Tuple of (best value, cut or None, (v, w) pair or None)
+    """
+    count = dict.fromkeys(G, 0)
+    for x in verified:
+        for y in G.adj[x]:
+            count[y] += 1
+
+    best_cut, best_pair = None, None
+    order = [v] + [w for _, w in nx.bfs_edges(G, v)]
+    for w in order:
+        if w in verified:
+            continue
+        if count[w] < best and not search.fan(w, verified, best, FAN_BUDGET * best):
+            if not needs_flow(w):
+                continue
+            value, cut = search.cut(v, w, best)
+            if cut is not None:
+                best, best_cut, best_pair = value, cut, (v, w)
+        verified.add(w)
+        for y in G.adj[w]:
+            count[y] += 1
+    return best, best_cut, best_pair
+
+
+def _without_self_loops(G: nx.Graph) -> nx.Graph:
+    """G itself, or a copy without self-loops (a loop adds 2 to a degree but no connectivity)."""
+    loops = list(nx.selfloop_edges(G))
+    if not loops:
+        return G
+    H = G.copy()
+    H.remove_edges_from(loops)
+    return H
+
+
+def node_connectivity_with_cut(G: nx.Graph, sparsify: bool = True) -> Tuple[int, Set]:
+    """
+    Exact global vertex connectivity and a minimum vertex cut.
+
+    Args:
+        G: Undirected network
+        sparsify: Run on a sparse certificate of G (same answer, fewer links)
+
+    Returns:
+        Tuple of (connectivity, set of nodes whose removal disconnects G).
+        A complete graph has connectivity n - 1 and an empty cut (removing
+        nodes can never disconnect it).
+    """
+    n = G.number_of_nodes()
+    if n <= 1:
+        return 0, set()
+    if not nx.is_connected(G):
+        return 0, set()
+
+    G = _without_self_loops(G)
+    v, delta = min(G.degree(), key=lambda item: item[1])
+    if G.number_of_edges() == n * (n - 1) // 2:
+        return n - 1, set()
+
+    # Esfahanian-Hakimi: a min cut either separates v from a non-neighbour,
+    # or contains v and separates two of its neighbours
+    H = sparse_certificate(G, delta) if sparsify else G
+    search = _NodeCutSearch(H)
+    neighbors = set(H.adj[v]) - {v}
+    best, cut, pair = _scan_from(H, v, search, delta, neighbors | {v})
+    nbr_list = list(neighbors)
+    for i, x in enumerate(nbr_list):
+        for y in nbr_list[i + 1:]:
+            if not H.has_edge(x, y):
+                value, local_cut = search.cut(x, y, best)
+                if local_cut is not None:
+                    best, cut, pair = value, local_cut, (x, y)
+
+    if cut is None:
+        # No cut below the minimum degree: the neighbours of v are a min cut
+        return delta, set(G.adj[v]) - {v}
+
+    if H is not G:
+        # The certificate preserves the value; confirm the witness on G itself
+        value, g_cut = _NodeCutSearch(G).cut(*pair, best + 1)
+        if value == best:
+            return best, g_cut
+        return node_connectivity_with_cut(G, sparsify=False)
+    return best, cut
+
+
+def edge_connectivity_with_cut(G: nx.Graph, sparsify: bool = True) -> Tuple[int, Set]:
+    """
+    Exact global edge connectivity and a minimum edge cut.
+
+    Args:
+        G: Undirected network
+        sparsify: Run on a sparse certificate of G (same answer, fewer links)
+
+    Returns:
+        Tuple of (connectivity, set of (u, v) links whose removal disconnects G)
+    """
+    n = G.number_of_nodes()
+    if n <= 1:
+        return 0, set()
+    if not nx.is_connected(G):
+        return 0, set()
+
+    G = _without_self_loops(G)
+    v, delta = min(G.degree(), key=lambda item: item[1])
+    H = sparse_certificate(G, delta) if sparsify else G
+
+    # If the edge connectivity is below the minimum degree, both sides of a
+    # min cut contain a node of any dominating set that includes v
+    dominating = nx.dominating_set(H, start_with=v)
+    best, cut, pair = _scan_from(H, v, _EdgeCutSearch(H), delta, {v},
+                                 needs_flow=dominating.__contains__)
+    if cut is None:
+        return delta, {(v, w) for w in G.adj[v] if w != v}
+
+    if H is not G:
+        value, g_cut = _EdgeCutSearch(G).cut(*pair, best + 1)
+        if value == best:
+            return best, g_cut
+        return edge_connectivity_with_cut(G, sparsify=False)
+    return best, cut
+
+
+def link_disjoint_paths(G: nx.Graph, pairs: Iterable[Tuple[Hashable, Hashable]]) -> List[int]:
+    """
+    Number of link-disjoint paths (local edge connectivity) for each node pair.
+
+    One unit-capacity max-flow per pair, capped at the smaller of the two
+    degrees, so it stays cheap on large and dense meshes.
+    """
+    G = _without_self_loops(G)
+    search = _EdgeCutSearch(G)
+    return [0 if s == t else search.cut(s, t, min(G.degree(s), G.degree(t)) + 1)[0] for s, t in pairs]
+
+
+def analyze_fault_tolerance(G: nx.Graph) -> Dict:
+    """
+    Exact fault tolerance of a mesh.
+
+    Returns:
+        Dictionary with 'node_connectivity', 'edge_connectivity',
+        'min_node_cut', 'min_edge_cut', and the number of arbitrary node/link
+        failures the mesh always survives ('survivable_node_failures',
+        'survivable_link_failures')
+    """
+    node_k, node_cut = node_connectivity_with_cut(G)
+    edge_k, edge_cut = edge_connectivity_with_cut(G)
+    return {
+        'node_connectivity': node_k,
+        'edge_connectivity': edge_k,
+        'min_node_cut': node_cut,
+        'min_edge_cut': edge_cut,
+        'survivable_node_failures': max(0, node_k - 1),
+        'survivable_link_failures': max(0, edge_k - 1),
+    }
+
+
+def check_against_networkx(trials: int = 300, n: int = 10, p: float = 0.5, self_loops: int = 3,
+                           seed: int = 0) -> List[Tuple[int, str, int, int]]:
+    """
+    Compare both connectivities with networkx on random G(n, p) graphs.
+
+    Each connected graph gets `self_loops` random self-loops, which must
+    not change the answer (networkx itself is compared on the graph
+    without them).
+
+    Returns:
+        List of (graph seed, 'node' or 'edge', ours, networkx) disagreements
+        (empty when everything matches)
+    """
+    mismatches = []
+    for trial in range(seed, seed + trials):
+        G = nx.gnp_random_graph(n, p, seed=trial)
+        if not nx.is_connected(G):
+            continue
+        loop_free = G.copy()
+        nodes = list(G.nodes())
+        G.add_edges_from((nodes[(trial + 3 * k) % n],) * 2 for k in range(self_loops))
+        for kind, ours, reference in (('node', node_connectivity_with_cut, nx.node_connectivity),
+                                      ('edge', edge_connectivity_with_cut, nx.edge_connectivity)):
+            value, expected = ours(G)[0], reference(loop_free)
+            if value != expected:
+                mismatches.append((trial, kind, value, expected))
+    return mismatches
+
+
+if __name__ == "__main__":
+    mismatches = check_against_networkx()
+    if mismatches:
+        for trial, kind, value, expected in mismatches:
+            print(f"⚠️  Graph {trial}: {kind} connectivity {value}, networkx says {expected}")
+    else:
+        print("✅ Node and edge connectivity match networkx on graphs with self-loops")
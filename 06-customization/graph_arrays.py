@@ -0,0 +1,100 @@
+"""
+Array views of mesh topologies.
+
+NetworkX graphs are great for learning, but every neighbour lookup is a
+dictionary access. The heavier analysis tools in this directory convert the
+graph once into CSR (compressed sparse row) arrays and then work on plain
+NumPy arrays:
+
+- nodes:   list of node names, position = integer node id
+- indptr:  neighbours of node i live in indices[indptr[i]:indptr[i + 1]]
+- indices: neighbour ids, every undirected link stored in both directions
+- weights: link latency for each entry of indices
+"""
+
+from typing import Dict, Hashable, List, NamedTuple, Optional
+
+import networkx as nx
+import numpy as np
+
+
+class CSRGraph(NamedTuple):
+    """Undirected graph stored as CSR adjacency arrays."""
+    nodes: List[Hashable]
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_links(self) -> int:
+        return len(self.indices) // 2
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def neighbors(self, node_id: int) -> np.ndarray:
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def node_index(self) -> Dict[Hashable, int]:
+        return {name: i for i, name in enumerate(self.nodes)}
+
+
+def csr_from_edges(num_nodes: int, src: np.ndarray, dst: np.ndarray,
+                   weights: Optional[np.ndarray] = None,
+                   nodes: Optional[List[Hashable]] = None) -> CSRGraph:
+    """
+    Build a CSRGraph from undirected edge arrays (each link listed once).
+
+    Args:
+        num_nodes: Number of nodes (ids are 0..num_nodes-1)
+        src, dst: Endpoint ids of every link
+        weights: Optional latency per link (defaults to 1.0 = hop count)
+        nodes: Optional node names (defaults to the integer ids)
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    if weights is None:
+        weights = np.ones(len(src), dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+
+    both_src = np.concatenate([src, dst])
+    both_dst = np.concatenate([dst, src])
+    both_w = np.concatenate([weights, weights])
+
+    order = np.argsort(both_src, kind='stable')
+    indices = both_dst[order]
+    counts = np.bincount(both_src, minlength=num_nodes)
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    if nodes is None:
+        nodes = list(range(num_nodes))
+    return CSRGraph(nodes, indptr, indices, both_w[order])
+
+
+def to_csr(G: nx.Graph, weight: str = 'weight', default_weight: float = 1.0) -> CSRGraph:
+    """
+    Convert a NetworkX graph to CSR arrays.
+
+    Args:
+        G: Undirected NetworkX graph
+        weight: Edge attribute used as latency
+        default_weight: Latency used for links without the attribute
+    """
+    nodes = list(G.nodes())
+    index = {name: i for i, name in enumerate(nodes)}
+    m = G.number_of_edges()
+
+    src = np.empty(m, dtype=np.int64)
+    dst = np.empty(m, dtype=np.int64)
+    w = np.empty(m, dtype=np.float64)
+    for k, (u, v, data) in enumerate(G.edges(data=True)):
+        src[k] = index[u]
+        dst[k] = index[v]
+        w[k] = data.get(weight, default_weight)
+
+    return csr_from_edges(len(nodes), src, dst, w, nodes=nodes)
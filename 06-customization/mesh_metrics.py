@@ -0,0 +1,361 @@
+"""
+Mesh Metrics Engine - all distance metrics from one all-pairs sweep.
+
+nx.diameter() and nx.average_shortest_path_length() each run their own
+all-pairs search, so asking for both doubles the work. This engine runs ONE
+sweep and derives everything from it:
+
+- eccentricity of every node (longest shortest path starting there)
+- diameter (max eccentricity) and radius (min eccentricity)
+- average path length in hops
+- the same metrics weighted by link latency (optional, Dijkstra based)
+
+The hop sweep is a bit-parallel BFS: 64 sources are searched at once, one bit
+per source in a uint64 word per node, so a whole BFS level for 64 sources is
+a handful of NumPy operations. Batches of sources are spread over worker
+processes.
+
+For very large meshes where only the diameter is needed, fast_diameter()
+uses iFUB (iterative Fringe Upper Bound), which is exact and on most
+topologies needs far fewer BFS runs than one per node (expanders are the
+exception, there it falls back to the sweep).
+"""
+
+import heapq
+import os
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from graph_arrays import CSRGraph, to_csr
+
+BATCH_SIZE = 64  # sources per bit-parallel BFS (bits in a uint64)
+
+# _BYTE_BITS[b, j] = 1 if bit j of byte value b is set
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1,
+                           bitorder='little').astype(np.int64)
+
+# Set in each worker process by init_worker so the arrays are sent only once
+_WORKER_CSR: Optional[CSRGraph] = None
+
+
+def init_worker(csr: CSRGraph):
+    """Pool initializer: keep the graph arrays in the worker process."""
+    global _WORKER_CSR
+    _WORKER_CSR = csr
+
+
+def worker_csr() -> CSRGraph:
+    """Graph arrays installed by init_worker in this process."""
+    return _WORKER_CSR
+
+
+def gather_neighbors(csr: CSRGraph, node_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Concatenate the adjacency lists of node_ids.
+
+    Returns:
+        Tuple of (neighbour ids, id of the node each neighbour came from)
+    """
+    lo = csr.indptr[node_ids]
+    lengths = csr.indptr[node_ids + 1] - lo
+    total = int(lengths.sum())
+    offsets = np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+    return csr.indices[offsets + np.arange(total)], np.repeat(node_ids, lengths)
+
+
+def _bit_counts(words: np.ndarray, k: int) -> np.ndarray:
+    """Count, for each of the first k bits, how many words have that bit set."""
+    as_bytes = words.astype('<u8').view(np.uint8).reshape(-1, 8)
+    counts = np.empty(64, dtype=np.int64)
+    for byte in range(8):
+        histogram = np.bincount(as_bytes[:, byte], minlength=256)
+        counts[byte * 8:(byte + 1) * 8] = histogram @ _BYTE_BITS
+    return counts[:k]
+
+
+def bfs_batch(csr: CSRGraph, sources: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run up to 64 breadth-first searches at once.
+
+    Args:
+        csr: Graph arrays
+        sources: Node ids to search from (at most 64)
+
+    Returns:
+        Tuple of (eccentricity, sum_of_distances, reached_count) per source
+    """
+    n = csr.num_nodes
+    k = len(sources)
+    bits = np.left_shift(np.uint64(1), np.arange(k, dtype=np.uint64))
+
+    visited = np.zeros(n, dtype=np.uint64)
+    np.bitwise_or.at(visited, sources, bits)
+    frontier = visited.copy()
+
+    degree = np.diff(csr.indptr)
+    has_neighbors = degree > 0
+    starts = csr.indptr[:-1][has_neighbors]
+    dense_threshold = len(csr.indices) // 8
+
+    ecc = np.zeros(k, dtype=np.int64)
+    total = np.zeros(k, dtype=np.int64)
+    reached = np.ones(k, dtype=np.int64)
+    active_ids = np.asarray(sources, dtype=np.int64)
+    level = 0
+
+    while True:
+        level += 1
+        reached_next = np.zeros(n, dtype=np.uint64)
+        if degree[active_ids].sum() > dense_threshold:
+            # Large frontier: one OR-reduction over every adjacency list
+            reached_next[has_neighbors] = np.bitwise_or.reduceat(frontier[csr.indices], starts)
+        else:
+            # Small frontier: scatter only the frontier's own links
+            nbrs, owners = gather_neighbors(csr, active_ids)
+            np.bitwise_or.at(reached_next, nbrs, frontier[owners])
+        new = reached_next & ~visited
+        active_ids = np.flatnonzero(new)
+        if active_ids.size == 0:
+            break
+        visited |= new
+        counts = _bit_counts(new[active_ids], k)
+        total += level * counts
+        reached += counts
+        ecc[counts > 0] = level
+        frontier = new
+
+    return ecc, total, reached
+
+
+def _hop_sweep_chunk(batches: List[np.ndarray]) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    return [(batch, *bfs_batch(_WORKER_CSR, batch)) for batch in batches]
+
+
+def dijkstra_lengths(csr: CSRGraph, source: int) -> np.ndarray:
+    """Latency from source to every node (inf if unreachable)."""
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+    dist = np.full(csr.num_nodes, np.inf)
+    dist[source] = 0.0
+    done = np.zeros(csr.num_nodes, dtype=bool)
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        lo, hi = indptr[u], indptr[u + 1]
+        for v, w in zip(indices[lo:hi].tolist(), weights[lo:hi].tolist()):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def _latency_sweep_chunk(sources: List[int]) -> List[Tuple[int, float, float]]:
+    results = []
+    for s in sources:
+        dist = dijkstra_lengths(_WORKER_CSR, s)
+        results.append((s, float(dist.max()), float(dist.sum())))
+    return results
+
+
+def bfs_levels(csr: CSRGraph, source: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Single-source BFS on the CSR arrays.
+
+    Returns:
+        Tuple of (hop distance per node, -1 if unreachable; BFS parent per node)
+    """
+    dist = np.full(csr.num_nodes, -1, dtype=np.int64)
+    parent = np.full(csr.num_nodes, -1, dtype=np.int64)
+    dist[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while frontier.size:
+        level += 1
+        nbrs, owners = gather_neighbors(csr, frontier)
+        fresh = dist[nbrs] == -1
+        nbrs, first = np.unique(nbrs[fresh], return_index=True)
+        dist[nbrs] = level
+        parent[nbrs] = owners[fresh][first]
+        frontier = nbrs
+    return dist, parent
+
+
+class MeshMetricsEngine:
+    """
+    Computes distance-based mesh metrics from a single all-pairs sweep.
+
+    Example:
+        engine = MeshMetricsEngine(builder.G)
+        result = engine.sweep(latency=True)
+        print(result['diameter'], result['radius'], result['average_latency'])
+
+        # Exact diameter only, much faster on huge meshes
+        print(engine.fast_diameter())
+    """
+
+    def __init__(self, G: nx.Graph, weight: str = 'weight', workers: Optional[int] = None):
+        """
+        Args:
+            G: Connected, undirected network
+            weight: Edge attribute holding link latency
+            workers: Worker processes for the sweep (default: all cores)
+        """
+        self.csr = to_csr(G, weight=weight)
+        self.workers = workers or os.cpu_count() or 1
+
+    def _pool(self) -> Optional[Pool]:
+        """A worker pool holding the graph arrays, or None for one worker."""
+        if self.workers <= 1:
+            return None
+        return Pool(self.workers, initializer=init_worker, initargs=(self.csr,))
+
+    def _run(self, func, chunks: list, pool: Optional[Pool] = None) -> list:
+        """
+        Run func over chunks in a process pool (or inline for one worker).
+
+        Pass an open pool to reuse it across calls; otherwise one is created
+        for this call only.
+        """
+        if pool is not None and len(chunks) > 1:
+            return [r for part in pool.map(func, chunks) for r in part]
+        if self.workers <= 1 or len(chunks) <= 1:
+            init_worker(self.csr)
+            return [r for chunk in chunks for r in func(chunk)]
+        with self._pool() as pool:
+            return [r for part in pool.map(func, chunks) for r in part]
+
+    def _chunks(self, items: list) -> list:
+        per_worker = max(1, -(-len(items) // (self.workers * 4)))
+        return [items[i:i + per_worker] for i in range(0, len(items), per_worker)]
+
+    def _require_connected(self, reached: np.ndarray):
+        if reached.min() < self.csr.num_nodes:
+            raise nx.NetworkXError("Found infinite path length because the graph is not connected")
+
+    def sweep(self, latency: bool = False) -> Dict:
+        """
+        Run the all-pairs sweep.
+
+        Args:
+            latency: Also compute latency-weighted metrics (Dijkstra per node)
+
+        Returns:
+            Dictionary with 'eccentricity', 'diameter', 'radius',
+            'average_path_length' and, if latency=True, 'latency_eccentricity',
+            'latency_diameter', 'latency_radius', 'average_latency'
+        """
+        n = self.csr.num_nodes
+        if n == 0:
+            raise nx.NetworkXPointlessConcept("Graph has no nodes")
+
+        ids = np.arange(n, dtype=np.int64)
+        batches = [ids[i:i + BATCH_SIZE] for i in range(0, n, BATCH_SIZE)]
+
+        ecc = np.zeros(n, dtype=np.int64)
+        reached = np.zeros(n, dtype=np.int64)
+        total = 0
+        for batch, b_ecc, b_total, b_reached in self._run(_hop_sweep_chunk, self._chunks(batches)):
+            ecc[batch] = b_ecc
+            reached[batch] = b_reached
+            total += int(b_total.sum())
+        self._require_connected(reached)
+
+        pairs = n * (n - 1)
+        result = {
+            'eccentricity': dict(zip(self.csr.nodes, ecc.tolist())),
+            'diameter': int(ecc.max()),
+            'radius': int(ecc.min()),
+            'average_path_length': total / pairs if pairs else 0.0,
+        }
+
+        if latency:
+            lat_ecc = np.zeros(n)
+            lat_total = 0.0
+            for s, s_ecc, s_total in self._run(_latency_sweep_chunk, self._chunks(ids.tolist())):
+                lat_ecc[s] = s_ecc
+                lat_total += s_total
+            result.update({
+                'latency_eccentricity': dict(zip(self.csr.nodes, lat_ecc.tolist())),
+                'latency_diameter': float(lat_ecc.max()),
+                'latency_radius': float(lat_ecc.min()),
+                'average_latency': lat_total / pairs if pairs else 0.0,
+            })
+
+        return result
+
+    def _eccentricities(self, node_ids: np.ndarray, pool: Optional[Pool] = None) -> np.ndarray:
+        batches = [node_ids[i:i + BATCH_SIZE] for i in range(0, len(node_ids), BATCH_SIZE)]
+        return np.concatenate([r[1] for r in self._run(_hop_sweep_chunk, self._chunks(batches), pool)])
+
+    def fast_diameter(self) -> int:
+        """
+        Exact hop diameter using iFUB.
+
+        A 2-sweep picks a central root u. Nodes are then processed from
+        the farthest BFS level of u inwards; once the best eccentricity found
+        exceeds twice the current level, no closer node can beat it.
+
+        iFUB pays off when few nodes are peripheral (grids, trees, real
+        topologies). On expanders (random-like meshes) almost every node sits
+        in the last levels, so iFUB would search from most of them anyway;
+        when the levels it must search hold more than half of the nodes it
+        falls back to sweep() at once, which does that work in full batches.
+
+        Returns:
+            Diameter in hops
+        """
+        n = self.csr.num_nodes
+        if n == 0:
+            raise nx.NetworkXPointlessConcept("Graph has no nodes")
+        if n == 1:
+            return 0
+
+        # 2-sweep: farthest node a from a high-degree node, then farthest b from a
+        start = int(np.argmax(self.csr.degrees()))
+        dist, _ = bfs_levels(self.csr, start)
+        if (dist < 0).any():
+            raise nx.NetworkXError("Found infinite path length because the graph is not connected")
+        a = int(np.argmax(dist))
+        dist_a, _ = bfs_levels(self.csr, a)
+        b = int(np.argmax(dist_a))
+        dist_b, _ = bfs_levels(self.csr, b)
+        lower = int(dist_a[b])
+
+        # The iFUB root should be central: among the midpoints of shortest
+        # a-b paths, take the one with the smallest eccentricity (one batch).
+        middle = np.flatnonzero((dist_a + dist_b == lower) & (dist_a == lower // 2))
+        if len(middle) > BATCH_SIZE:
+            middle = middle[np.linspace(0, len(middle) - 1, BATCH_SIZE).astype(np.int64)]
+        middle_ecc = bfs_batch(self.csr, middle)[0]
+        u = int(middle[np.argmin(middle_ecc)])
+
+        dist_u, _ = bfs_levels(self.csr, u)
+        level = int(dist_u.max())
+        lower = max(lower, level)
+        upper = 2 * level
+
+        # Unless the lower bound rises, every level above lower // 2 gets searched
+        if 2 * int((dist_u > lower // 2).sum()) > n:
+            return self.sweep()['diameter']
+
+        pool = self._pool()
+        try:
+            while upper > lower:
+                fringe = np.flatnonzero(dist_u == level)
+                fringe_best = int(self._eccentricities(fringe, pool).max())
+                if max(lower, fringe_best) > 2 * (level - 1):
+                    return max(lower, fringe_best)
+                lower = max(lower, fringe_best)
+                upper = 2 * (level - 1)
+                level -= 1
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        return lower
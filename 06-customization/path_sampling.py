@@ -0,0 +1,243 @@
+"""
+Path Latency Sampling - estimate latency statistics without all-pairs work.
+
+On a very large mesh we rarely need the exact average over every node pair.
+Running Dijkstra from a random sample of source nodes ("pivots") gives
+unbiased estimates of the whole latency distribution:
+
+- average path latency, with a confidence interval
+- p50 / p95 / p99 path latency, with confidence intervals
+- maximum path latency, bracketed between a lower bound (the largest
+  eccentricity seen) and an upper bound (triangle inequality through the
+  sampled pivots)
+
+Sources are processed in rounds spread over worker processes. After every
+round the confidence intervals are checked and sampling stops as soon as
+they are tight enough, so the time spent adapts to the network.
+
+Works on any undirected graph: a CustomNetworkBuilder (builder.G), a
+SelfHealingNetwork after failures (network.G), or a plain nx.Graph.
+Disconnected graphs are fine - statistics cover reachable pairs only.
+"""
+
+import os
+import time
+from multiprocessing import Pool
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from graph_arrays import to_csr
+from mesh_metrics import dijkstra_lengths, init_worker, worker_csr
+
+QUANTILES = (0.50, 0.95, 0.99)
+
+
+def _sample_sources(args: Tuple[List[int], int, int]) -> Tuple[list, np.ndarray]:
+    """
+    Worker: Dijkstra from each source.
+
+    Returns:
+        Tuple of (per-source (eccentricity, latency sum, reachable count,
+        sampled target latencies), elementwise upper bound on every node's
+        eccentricity)
+    """
+    sources, targets_per_source, seed = args
+    csr = worker_csr()
+    upper = np.full(csr.num_nodes, np.inf)
+    results = []
+    for s in sources:
+        dist = dijkstra_lengths(csr, s)
+        dist[s] = np.inf  # exclude the (s, s) pair
+        finite = dist[np.isfinite(dist)]
+        ecc = float(finite.max()) if finite.size else 0.0
+        if finite.size > targets_per_source:
+            rng = np.random.default_rng([seed, s])
+            sampled = rng.choice(finite, targets_per_source, replace=False)
+        else:
+            sampled = finite
+        results.append((ecc, float(finite.sum()), int(finite.size), np.sort(sampled)))
+
+        dist[s] = 0.0
+        np.minimum(upper, dist + ecc, out=upper)
+    return results, upper
+
+
+class PathLatencyEstimator:
+    """
+    Adaptive sampling estimator for path latency statistics.
+
+    Example:
+        estimator = PathLatencyEstimator(builder.G, seed=7)
+        stats = estimator.estimate(rel_error=0.02, time_budget=30)
+        print(stats['mean'], stats['mean_ci'], stats['sources_used'])
+    """
+
+    def __init__(self, G: nx.Graph, weight: str = 'weight', workers: Optional[int] = None,
+                 seed: Optional[int] = None, targets_per_source: int = 2048):
+        """
+        Args:
+            G: Undirected network
+            weight: Edge attribute holding link latency
+            workers: Worker processes (default: all cores)
+            seed: Random seed for pivot selection (reproducible estimates)
+            targets_per_source: Latencies kept per pivot for the percentiles
+        """
+        self.csr = to_csr(G, weight=weight)
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % (2 ** 32))
+        self.targets_per_source = targets_per_source
+
+    def estimate(self, rel_error: float = 0.05, confidence: float = 0.95,
+                 min_sources: int = 16, max_sources: Optional[int] = None,
+                 round_size: Optional[int] = None, time_budget: Optional[float] = None) -> Dict:
+        """
+        Sample pivots until every confidence interval is within rel_error.
+
+        Args:
+            rel_error: Target half-width of each interval, relative to the estimate
+            confidence: Confidence level of the intervals
+            min_sources: Pivots to sample before the first convergence check
+            max_sources: Hard cap on pivots (default: all nodes)
+            round_size: Pivots per round (default: 4 per worker)
+            time_budget: Stop after this many seconds even if not converged
+
+        Returns:
+            Dictionary with 'mean', 'mean_ci', 'p50'/'p95'/'p99' and their
+            '_ci' intervals, 'max_lower' / 'max_upper', 'reachable_fraction',
+            'sources_used', 'converged' and 'stop_reason'
+        """
+        n = self.csr.num_nodes
+        if n < 2:
+            raise nx.NetworkXPointlessConcept("Need at least two nodes to sample paths")
+
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        max_sources = min(max_sources or n, n)
+        round_size = round_size or 4 * self.workers
+        order = np.random.default_rng(self.seed).permutation(n).tolist()
+
+        per_source: list = []
+        upper = np.full(n, np.inf)
+        started = time.perf_counter()
+        stats: Dict = {}
+        stop_reason = 'max_sources'
+
+        pool = Pool(self.workers, initializer=init_worker, initargs=(self.csr,)) if self.workers > 1 else None
+        if pool is None:
+            init_worker(self.csr)
+        try:
+            while len(per_source) < max_sources:
+                batch = order[len(per_source):min(len(per_source) + round_size, max_sources)]
+                per_worker = max(1, -(-len(batch) // self.workers))
+                jobs = [(batch[i:i + per_worker], self.targets_per_source, self.seed)
+                        for i in range(0, len(batch), per_worker)]
+                parts = pool.map(_sample_sources, jobs) if pool else map(_sample_sources, jobs)
+                for results, part_upper in parts:
+                    per_source.extend(results)
+                    np.minimum(upper, part_upper, out=upper)
+
+                stats = self._summarize(per_source, upper, n, z)
+                if len(per_source) >= min(min_sources, max_sources) and stats['_worst_rel_error'] <= rel_error:
+                    stop_reason = 'converged'
+                    break
+                if time_budget is not None and time.perf_counter() - started >= time_budget:
+                    stop_reason = 'time_budget'
+                    break
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        if len(per_source) == n:
+            # Every node was a pivot: the mean (and max_lower) are exact, but the
+            # percentiles still come from sampled targets and stay estimates
+            stop_reason = 'exhausted'
+        stats.pop('_worst_rel_error')
+        stats.update({
+            'sources_used': len(per_source),
+            'converged': stop_reason in ('converged', 'exhausted'),
+            'stop_reason': stop_reason,
+            'elapsed': time.perf_counter() - started,
+        })
+        return stats
+
+    @staticmethod
+    def _summarize(per_source: list, upper: np.ndarray, n: int, z: float) -> Dict:
+        """Estimates and intervals from the pivots sampled so far."""
+        k = len(per_source)
+        ecc = np.array([r[0] for r in per_source])
+        sums = np.array([r[1] for r in per_source])
+        counts = np.array([r[2] for r in per_source], dtype=np.float64)
+        total_count = counts.sum()
+        # Sampling pivots without replacement from n nodes
+        fpc = np.sqrt(max(0.0, (n - k) / (n - 1))) if n > 1 else 0.0
+
+        def ratio_se(numerators: np.ndarray, estimate: float) -> float:
+            """Standard error of sum(numerators) / sum(counts) (delta method)."""
+            if k < 2 or total_count == 0:
+                return float('inf')
+            residuals = numerators - estimate * counts
+            return float(np.std(residuals, ddof=1) / np.sqrt(k) / counts.mean() * fpc)
+
+        mean = float(sums.sum() / total_count) if total_count else 0.0
+        mean_half = z * ratio_se(sums, mean)
+        stats = {
+            'mean': mean,
+            'mean_ci': (mean - mean_half, mean + mean_half),
+            'reachable_fraction': float(total_count / (k * (n - 1))),
+            'max_lower': float(ecc.max()),
+            'max_upper': float(np.max(upper[np.isfinite(upper)])) if np.isfinite(upper).any() else 0.0,
+        }
+        worst = mean_half / mean if mean > 0 else 0.0
+
+        # Pooled latency distribution: each sampled target stands for
+        # counts[s] / len(sampled[s]) real targets of its pivot
+        sampled = [r[3] for r in per_source]
+        if total_count > 0:
+            values = np.concatenate(sampled)
+            weights = np.concatenate([np.full(len(d), c / len(d)) for d, c in zip(sampled, counts) if len(d)])
+            order = np.argsort(values, kind='stable')
+            values, cdf = values[order], np.cumsum(weights[order]) / total_count
+
+            def quantile(q: float) -> float:
+                i = min(int(np.searchsorted(cdf, q, side='left')), len(values) - 1)
+                return float(values[max(i, 0)])
+
+            for q in QUANTILES:
+                x = quantile(q)
+                # Woodruff interval: invert the CI of the CDF at the estimate
+                below = np.array([np.searchsorted(d, x, side='right') * c / len(d) if len(d) else 0.0
+                                  for d, c in zip(sampled, counts)])
+                cdf_half = z * ratio_se(below, float(below.sum() / total_count))
+                low, high = quantile(max(0.0, q - cdf_half)), quantile(min(1.0, q + cdf_half))
+                name = f"p{int(round(q * 100))}"
+                stats[name] = x
+                stats[f"{name}_ci"] = (low, high)
+                if x > 0:
+                    worst = max(worst, (high - low) / 2 / x)
+
+        stats['_worst_rel_error'] = worst
+        return stats
+
+
+def estimate_path_latency(network, **kwargs) -> Dict:
+    """
+    Estimate path latency statistics of a network by pivot sampling.
+
+    Args:
+        network: nx.Graph, or anything with a .G graph attribute
+                 (CustomNetworkBuilder, SelfHealingNetwork)
+        **kwargs: PathLatencyEstimator options (weight, workers, seed,
+                  targets_per_source) and estimate() options (rel_error,
+                  confidence, min_sources, max_sources, round_size, time_budget)
+
+    Example:
+        stats = estimate_path_latency(network, rel_error=0.02, seed=1)
+        print(f"p95 latency: {stats['p95']:.1f}ms from {stats['sources_used']} pivots")
+    """
+    G = network if isinstance(network, nx.Graph) else network.G
+    init_keys = ('weight', 'workers', 'seed', 'targets_per_source')
+    init_args = {key: kwargs.pop(key) for key in init_keys if key in kwargs}
+    return PathLatencyEstimator(G, **init_args).estimate(**kwargs)
@@ -0,0 +1,691 @@
+"""
+Topology Annealing - simulated annealing over mesh topologies.
+
+Lesson 3 (02-optimization/simulated_annealing_intro.py) anneals a 1-D
+function and ends with the AutoMesh version of the idea: the solution is a
+network topology, the cost is latency plus a redundancy penalty, and a
+neighbour is the topology with one link added or removed. This module is
+that optimizer, for CustomNetworkBuilder networks.
+
+Cost of a topology:
+    average shortest-path latency over all node pairs
+  + link_cost for every link
+  + degree_penalty for every missing link below min_degree at a node
+  + bridge_penalty for every bridge (a link whose failure splits the mesh)
+
+Recomputing all-pairs shortest paths (APSP) for every move would take about
+a second on a 500-node mesh, so each move is delta-evaluated instead:
+
+- Adding link (a, b) with latency w can only shorten paths:
+  D' = min(D, D[:, a] + w + D[b, :], D[:, b] + w + D[a, :]),
+  a single O(n^2) array operation.
+  The bridges it removes are read off the cached DFS tree of the bridge
+  search: those with exactly one of a, b below them.
+- Removing a bridge is rejected straight away, so the mesh never
+  disconnects; bridges are cached and only recomputed after accepted
+  moves. For any other link, only sources whose shortest-path tree uses
+  the link can change. Their rows keep every distance that provably avoids
+  the link and are repaired with a vectorized Bellman-Ford pass.
+
+Example:
+    annealer = TopologyAnnealer(builder.G, link_cost=2.0, seed=1)
+    result = annealer.run(iterations=5000)
+    print(result['initial_cost'], '->', result['best_cost'])
+"""
+
+import hashlib
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from topology_fingerprint import LRUCache, link_code, node_code
+from topology_snapshots import link_key
+from topology_store import default_file_mode
+
+# Cooling schedules live with the annealing lesson
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "02-optimization"))
+from cooling_schedules import Geometric, StoppingRule, get_schedule  # noqa: E402
+
+_EPS = 1e-9
+
+Move = Tuple[int, bool]  # (candidate link index, True = add / False = remove)
+
+
+def _find_bridges(adjacency: List[List[Tuple[int, int]]]):
+    """
+    Iterative Tarjan low-link search over a DFS forest.
+
+    Returns:
+        Tuple of ({bridge link id: child node below it}, preorder number,
+        end of preorder subtree range, DFS root) - node x is below child c
+        when order[c] <= order[x] < end[c].
+    """
+    n = len(adjacency)
+    order, low, end, root_of = [-1] * n, [0] * n, [0] * n, [0] * n
+    bridges, counter = {}, 0
+    for root in range(n):
+        if order[root] >= 0:
+            continue
+        order[root] = low[root] = counter
+        root_of[root] = root
+        counter += 1
+        stack = [(root, -1, iter(adjacency[root]))]
+        while stack:
+            node, via, neighbours = stack[-1]
+            for nxt, link in neighbours:
+                if link == via:
+                    continue
+                if order[nxt] < 0:
+                    order[nxt] = low[nxt] = counter
+                    root_of[nxt] = root
+                    counter += 1
+                    stack.append((nxt, link, iter(adjacency[nxt])))
+                    break
+                low[node] = min(low[node], order[nxt])
+            else:
+                stack.pop()
+                end[node] = counter
+                if stack:
+                    parent = stack[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                    if low[node] > order[parent]:
+                        bridges[via] = node
+    return bridges, order, end, root_of
+
+
+def directed_edges(i: np.ndarray, j: np.ndarray, w: np.ndarray):
+    """
+    Both directions of the links (i[k], j[k]) with latency w[k], sorted by
+    target, as the (src, wt, targets, starts) arrays TopologyState._relax uses.
+    """
+    src, dst, wt = np.concatenate([i, j]), np.concatenate([j, i]), np.concatenate([w, w])
+    order = np.argsort(dst, kind='stable')
+    src, dst, wt = src[order], dst[order], wt[order]
+    targets, starts = np.unique(dst, return_index=True)
+    return src, wt, targets, starts
+
+
+def all_pairs_latency(n: int, i: np.ndarray, j: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """
+    Shortest-path latency matrix of the links (i[k], j[k], w[k]); inf between components.
+
+    Floyd-Warshall with one array operation per pivot: for a few hundred
+    nodes that beats a Bellman-Ford sweep from scratch (about 4x at 100).
+    """
+    D = np.full((n, n), np.inf)
+    np.fill_diagonal(D, 0.0)
+    np.minimum.at(D, (i, j), w)
+    np.minimum.at(D, (j, i), w)
+    for k in range(n):
+        np.minimum(D, D[:, k, None] + D[None, k, :], out=D)
+    return D
+
+
+class TopologyState:
+    """
+    A topology over a fixed node set and candidate link pool, with its
+    all-pairs latency matrix kept up to date move by move.
+    """
+
+    def __init__(self, G: nx.Graph, candidate_links: Optional[Iterable[Tuple]] = None,
+                 default_latency: float = 10.0, weight: str = 'weight',
+                 link_cost: float = 1.0, min_degree: int = 2, degree_penalty: float = 50.0,
+                 bridge_penalty: float = 50.0,
+                 unreachable_latency: Optional[float] = None):
+        """
+        Args:
+            G: Starting network
+            candidate_links: Links the optimizer may add, as (u, v) or
+                             (u, v, latency) tuples (default: every node pair).
+                             Existing links are always candidates.
+            default_latency: Latency of candidates given without one
+            weight: Edge attribute holding link latency
+            link_cost: Cost added per link (keeps the mesh from becoming complete)
+            min_degree: Redundancy target per node
+            degree_penalty: Cost per missing link below min_degree
+            bridge_penalty: Cost per bridge (single link whose failure splits the mesh)
+            unreachable_latency: Latency charged for disconnected pairs
+                                 (default: n * largest candidate latency)
+        """
+        self.nodes: List[Hashable] = list(G.nodes())
+        self.index = {u: i for i, u in enumerate(self.nodes)}
+        n = self.n = len(self.nodes)
+        if n < 2:
+            raise nx.NetworkXPointlessConcept("Need at least two nodes to optimize a topology")
+
+        latency: Dict[Tuple[int, int], float] = {}
+        if candidate_links is None:
+            for i in range(n):
+                for j in range(i + 1, n):
+                    latency[(i, j)] = default_latency
+        else:
+            for link in candidate_links:
+                i, j = sorted((self.index[link[0]], self.index[link[1]]))
+                if i != j:
+                    latency[(i, j)] = link[2] if len(link) > 2 else default_latency
+        existing = []
+        for u, v, data in G.edges(data=True):
+            i, j = sorted((self.index[u], self.index[v]))
+            if i != j:
+                latency[(i, j)] = data.get(weight, default_latency)
+                existing.append((i, j))
+
+        pairs = list(latency)
+        self.cand_i = np.array([p[0] for p in pairs], dtype=np.int64)
+        self.cand_j = np.array([p[1] for p in pairs], dtype=np.int64)
+        self.cand_w = np.array([latency[p] for p in pairs], dtype=np.float64)
+        self.cand_index = {p: c for c, p in enumerate(pairs)}
+
+        # Zobrist codes: the fingerprint is the XOR of node codes and present link codes
+        self.codes = np.array([link_code(self.nodes[i], self.nodes[j]) for i, j in pairs], dtype=np.uint64)
+        self._node_codes = 0
+        for u in self.nodes:
+            self._node_codes ^= node_code(u)
+        self.fingerprint = self._node_codes
+
+        self.present = np.zeros(len(pairs), dtype=bool)
+        self.links: List[int] = []            # present candidates (for O(1) sampling)
+        self._link_pos: Dict[int, int] = {}
+        for p in existing:
+            self._add_link(self.cand_index[p])
+
+        self.link_cost = link_cost
+        self.min_degree = min_degree
+        self.degree_penalty = degree_penalty
+        self.bridge_penalty = bridge_penalty
+        self.unreachable = unreachable_latency or n * float(self.cand_w.max())
+        self._recompute()
+
+    def _recompute(self):
+        """Degrees, all-pairs latencies and cost of the current link set from scratch."""
+        self.degree = np.bincount(np.concatenate([self.cand_i[self.present], self.cand_j[self.present]]),
+                                  minlength=self.n).astype(np.int64)
+        self._edge_arrays = None
+        self._bridges = None
+        self.D = np.full((self.n, self.n), np.inf)
+        np.fill_diagonal(self.D, 0.0)
+        self._relax(self.D, self._edges())
+        self.cost = self._cost(self.D, len(self.links), self.degree, len(self._bridge_info()[0]))
+
+    # --- bookkeeping -----------------------------------------------------
+
+    def _add_link(self, c: int):
+        self.present[c] = True
+        self.fingerprint ^= int(self.codes[c])
+        self._link_pos[c] = len(self.links)
+        self.links.append(c)
+
+    def _remove_link(self, c: int):
+        self.present[c] = False
+        self.fingerprint ^= int(self.codes[c])
+        pos = self._link_pos.pop(c)
+        last = self.links.pop()
+        if last != c:
+            self.links[pos] = last
+            self._link_pos[last] = pos
+
+    def _edges(self, without: Optional[int] = None):
+        """Directed edge arrays of the current links, sorted by target."""
+        if without is None and self._edge_arrays is not None:
+            return self._edge_arrays
+        mask = self.present.copy()
+        if without is not None:
+            mask[without] = False
+        arrays = directed_edges(self.cand_i[mask], self.cand_j[mask], self.cand_w[mask])
+        if without is None:
+            self._edge_arrays = arrays
+        return arrays
+
+    @staticmethod
+    def _relax(R: np.ndarray, edges, columns: Optional[np.ndarray] = None):
+        """
+        Vectorized Bellman-Ford: relax the rows of R (in place) until stable.
+
+        Only entries in `columns` (boolean mask, default all) are updated, and
+        rows drop out of the loop as soon as they stop changing.
+        """
+        src, wt, targets, starts = edges
+        if columns is not None:
+            keep = columns[targets]
+            counts = np.diff(np.append(starts, len(src)))[keep]
+            spans = np.repeat(keep, np.diff(np.append(starts, len(src))))
+            src, wt, targets = src[spans], wt[spans], targets[keep]
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        if len(src) == 0:
+            return
+        active = np.arange(len(R))
+        while len(active):
+            rows = R[active]
+            best = np.minimum.reduceat(rows[:, src] + wt, starts, axis=1)
+            current = rows[:, targets]
+            improved = best < current - _EPS
+            changed = improved.any(axis=1)
+            if not changed.any():
+                return
+            rows[:, targets] = np.minimum(current, best)
+            R[active] = rows
+            active = active[changed]
+
+    def _adjacency(self, without: Optional[int] = None) -> List[List[Tuple[int, int]]]:
+        adjacency: List[List[Tuple[int, int]]] = [[] for _ in range(self.n)]
+        for c in self.links:
+            if c != without:
+                i, j = int(self.cand_i[c]), int(self.cand_j[c])
+                adjacency[i].append((j, c))
+                adjacency[j].append((i, c))
+        return adjacency
+
+    def _bridge_info(self):
+        if self._bridges is None:
+            bridges, order, end, root = _find_bridges(self._adjacency())
+            children = np.array(list(bridges.values()), dtype=np.int64)
+            order, end = np.array(order), np.array(end)
+            self._bridges = (bridges, order, end, root, order[children], end[children])
+        return self._bridges
+
+    def bridges(self) -> set:
+        """Candidate indices of links whose removal disconnects the mesh (cached)."""
+        return set(self._bridge_info()[0])
+
+    def _bridges_after_add(self, a: int, b: int) -> int:
+        # Adding (a, b) turns every bridge between a and b into a non-bridge:
+        # those are the bridges with exactly one of a, b in the subtree below them
+        bridges, order, end, root, lo, hi = self._bridge_info()
+        if root[a] != root[b]:
+            return len(bridges) + 1
+        below_a = (lo <= order[a]) & (order[a] < hi)
+        below_b = (lo <= order[b]) & (order[b] < hi)
+        return len(bridges) - int((below_a != below_b).sum())
+
+    def _bridges_after_remove(self, c: int) -> int:
+        return len(_find_bridges(self._adjacency(without=c))[0])
+
+    def _cost(self, D: np.ndarray, num_links: int, degree: np.ndarray, num_bridges: int) -> float:
+        finite = np.isfinite(D)
+        total = D[finite].sum() + (~finite).sum() * self.unreachable
+        average = total / (self.n * (self.n - 1))
+        deficit = np.maximum(self.min_degree - degree, 0).sum()
+        return float(average + self.link_cost * num_links + self.degree_penalty * deficit
+                     + self.bridge_penalty * num_bridges)
+
+    def average_latency(self) -> float:
+        """Mean shortest-path latency over connected node pairs."""
+        off = ~np.eye(self.n, dtype=bool) & np.isfinite(self.D)
+        return float(self.D[off].mean()) if off.any() else 0.0
+
+    # --- moves -----------------------------------------------------------
+
+    def propose(self, rng: np.random.Generator) -> Optional[Move]:
+        """Random add or remove move (None if no legal move was found)."""
+        can_add = len(self.links) < len(self.present)
+        for _ in range(32):
+            if can_add and (not self.links or rng.random() < 0.5):
+                c = int(rng.integers(len(self.present)))
+                if not self.present[c]:
+                    return c, True
+            elif self.links:
+                c = self.links[int(rng.integers(len(self.links)))]
+                if c not in self._bridge_info()[0]:
+                    return c, False
+        return None
+
+    def fingerprint_after(self, move: Move) -> int:
+        """Fingerprint of the topology a move leads to (O(1), see topology_fingerprint.py)."""
+        return self.fingerprint ^ int(self.codes[move[0]])
+
+    def evaluate(self, move: Move, cost: Optional[float] = None):
+        """
+        Cost after a move, without applying it.
+
+        Args:
+            move: Move to evaluate
+            cost: Cost after the move if already known (e.g. cached); only
+                  the update is computed then
+
+        Returns:
+            Tuple of (new cost, update to pass to apply())
+        """
+        c, add = move
+        a, b, w = int(self.cand_i[c]), int(self.cand_j[c]), float(self.cand_w[c])
+        D = self.D
+        degree = self.degree.copy()
+        degree[[a, b]] += 1 if add else -1
+
+        if add:
+            via_a = D[:, a, None] + w + D[None, b, :]
+            new_D = np.minimum(D, np.minimum(via_a, via_a.T))
+            if cost is None:
+                cost = self._cost(new_D, len(self.links) + 1, degree, self._bridges_after_add(a, b))
+            return cost, (new_D, degree)
+
+        # Sources whose shortest-path tree may use the link (inf - inf: unreachable, never tight)
+        with np.errstate(invalid='ignore'):
+            tight = (np.abs(D[:, a] + w - D[:, b]) <= _EPS) | (np.abs(D[:, b] + w - D[:, a]) <= _EPS)
+        sources = np.flatnonzero(tight & np.isfinite(D[:, a]))
+        new_D = D.copy()
+        if len(sources):
+            rows = D[sources].copy()
+            through = (rows[:, a, None] + w + D[None, b, :] <= rows + _EPS) | \
+                      (rows[:, b, None] + w + D[None, a, :] <= rows + _EPS)
+            rows[through] = np.inf
+            rows[np.arange(len(sources)), sources] = 0.0
+            self._relax(rows, self._edges(without=c), columns=through.any(axis=0))
+            new_D[sources] = rows
+            new_D[:, sources] = rows.T
+        if cost is None:
+            cost = self._cost(new_D, len(self.links) - 1, degree, self._bridges_after_remove(c))
+        return cost, (new_D, degree)
+
+    def apply(self, move: Move, update, cost: float):
+        """Commit a move evaluated with evaluate()."""
+        c, add = move
+        self.D, self.degree = update
+        if add:
+            self._add_link(c)
+        else:
+            self._remove_link(c)
+        self.cost = cost
+        self._edge_arrays = None
+        self._bridges = None
+
+    def toggle_links(self, toggles: Iterable[int], rebuild_above: int = 32):
+        """
+        Flip a set of candidate links, e.g. to turn this state into another one.
+
+        Small diffs are applied move by move (additions first, so a connected
+        target stays connected on the way); large ones rebuild from scratch.
+        """
+        toggles = [int(c) for c in toggles]
+        if len(toggles) > rebuild_above:
+            for c in toggles:
+                if self.present[c]:
+                    self._remove_link(c)
+                else:
+                    self._add_link(c)
+            self._recompute()
+            return
+        adds = [(c, True) for c in toggles if not self.present[c]]
+        removes = [(c, False) for c in toggles if self.present[c]]
+        for move in adds + removes:
+            cost, update = self.evaluate(move)
+            self.apply(move, update, cost)
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Current links (in sampling order) and latency matrix, for checkpoints."""
+        return {'links': np.array(self.links, dtype=np.int32), 'distances': self.D}
+
+    def set_state(self, links: np.ndarray, distances: np.ndarray, cost: float):
+        """Continue from a get_state() result (of a state built from the same inputs)."""
+        self.present[:] = False
+        self.links, self._link_pos = [], {}
+        self.fingerprint = self._node_codes
+        for c in links.tolist():
+            self._add_link(c)
+        self.degree = np.bincount(np.concatenate([self.cand_i[self.present], self.cand_j[self.present]]),
+                                  minlength=self.n).astype(np.int64)
+        self.D = np.array(distances, dtype=np.float64)
+        self.cost = cost
+        self._edge_arrays = None
+        self._bridges = None
+
+    # --- results ---------------------------------------------------------
+
+    def link_list(self, present: Optional[np.ndarray] = None) -> List[Tuple[Hashable, Hashable, float]]:
+        """(u, v, latency) for every link of the current (or given) link set."""
+        mask = self.present if present is None else present
+        return [(self.nodes[i], self.nodes[j], w) for i, j, w in
+                zip(self.cand_i[mask].tolist(), self.cand_j[mask].tolist(), self.cand_w[mask].tolist())]
+
+
+class TopologyAnnealer:
+    """
+    Simulated annealing over link additions/removals.
+
+    Example:
+        annealer = TopologyAnnealer(builder.G, link_cost=2.0, seed=1)
+        result = annealer.run(iterations=5000)
+        best_links = result['links']
+    """
+
+    def __init__(self, G: nx.Graph, seed: Optional[int] = None, cache_size: int = 0,
+                 **state_options):
+        """
+        Args:
+            G: Starting network (not modified)
+            seed: Random seed
+            cache_size: Topology costs remembered by fingerprint (default 0:
+                        off; a single chain of one-link moves almost never
+                        revisits a topology, so lookups cost more than they save)
+            **state_options: TopologyState options (candidate_links, link_cost,
+                             min_degree, degree_penalty, default_latency, ...)
+        """
+        self.state = TopologyState(G, **state_options)
+        self.rng = np.random.default_rng(seed)
+        self.cache = LRUCache(cache_size)
+        self.seed = seed
+        self.state_options = state_options
+        # Digest of the starting problem (nodes, candidate links and latencies,
+        # starting links), so a checkpoint of another problem is never resumed
+        digest = hashlib.sha1(repr(self.state.nodes).encode('utf-8'))
+        for array in (self.state.cand_i, self.state.cand_j, self.state.cand_w, self.state.present):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        self.problem_digest = digest.hexdigest()
+
+    def initial_temperature(self, samples: int = 30, accept: float = 0.8) -> float:
+        """Temperature at which a typical worsening move is accepted with probability `accept`."""
+        worse = []
+        for _ in range(samples):
+            move = self.state.propose(self.rng)
+            if move is None:
+                break
+            delta = self.state.evaluate(move)[0] - self.state.cost
+            if delta > 0:
+                worse.append(delta)
+        return -float(np.mean(worse)) / math.log(accept) if worse else 1.0
+
+    def step(self, temperature: float) -> Optional[bool]:
+        """
+        Propose one move and apply it with the Metropolis rule; True if
+        accepted, None if no legal move was found.
+
+        With a cost cache (cache_size > 0), costs of previously seen
+        topologies come from the cache; an accepted cached move then only
+        computes the latency update, not the cost.
+        """
+        state = self.state
+        move = state.propose(self.rng)
+        if move is None:
+            return None
+        if self.cache.maxsize > 0:
+            key = state.fingerprint_after(move)
+            new_cost, update = self.cache.get(key), None
+            if new_cost is None:
+                new_cost, update = state.evaluate(move)
+                self.cache.put(key, new_cost)
+        else:
+            new_cost, update = state.evaluate(move)
+        delta = new_cost - state.cost
+        if delta < 0 or self.rng.random() < math.exp(-delta / max(temperature, 1e-12)):
+            if update is None:
+                update = state.evaluate(move, cost=new_cost)[1]
+            state.apply(move, update, new_cost)
+            return True
+        return False
+
+    def run(self, iterations: int = 5000, initial_temp: Optional[float] = None,
+            cooling_rate: float = 0.999, schedule=None, stopping: Optional[StoppingRule] = None,
+            checkpoint: Optional[str] = None, checkpoint_interval: float = 60.0,
+            verbose: bool = True) -> Dict:
+        """
+        Anneal the topology.
+
+        With `checkpoint` set, the full optimizer state is written to that
+        file at most every `checkpoint_interval` seconds, and an existing
+        checkpoint is resumed from. A resumed run continues bit-identically:
+        same moves, same random numbers, same result. The checkpoint records
+        the problem, options, seed, schedule and stopping rule, and resuming
+        it with any of them changed raises ValueError. The file is deleted
+        once the run finishes.
+
+        Args:
+            iterations: Maximum number of moves to try
+            initial_temp: Starting temperature (default: estimated from sample moves)
+            cooling_rate: Temperature multiplier per iteration (0-1), if no schedule is given
+            schedule: Cooling schedule name or object from cooling_schedules.py
+                      ('geometric', 'logarithmic', 'lundy-mees', 'adaptive')
+            stopping: StoppingRule for reheating on stagnation and early stopping
+                      (default: StoppingRule(), stop after 1000 iterations
+                      without improvement)
+            checkpoint: Checkpoint file path (e.g. "campus-opt.ckpt")
+            checkpoint_interval: Minimum seconds between checkpoints
+            verbose: Print progress
+
+        Returns:
+            Dictionary with 'initial_cost', 'best_cost', 'best_average_latency',
+            'links' (best link list), 'accepted', 'iterations' (moves made),
+            'stop_reason', 'best_iteration', 'reheats', 'schedule', 'elapsed'
+            and the cost cache statistics 'cache_hits', 'cache_misses',
+            'cache_hit_rate' and 'cache_size'
+        """
+        state = self.state
+        started = time.perf_counter()
+        schedule = get_schedule(schedule) if schedule is not None else Geometric(cooling_rate)
+        stopping = stopping or StoppingRule()
+        config = self._run_config(iterations, initial_temp, schedule, stopping)
+
+        if checkpoint is not None and os.path.exists(checkpoint):
+            progress, best_present = self._load_checkpoint(checkpoint, config, schedule, stopping)
+            if verbose:
+                print(f"   Resuming from {checkpoint} at iteration {progress['iteration']}")
+        else:
+            stopping.reset()
+            schedule.start(initial_temp if initial_temp is not None else self.initial_temperature(),
+                           iterations)
+            best_present = state.present.copy()
+            progress = {'iteration': 0, 'accepted': 0, 'initial_cost': state.cost,
+                        'best_cost': state.cost, 'best_latency': state.average_latency(), 'elapsed': 0.0}
+
+        temperature = schedule.temperature
+        best_cost = progress['best_cost']
+        last_saved = time.perf_counter()
+
+        for iteration in range(progress['iteration'], iterations if stopping.reason is None else 0):
+            moved = bool(self.step(temperature))
+            if moved:
+                progress['accepted'] += 1
+                if state.cost < best_cost - _EPS:
+                    best_cost, best_present = state.cost, state.present.copy()
+                    progress['best_cost'], progress['best_latency'] = best_cost, state.average_latency()
+            schedule.update(moved)
+            progress['iteration'] = iteration + 1
+            if stopping.check(iteration, best_cost, schedule):
+                break
+            temperature = schedule.temperature
+
+            if verbose and iteration % 500 == 0:
+                print(f"   Iter {iteration}: temp = {temperature:.3f}, cost = {state.cost:.2f}, "
+                      f"best = {best_cost:.2f}, links = {len(state.links)}")
+            if checkpoint is not None and time.perf_counter() - last_saved >= checkpoint_interval:
+                self._save_checkpoint(checkpoint, config, progress, best_present, schedule, stopping, started)
+                last_saved = time.perf_counter()
+
+        if checkpoint is not None and os.path.exists(checkpoint):
+            os.remove(checkpoint)  # finished: a rerun must start over, not resume
+        return {
+            'initial_cost': progress['initial_cost'],
+            'best_cost': best_cost,
+            'best_average_latency': progress['best_latency'],
+            'links': state.link_list(best_present),
+            'accepted': progress['accepted'],
+            **stopping.summary(progress['iteration']),
+            'schedule': schedule.name,
+            **self.cache.stats(),
+            'elapsed': progress['elapsed'] + time.perf_counter() - started,
+        }
+
+    def _run_config(self, iterations: int, initial_temp: Optional[float], schedule,
+                    stopping: StoppingRule) -> Dict:
+        """Everything a resumed run must share with the checkpointed one (JSON-normalized)."""
+        options = {k: v for k, v in self.state_options.items() if k != 'candidate_links'}
+        config = {
+            'problem': self.problem_digest,
+            'options': options,
+            'seed': self.seed,
+            'iterations': iterations,
+            'initial_temp': initial_temp,
+            'schedule': [schedule.name, schedule.settings()],
+            'stopping': stopping.settings(),
+        }
+        return json.loads(json.dumps(config, sort_keys=True, default=repr))
+
+    def _save_checkpoint(self, path: str, config: Dict, progress: Dict, best_present: np.ndarray,
+                         schedule, stopping: StoppingRule, started: float):
+        """Write the optimizer state to `path` atomically (temp file + os.replace)."""
+        meta = {
+            'config': config,
+            'progress': dict(progress, elapsed=progress['elapsed'] + time.perf_counter() - started),
+            'cost': self.state.cost,
+            'rng': self.rng.bit_generator.state,
+            'schedule': [schedule.name, schedule.get_state()],
+            'stopping': stopping.get_state(),
+            'cache': [self.cache.hits, self.cache.misses],
+        }
+        arrays = dict(self.state.get_state(), best=np.flatnonzero(best_present).astype(np.int32),
+                      cache_keys=np.array(list(self.cache.data.keys()), dtype=np.uint64),
+                      cache_costs=np.array(list(self.cache.data.values()), dtype=np.float64))
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8), **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            default_file_mode(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _load_checkpoint(self, path: str, config: Dict, schedule, stopping: StoppingRule):
+        """Restore state, RNG, schedule and stopping rule; returns (progress, best link mask)."""
+        with np.load(path) as data:
+            meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+            saved = meta.get('config', {})
+            changed = sorted(key for key in config if saved.get(key) != config[key])
+            if changed:
+                raise ValueError(f"Checkpoint {path} belongs to another run (changed: {', '.join(changed)}); "
+                                 f"delete it to start over")
+            self.state.set_state(data['links'], data['distances'], meta['cost'])
+            best_present = np.zeros(len(self.state.present), dtype=bool)
+            best_present[data['best']] = True
+            self.cache.data.clear()
+            for key, cost in zip(data['cache_keys'].tolist(), data['cache_costs'].tolist()):
+                self.cache.data[key] = cost
+            self.cache.hits, self.cache.misses = meta['cache']
+        self.rng.bit_generator.state = meta['rng']
+        schedule.set_state(meta['schedule'][1])
+        stopping.set_state(meta['stopping'])
+        return meta['progress'], best_present
+
+
+def apply_links(G: nx.Graph, links: List[Tuple[Hashable, Hashable, float]], weight: str = 'weight') -> Tuple[int, int]:
+    """
+    Make G's link set equal to `links` (keeping attributes of kept links).
+
+    Returns:
+        Tuple of (links added, links removed)
+    """
+    wanted = {link_key(u, v): w for u, v, w in links}
+    removed = [(u, v) for u, v in G.edges() if link_key(u, v) not in wanted]
+    G.remove_edges_from(removed)
+    added = [(u, v, {weight: w}) for (u, v), w in wanted.items() if not G.has_edge(u, v)]
+    G.add_edges_from(added)
+    return len(added), len(removed)
@@ -0,0 +1,470 @@
+"""
+Topology Engines - annealing, tabu search and a genetic algorithm behind one
+interface, plus a harness that races them.
+
+All engines work on a TopologyState (topology_annealing.py), which already
+provides everything a local-search optimizer needs:
+
+    state.cost                          cost of the current topology
+    state.propose(rng) -> move          random neighbour move, (link, add) or None
+    state.evaluate(move) -> (cost, u)   delta cost of a move; state unchanged
+    state.apply(move, u, cost)          accept the move
+    state.present / toggle_links(ids)   jump to another link set (genetic engine)
+
+An engine only decides which moves to try and which to accept:
+
+- AnnealingEngine: one random move per step, Metropolis acceptance on a
+  cooling schedule (TopologyAnnealer.step).
+- TabuEngine: samples a neighbourhood of moves per step and takes the best
+  one, even if it is worse. Links changed in the last `tenure` steps may not
+  be changed again, unless that gives a new best (aspiration).
+- GeneticEngine: steady-state GA. Each step crosses two tournament-picked
+  parents (each differing link from either parent), mutates the child with
+  a few random moves and replaces the worst member if the child is better.
+
+Engines never print. Engine.run() stops after a number of steps, a time
+limit or a target cost, and records a trace of (seconds, best cost) at every
+improvement. compare_engines() runs every engine on the same seeded problem
+set and turns the traces into time-to-quality curves, to pick the fastest
+engine per topology size.
+
+Example:
+    engine = TabuEngine(builder.G, seed=1, link_cost=2.0)
+    result = engine.run(time_limit=5.0)
+    print(result['best_cost'], result['trace'][-1])
+
+    report = compare_engines(problem_set(sizes=(30, 60, 120)), time_limit=3.0)
+    print_comparison(report)
+"""
+
+import math
+import os
+import sys
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import networkx as nx
+import numpy as np
+
+from topology_annealing import TopologyAnnealer, TopologyState
+
+# Cooling schedules live with the annealing lesson, mesh generators with the graph lesson
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(_ROOT, "02-optimization"))
+sys.path.append(os.path.join(_ROOT, "01-graphs"))
+from cooling_schedules import Geometric, get_schedule  # noqa: E402
+from mesh_generators import generate_mesh_edges  # noqa: E402
+
+_EPS = 1e-9
+_REBUILD_ABOVE = 32  # toggle_links() rebuilds from scratch above this many links
+_TIME_FINAL_RATIO = 1e-3  # time-limited annealing ends at this fraction of T_0
+
+
+class Engine:
+    """
+    Base class: subclasses implement step(), one unit of search work.
+
+    Subclasses set self.state (a TopologyState) and self.rng, and count the
+    moves they cost in self.evaluations (a rebuild from scratch counts as one).
+    """
+
+    name = "engine"
+
+    def __init__(self, G: nx.Graph, seed: Optional[int] = None, **state_options):
+        """
+        Args:
+            G: Starting network (not modified)
+            seed: Random seed
+            **state_options: TopologyState options (candidate_links, link_cost,
+                             min_degree, degree_penalty, bridge_penalty, ...)
+        """
+        self.state = TopologyState(G, **state_options)
+        self.rng = np.random.default_rng(seed)
+        self.evaluations = 0
+
+    def start(self, iterations: Optional[int], time_limit: Optional[float] = None):
+        """Prepare a run of `iterations` steps and/or `time_limit` seconds (None if not limited)."""
+
+    def step(self):
+        raise NotImplementedError
+
+    def run(self, iterations: Optional[int] = None, time_limit: Optional[float] = None,
+            target: Optional[float] = None,
+            callback: Optional[Callable[['Engine', int], None]] = None) -> Dict:
+        """
+        Step until `iterations` steps, `time_limit` seconds or a best cost
+        of `target` or less, whichever comes first.
+
+        Args:
+            iterations: Maximum number of steps
+            time_limit: Maximum seconds
+            target: Stop once the best cost is this low
+            callback: Called as callback(engine, iteration) after every step
+                      (e.g. for progress output)
+
+        Returns:
+            Dictionary with 'engine', 'initial_cost', 'best_cost',
+            'best_average_latency', 'links' (best link list), 'iterations',
+            'evaluations' (moves costed), 'trace' [(seconds, best cost), ...]
+            and 'elapsed'
+        """
+        if iterations is None and time_limit is None and target is None:
+            raise ValueError("Give iterations, time_limit or target, or the run never ends")
+        state = self.state
+        started = time.perf_counter()
+        self.start(iterations, time_limit)
+        initial_cost = best_cost = state.cost
+        best_present = state.present.copy()
+        trace = [(0.0, best_cost)]
+
+        iteration = 0
+        while iterations is None or iteration < iterations:
+            if target is not None and best_cost <= target:
+                break
+            if time_limit is not None and time.perf_counter() - started >= time_limit:
+                break
+            self.step()
+            iteration += 1
+            if state.cost < best_cost - _EPS:
+                best_cost, best_present = state.cost, state.present.copy()
+                trace.append((time.perf_counter() - started, best_cost))
+            if callback is not None:
+                callback(self, iteration)
+
+        elapsed = time.perf_counter() - started
+        state.toggle_links(np.flatnonzero(best_present != state.present))
+        return {
+            'engine': self.name,
+            'initial_cost': initial_cost,
+            'best_cost': best_cost,
+            'best_average_latency': state.average_latency(),
+            'links': state.link_list(),
+            'iterations': iteration,
+            'evaluations': self.evaluations,
+            'trace': trace,
+            'elapsed': elapsed,
+        }
+
+
+class AnnealingEngine(Engine):
+    """Simulated annealing, one Metropolis move per step."""
+
+    name = "annealing"
+
+    def __init__(self, G: nx.Graph, seed: Optional[int] = None, initial_temp: Optional[float] = None,
+                 schedule=None, cache_size: int = 0, **state_options):
+        """
+        Args:
+            G: Starting network (not modified)
+            seed: Random seed
+            initial_temp: Starting temperature (default: estimated from sample moves)
+            schedule: Cooling schedule name or object from cooling_schedules.py
+                      (default: geometric, reaching 1/1000 of initial_temp at the
+                      end of the run; by elapsed time if only time-limited)
+            cache_size: Topology costs remembered by fingerprint (default 0: off)
+            **state_options: TopologyState options
+        """
+        self.annealer = TopologyAnnealer(G, seed=seed, cache_size=cache_size, **state_options)
+        self.state, self.rng = self.annealer.state, self.annealer.rng
+        self.evaluations = 0
+        self.initial_temp = initial_temp
+        self.schedule = get_schedule(schedule) if schedule is not None else None
+        self._clock = None              # (started, time_limit, T_0) when cooling by time
+
+    def start(self, iterations: Optional[int], time_limit: Optional[float] = None):
+        started = time.perf_counter()
+        temperature = self.initial_temp
+        if temperature is None:
+            temperature = self.annealer.initial_temperature()
+        if self.schedule is None and iterations is None and time_limit is not None:
+            # No step count to size a schedule: cool by the fraction of time used
+            self._clock = (started, time_limit, temperature)
+            return
+        self._clock = None
+        if self.schedule is None:
+            self.schedule = Geometric()
+        self.schedule.start(temperature, iterations)
+
+    def temperature(self) -> float:
+        """Current temperature (from the schedule, or the clock if cooling by time)."""
+        if self._clock is None:
+            return self.schedule.temperature
+        started, time_limit, initial_temp = self._clock
+        used = min((time.perf_counter() - started) / time_limit, 1.0) if time_limit > 0 else 1.0
+        return initial_temp * _TIME_FINAL_RATIO ** used
+
+    def step(self):
+        moved = self.annealer.step(self.temperature())
+        self.evaluations += 1
+        if self._clock is None:
+            self.schedule.update(bool(moved))
+
+
+class TabuEngine(Engine):
+    """Best move of a sampled neighbourhood, with a tabu list of recently changed links."""
+
+    name = "tabu"
+
+    def __init__(self, G: nx.Graph, seed: Optional[int] = None, neighbourhood: int = 20,
+                 tenure: Optional[int] = None, **state_options):
+        """
+        Args:
+            G: Starting network (not modified)
+            seed: Random seed
+            neighbourhood: Moves sampled and costed per step
+            tenure: Steps a changed link stays tabu (default: about sqrt of
+                    the number of candidate links)
+            **state_options: TopologyState options
+        """
+        super().__init__(G, seed, **state_options)
+        self.neighbourhood = neighbourhood
+        self.tenure = tenure or max(5, int(math.sqrt(len(self.state.present))))
+        self.tabu: deque = deque()
+        self.tabu_links = set()
+        self.best_cost = self.state.cost
+
+    def step(self):
+        state = self.state
+        best = None
+        seen = set()
+        for _ in range(self.neighbourhood):
+            move = state.propose(self.rng)
+            if move is None or move in seen:
+                continue
+            seen.add(move)
+            cost, update = state.evaluate(move)
+            self.evaluations += 1
+            # Tabu moves are only allowed if they beat the best cost so far (aspiration)
+            if move[0] in self.tabu_links and cost >= self.best_cost - _EPS:
+                continue
+            if best is None or cost < best[1]:
+                best = (move, cost, update)
+        if best is None:
+            return
+        move, cost, update = best
+        state.apply(move, update, cost)
+        self.best_cost = min(self.best_cost, cost)
+        self.tabu.append(move[0])
+        self.tabu_links.add(move[0])
+        if len(self.tabu) > self.tenure:
+            self.tabu_links.discard(self.tabu.popleft())
+
+
+class GeneticEngine(Engine):
+    """Steady-state genetic algorithm: one child per step replaces the worst member."""
+
+    name = "genetic"
+
+    def __init__(self, G: nx.Graph, seed: Optional[int] = None, population: int = 20,
+                 mutation_moves: int = 2, tournament: int = 2, **state_options):
+        """
+        Args:
+            G: Starting network (not modified)
+            seed: Random seed
+            population: Number of link sets kept
+            mutation_moves: Random moves applied to every child
+            tournament: Members compared per parent pick
+            **state_options: TopologyState options
+        """
+        super().__init__(G, seed, **state_options)
+        self.population = population
+        self.mutation_moves = mutation_moves
+        self.tournament = tournament
+        self.members: List[np.ndarray] = []
+        self.costs: List[float] = []
+        self.keys: List[int] = []          # fingerprints of the members
+
+    def _toggle(self, links: np.ndarray):
+        """toggle_links, counting one evaluation per link, or one for a rebuild."""
+        self.state.toggle_links(links, rebuild_above=_REBUILD_ABOVE)
+        self.evaluations += len(links) if len(links) <= _REBUILD_ABOVE else 1
+
+    def _load(self, present: np.ndarray):
+        self._toggle(np.flatnonzero(present != self.state.present))
+
+    def _mutate(self, moves: int):
+        for _ in range(moves):
+            move = self.state.propose(self.rng)
+            if move is None:
+                return
+            cost, update = self.state.evaluate(move)
+            self.evaluations += 1
+            self.state.apply(move, update, cost)
+
+    def _pick(self) -> np.ndarray:
+        contestants = self.rng.integers(len(self.members), size=self.tournament)
+        return self.members[min(contestants.tolist(), key=lambda k: self.costs[k])]
+
+    def start(self, iterations: Optional[int], time_limit: Optional[float] = None):
+        """First population: the starting topology and random walks from it."""
+        state = self.state
+        start = state.present.copy()
+        self.members, self.costs, self.keys = [start], [state.cost], [state.fingerprint]
+        for k in range(1, self.population):
+            self._load(start)
+            self._mutate(1 + k % (4 * self.mutation_moves))
+            if state.fingerprint not in self.keys:
+                self._add_member(len(self.members))
+        self._load(start)
+
+    def _add_member(self, slot: int):
+        """Store the current state as member `slot` (appending if slot == len)."""
+        member = (self.state.present.copy(), self.state.cost, self.state.fingerprint)
+        if slot == len(self.members):
+            self.members.append(member[0])
+            self.costs.append(member[1])
+            self.keys.append(member[2])
+        else:
+            self.members[slot], self.costs[slot], self.keys[slot] = member
+
+    def step(self):
+        state = self.state
+        first, second = self._pick(), self._pick()
+        self._load(first)
+        differ = np.flatnonzero(first != second)
+        self._toggle(differ[self.rng.random(len(differ)) < 0.5])
+        self._mutate(self.mutation_moves)
+
+        if state.fingerprint in self.keys:
+            return
+        if len(self.members) < self.population:
+            self._add_member(len(self.members))
+            return
+        worst = int(np.argmax(self.costs))
+        if state.cost < self.costs[worst]:
+            self._add_member(worst)
+
+
+ENGINES = {
+    'annealing': AnnealingEngine,
+    'tabu': TabuEngine,
+    'genetic': GeneticEngine,
+}
+
+
+def get_engine(engine: Union[str, type]) -> type:
+    """Engine class from a name ('annealing', 'tabu', 'genetic') or an Engine subclass."""
+    if isinstance(engine, type) and issubclass(engine, Engine):
+        return engine
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}' (choose from {sorted(ENGINES)})")
+    return ENGINES[engine]
+
+
+# --- comparison harness --------------------------------------------------
+
+def problem_set(sizes: Iterable[int] = (30, 60, 120), per_size: int = 2,
+                target_degree: int = 3, seed: int = 0) -> Dict[str, nx.Graph]:
+    """
+    Seeded random meshes to race engines on, named "mesh-<size>-<k>".
+
+    Uses generate_mesh_edges from 01-graphs/mesh_generators.py, so the same
+    seed always gives the same problems.
+    """
+    sizes = list(sizes)
+    seeds = iter(np.random.SeedSequence(seed).spawn(len(sizes) * per_size))
+    problems = {}
+    for size in sizes:
+        for k in range(per_size):
+            problems[f"mesh-{size}-{k}"] = generate_mesh_edges(size, target_degree, seed=next(seeds)).to_networkx()
+    return problems
+
+
+def _best_at(trace: List, times: np.ndarray) -> np.ndarray:
+    """Best cost of a run at each of `times` (the trace is a step function)."""
+    seconds = np.array([t for t, _ in trace])
+    costs = np.array([c for _, c in trace])
+    return costs[np.searchsorted(seconds, times, side='right') - 1]
+
+
+def compare_engines(problems: Dict[str, nx.Graph], engines: Iterable = ('annealing', 'tabu', 'genetic'),
+                    time_limit: float = 2.0, seeds: Iterable[int] = (0, 1, 2),
+                    targets: Iterable[float] = (0.10, 0.05, 0.01), points: int = 20,
+                    engine_options: Optional[Dict[str, Dict]] = None, **state_options) -> Dict:
+    """
+    Race engines on the same problems and seeds, one run at a time.
+
+    Quality is the gap to the best cost any run found on a problem,
+    (cost - best) / best. A time-to-quality curve is the median gap over
+    seeds after t seconds; time-to-target is the median time to first reach
+    a gap (inf if most seeds never do).
+
+    Args:
+        problems: Name -> starting network (e.g. problem_set())
+        engines: Engine names or classes
+        time_limit: Seconds per run
+        seeds: One run per engine, problem and seed
+        targets: Gaps for time-to-target
+        points: Time points per curve
+        engine_options: Engine name -> extra constructor options
+        **state_options: TopologyState options shared by all engines
+
+    Returns:
+        Dictionary with 'problems' (per problem: 'nodes', 'best_cost',
+        'curves' {engine: {'times', 'gap'}}, 'time_to_target' {engine:
+        {target: seconds}}, 'final_gap' {engine: median gap} and 'fastest')
+        and 'fastest_by_size' {nodes: engine}
+    """
+    engine_classes = [get_engine(engine) for engine in engines]
+    engine_options = engine_options or {}
+    seeds, targets = list(seeds), list(targets)
+    times = np.linspace(0, time_limit, points + 1)[1:]
+    report: Dict = {'problems': {}, 'fastest_by_size': {}}
+    by_size: Dict[int, Dict[str, List[List[float]]]] = {}
+
+    for name, G in problems.items():
+        runs = {}
+        for cls in engine_classes:
+            options = dict(state_options, **engine_options.get(cls.name, {}))
+            runs[cls.name] = [cls(G, seed=seed, **options).run(time_limit=time_limit)['trace']
+                              for seed in seeds]
+        best = min(cost for traces in runs.values() for trace in traces for _, cost in trace)
+        scale = max(abs(best), _EPS)
+
+        entry = {'nodes': G.number_of_nodes(), 'best_cost': best,
+                 'curves': {}, 'time_to_target': {}, 'final_gap': {}}
+        for engine, traces in runs.items():
+            gaps = np.array([(_best_at(trace, times) - best) / scale for trace in traces])
+            entry['curves'][engine] = {'times': times.tolist(), 'gap': np.median(gaps, axis=0).tolist()}
+            entry['final_gap'][engine] = float(np.median(gaps[:, -1]))
+            entry['time_to_target'][engine] = {}
+            for target in targets:
+                reached = [next((t for t, cost in trace if (cost - best) / scale <= target), math.inf)
+                           for trace in traces]
+                entry['time_to_target'][engine][target] = float(np.median(reached))
+        # Rank engines by time to the tightest target, then the looser ones, then final gap
+        ranking = {engine: [entry['time_to_target'][engine][target] for target in sorted(targets)]
+                   + [entry['final_gap'][engine]] for engine in runs}
+        entry['fastest'] = min(ranking, key=lambda engine: ranking[engine])
+        report['problems'][name] = entry
+        for engine, key in ranking.items():
+            by_size.setdefault(entry['nodes'], {}).setdefault(engine, []).append(key)
+
+    for size, keys in sorted(by_size.items()):
+        report['fastest_by_size'][size] = min(keys, key=lambda engine: np.median(keys[engine], axis=0).tolist())
+    return report
+
+
+def print_comparison(report: Dict):
+    """Print time-to-target tables and the fastest engine per problem and size."""
+    for name, entry in report['problems'].items():
+        print(f"\n{name} ({entry['nodes']} nodes, best cost {entry['best_cost']:.2f})")
+        targets = next(iter(entry['time_to_target'].values())).keys()
+        header = "".join(f"{f'<= {target:.0%}':>10}" for target in targets)
+        print(f"   {'engine':<12}{header}{'final gap':>12}")
+        for engine, reached in entry['time_to_target'].items():
+            cells = "".join(f"{seconds:>9.2f}s" if math.isfinite(seconds) else f"{'-':>10}"
+                            for seconds in reached.values())
+            print(f"   {engine:<12}{cells}{entry['final_gap'][engine]:>12.2%}")
+        print(f"   Fastest: {entry['fastest']}")
+    print("\nFastest engine by size:")
+    for size, engine in report['fastest_by_size'].items():
+        print(f"   {size:>6} nodes: {engine}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TOPOLOGY ENGINES: TIME TO QUALITY")
+    print("=" * 60)
+    print_comparison(compare_engines(problem_set(sizes=(30, 60)), time_limit=2.0))
@@ -0,0 +1,144 @@
+"""
+Topology Fingerprint - Zobrist hashing of network topologies, plus an LRU cache.
+
+Optimizers can revisit topologies (annealing may propose "remove link X"
+right after "add link X"), and every visit re-evaluates an expensive cost.
+To recognise a topology we need a key that is cheap to keep up to date:
+
+- Every node and every link gets a fixed random-looking 64-bit code
+  (derived from its name with BLAKE2b, so it is the same in every process
+  and every run).
+- The fingerprint of a topology is the XOR of the codes of its nodes and
+  links.
+
+Adding or removing a link XORs its code in or out: O(1), no matter how big
+the network is. The fingerprint of a neighbouring topology (one link more
+or less) is likewise one XOR away, so a cache lookup for a proposed move
+needs no graph work at all.
+
+Whether the cache pays off depends on the search. A single annealing chain
+over a large candidate pool almost never returns to a topology (hit rates
+around 0.03%, for ~10% lookup overhead), so TopologyAnnealer keeps it off
+unless cache_size is given.
+
+Example:
+    fp = TopologyFingerprint(builder.G)
+    before = fp.value
+    fp.add_link("A", "B")
+    fp.remove_link("A", "B")
+    assert fp.value == before == topology_fingerprint(builder.G)
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+import networkx as nx
+
+from topology_snapshots import link_key
+
+
+def _code(tag: bytes, item) -> int:
+    return int.from_bytes(hashlib.blake2b(tag + repr(item).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def node_code(u: Hashable) -> int:
+    """64-bit Zobrist code of a node."""
+    return _code(b'node:', u)
+
+
+def link_code(u: Hashable, v: Hashable) -> int:
+    """64-bit Zobrist code of an undirected link (order-independent)."""
+    return _code(b'link:', link_key(u, v))
+
+
+def topology_fingerprint(G: nx.Graph) -> int:
+    """XOR of the codes of all nodes and links of G (attributes are ignored)."""
+    value = 0
+    for u in G.nodes():
+        value ^= node_code(u)
+    for u, v in G.edges():
+        value ^= link_code(u, v)
+    return value
+
+
+class TopologyFingerprint:
+    """Fingerprint kept up to date edge by edge in O(1)."""
+
+    def __init__(self, G: Optional[nx.Graph] = None):
+        self.value = topology_fingerprint(G) if G is not None else 0
+
+    def add_node(self, u: Hashable):
+        self.value ^= node_code(u)
+
+    def remove_node(self, u: Hashable, links=()):
+        """Remove a node and the given incident links (e.g. G.edges(u))."""
+        self.value ^= node_code(u)
+        for a, b in links:
+            self.value ^= link_code(a, b)
+
+    def add_link(self, u: Hashable, v: Hashable):
+        self.value ^= link_code(u, v)
+
+    # XOR is its own inverse
+    remove_link = add_link
+
+    def with_link_toggled(self, u: Hashable, v: Hashable) -> int:
+        """Fingerprint of the topology with link (u, v) added or removed."""
+        return self.value ^ link_code(u, v)
+
+    def __repr__(self):
+        return f"<TopologyFingerprint {self.value:016x}>"
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with hit/miss statistics.
+
+    Example:
+        cache = LRUCache(100_000)
+        cost = cache.get(key)
+        if cost is None:
+            cost = evaluate()
+            cache.put(key, cost)
+        print(cache.stats()['cache_hit_rate'])
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self.data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Cached value (marking it recently used), or default."""
+        try:
+            self.data.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return self.data[key]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key) -> bool:
+        return key in self.data
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_hit_rate': self.hits / lookups if lookups else 0.0,
+            'cache_size': len(self.data),
+        }
@@ -0,0 +1,343 @@
+"""
+Topology Pareto Search - NSGA-II over mesh designs with three objectives.
+
+topology_annealing.py folds everything into one scalar cost, so the
+trade-off between latency, cost and redundancy is fixed by the penalty
+weights before the search starts. This module searches for the whole
+trade-off curve instead. Every design is scored on three objectives, all
+minimized:
+
+- average shortest-path latency over all router pairs
+- number of links (what the design costs to build)
+- disconnected router pairs, summed over all single link and single router
+  failures (the resilience score of link_placement.py; 0 = biconnected)
+
+Designs that are not connected at all are infeasible. They lose to every
+connected design, and among themselves fewer components win (Deb's
+constrained domination).
+
+NSGA-II keeps a population of designs (bit masks over the candidate links,
+as in TopologyState). Every generation it:
+
+1. picks parents by binary tournament on (front rank, crowding distance),
+2. makes children by uniform crossover and a few random link flips,
+3. evaluates all children as ONE batch,
+4. keeps the best half of parents + children: whole non-dominated fronts
+   first, then the least crowded designs of the front that does not fit.
+
+Evaluation is the expensive part (one all-pairs latency sweep per design),
+so each batch is split over a process pool. The read-only base data
+(candidate link arrays) is installed once per worker by the pool
+initializer, and a design travels as a packed bit mask. Identical children
+within a batch are scored once. (There is no cache of earlier designs:
+every child gets at least one random link flip and survivors are
+distinct, so repeats across generations are too rare to pay for one.)
+
+On one core, a design of a 100-router mesh takes about 3-5 ms to score, so
+the default 200 designs x 100 generations (20,000 evaluations) take one to
+two minutes; the pool divides that by the number of cores.
+
+Example:
+    search = ParetoSearch(builder.G, population=200, seed=1)
+    result = search.run(generations=100)
+    for design in result['front']:
+        print(design['num_links'], design['average_latency'], design['disconnected_pairs'])
+"""
+
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from link_placement import BlockCutTree
+from topology_annealing import TopologyState, all_pairs_latency
+
+OBJECTIVES = ('average_latency', 'num_links', 'disconnected_pairs')
+
+# Set in each worker process by init_worker so the arrays are sent only once
+_WORKER_BASE: Optional[Dict] = None
+
+
+def init_worker(base: Dict):
+    """Pool initializer: keep the candidate link arrays in the worker process."""
+    global _WORKER_BASE
+    _WORKER_BASE = base
+
+
+def evaluate_designs(packed: np.ndarray) -> np.ndarray:
+    """
+    Score a batch of designs against the base data installed by init_worker.
+
+    Args:
+        packed: Design bit masks, one np.packbits row per design
+
+    Returns:
+        Array (designs x 4): the three objectives and the number of extra
+        components (0 for feasible designs, whose objectives are then inf-free)
+    """
+    base = _WORKER_BASE
+    n, cand_i, cand_j, cand_w = base['n'], base['cand_i'], base['cand_j'], base['cand_w']
+    identity = {u: u for u in range(n)}
+    masks = np.unpackbits(packed, axis=1, count=len(cand_i)).astype(bool)
+    scores = np.empty((len(masks), 4))
+    for row, mask in enumerate(masks):
+        i, j, w = cand_i[mask], cand_j[mask], cand_w[mask]
+        H = nx.Graph()
+        H.add_nodes_from(range(n))
+        H.add_edges_from(zip(i.tolist(), j.tolist()))
+        components = nx.number_connected_components(H)
+        if components > 1:
+            scores[row] = (np.inf, len(i), np.inf, components - 1)
+            continue
+        D = all_pairs_latency(n, i, j, w)
+        tree = BlockCutTree(H, identity)
+        scores[row] = (D.sum() / (n * (n - 1)), len(i),
+                       tree.link_failure_pairs + tree.node_failure_pairs, 0)
+    return scores
+
+
+def constrained_dominance(scores: np.ndarray) -> np.ndarray:
+    """
+    dominates[a, b]: design a beats design b under Deb's constrained domination.
+
+    Feasible designs (no extra components) beat infeasible ones, infeasible
+    designs are compared by their number of extra components, and equals are
+    compared by Pareto dominance on the objectives.
+    """
+    objectives, violation = scores[:, :3], scores[:, 3]
+    with np.errstate(invalid='ignore'):
+        no_worse = (objectives[:, None, :] <= objectives[None, :, :]).all(axis=2)
+        better = (objectives[:, None, :] < objectives[None, :, :]).any(axis=2)
+    pareto = no_worse & better
+    same = violation[:, None] == violation[None, :]
+    return np.where(same, pareto, violation[:, None] < violation[None, :])
+
+
+def non_dominated_fronts(scores: np.ndarray) -> List[np.ndarray]:
+    """Indices of each non-dominated front, best front first."""
+    dominates = constrained_dominance(scores)
+    dominated_by = dominates.sum(axis=0)
+    fronts = []
+    remaining = np.ones(len(scores), dtype=bool)
+    while remaining.any():
+        front = np.flatnonzero(remaining & (dominated_by == 0))
+        fronts.append(front)
+        remaining[front] = False
+        dominated_by -= dominates[front].sum(axis=0)
+    return fronts
+
+
+def crowding_distance(objectives: np.ndarray) -> np.ndarray:
+    """
+    NSGA-II crowding distance of each design within one front.
+
+    Boundary designs get inf; objectives that are not finite for the whole
+    front (infeasible designs) are skipped.
+    """
+    count = len(objectives)
+    distance = np.zeros(count)
+    if count <= 2:
+        distance[:] = np.inf
+        return distance
+    for column in objectives.T:
+        if not np.isfinite(column).all():
+            continue
+        order = np.argsort(column, kind='stable')
+        values = column[order]
+        span = values[-1] - values[0]
+        distance[order[0]] = distance[order[-1]] = np.inf
+        if span > 0:
+            distance[order[1:-1]] += (values[2:] - values[:-2]) / span
+    return distance
+
+
+class ParetoSearch:
+    """
+    NSGA-II search for the latency / link count / resilience trade-off.
+
+    Example:
+        search = ParetoSearch(builder.G, population=100, workers=4, seed=1)
+        result = search.run(generations=50)
+        print(len(result['front']), result['evaluations'])
+    """
+
+    def __init__(self, G: nx.Graph, population: int = 200,
+                 candidate_links: Optional[Iterable[Tuple]] = None,
+                 default_latency: float = 10.0, weight: str = 'weight',
+                 crossover_rate: float = 0.9, mutation_flips: float = 2.0,
+                 workers: Optional[int] = None, seed: Optional[int] = None):
+        """
+        Args:
+            G: Starting network (not modified); seeds the first population
+            population: Designs per generation
+            candidate_links: Links designs may use, as (u, v) or (u, v, latency)
+                             tuples (default: every node pair). Existing links
+                             are always candidates.
+            default_latency: Latency of candidates given without one
+            weight: Edge attribute holding link latency
+            crossover_rate: Probability that a child mixes two parents
+                            (otherwise it copies one)
+            mutation_flips: Average number of links added/removed per child
+            workers: Evaluation processes (default: all cores)
+            seed: Random seed
+        """
+        self.state = TopologyState(G, candidate_links=candidate_links,
+                                   default_latency=default_latency, weight=weight)
+        self.population = population
+        self.crossover_rate = crossover_rate
+        self.mutation_flips = mutation_flips
+        self.workers = workers or os.cpu_count() or 1
+        self.rng = np.random.default_rng(seed)
+        self.base = {
+            'n': self.state.n,
+            'cand_i': self.state.cand_i,
+            'cand_j': self.state.cand_j,
+            'cand_w': self.state.cand_w,
+        }
+        self.evaluations = 0
+
+    # --- evaluation ------------------------------------------------------
+
+    def _evaluate(self, masks: np.ndarray, pool: Optional[Pool]) -> np.ndarray:
+        """Scores of a batch of designs, each distinct design once, in one pool.map."""
+        packed = np.packbits(masks, axis=1)
+        distinct, inverse = np.unique(packed, axis=0, return_inverse=True)
+        per_chunk = max(1, -(-len(distinct) // (self.workers * 4)))
+        chunks = [distinct[k:k + per_chunk] for k in range(0, len(distinct), per_chunk)]
+        if pool is None:
+            results = [evaluate_designs(chunk) for chunk in chunks]
+        else:
+            results = pool.map(evaluate_designs, chunks)
+        self.evaluations += len(distinct)
+        return np.concatenate(results)[inverse.reshape(-1)]
+
+    # --- variation -------------------------------------------------------
+
+    def _mutate(self, mask: np.ndarray, flips: int) -> np.ndarray:
+        """Add or remove `flips` random links (50/50) in place."""
+        for _ in range(flips):
+            if self.rng.random() < 0.5 or not mask.any():
+                absent = np.flatnonzero(~mask)
+                if len(absent):
+                    mask[absent[self.rng.integers(len(absent))]] = True
+            else:
+                present = np.flatnonzero(mask)
+                mask[present[self.rng.integers(len(present))]] = False
+        return mask
+
+    def _initial_population(self) -> np.ndarray:
+        """The starting design plus mutants of it with 1..n/2 link flips."""
+        masks = np.repeat(self.state.present[None, :], self.population, axis=0)
+        for mask in masks[1:]:
+            self._mutate(mask, int(self.rng.integers(1, max(2, self.state.n // 2) + 1)))
+        return masks
+
+    def _tournament(self, rank: np.ndarray, crowding: np.ndarray, count: int) -> np.ndarray:
+        """Winners of `count` binary tournaments (lower rank, then larger crowding)."""
+        a, b = self.rng.integers(len(rank), size=(2, count))
+        a_wins = (rank[a] < rank[b]) | ((rank[a] == rank[b]) & (crowding[a] >= crowding[b]))
+        return np.where(a_wins, a, b)
+
+    def _offspring(self, masks: np.ndarray, rank: np.ndarray, crowding: np.ndarray) -> np.ndarray:
+        count = len(masks)
+        first = masks[self._tournament(rank, crowding, count)]
+        second = masks[self._tournament(rank, crowding, count)]
+        # Uniform crossover: each link comes from either parent
+        mix = self.rng.random(first.shape) < 0.5
+        mix &= (self.rng.random(count) < self.crossover_rate)[:, None]
+        children = np.where(mix, second, first)
+        for child, flips in zip(children, self.rng.poisson(self.mutation_flips, count)):
+            self._mutate(child, max(int(flips), 1))
+        return children
+
+    # --- selection -------------------------------------------------------
+
+    def _select(self, masks: np.ndarray, scores: np.ndarray):
+        """
+        Survivors of parents + children: distinct designs, whole fronts
+        first, then the least crowded of the front that does not fit.
+
+        Returns:
+            Tuple of (masks, scores, rank, crowding) of the survivors
+        """
+        _, distinct = np.unique(np.packbits(masks, axis=1), axis=0, return_index=True)
+        distinct = np.sort(distinct)
+        masks, scores = masks[distinct], scores[distinct]
+
+        chosen, ranks, crowds = [], [], []
+        for rank, front in enumerate(non_dominated_fronts(scores)):
+            crowding = crowding_distance(scores[front, :3])
+            room = self.population - sum(len(c) for c in chosen)
+            if len(front) > room:
+                keep = np.argsort(-crowding, kind='stable')[:room]
+                front, crowding = front[keep], crowding[keep]
+            chosen.append(front)
+            ranks.append(np.full(len(front), rank))
+            crowds.append(crowding)
+            if len(front) == room:
+                break
+        chosen = np.concatenate(chosen)
+        return masks[chosen], scores[chosen], np.concatenate(ranks), np.concatenate(crowds)
+
+    # --- main loop -------------------------------------------------------
+
+    def run(self, generations: int = 100, verbose: bool = True) -> Dict:
+        """
+        Evolve the population and return its non-dominated front.
+
+        Args:
+            generations: Number of generations
+            verbose: Print progress every 10 generations
+
+        Returns:
+            Dictionary with 'front' (feasible non-dominated designs sorted by
+            link count, each with 'links' [(u, v, latency), ...],
+            'num_links', 'average_latency' and 'disconnected_pairs'),
+            'front_sizes' (per generation), 'generations', 'evaluations'
+            (designs actually scored) and 'elapsed'
+        """
+        started = time.perf_counter()
+        pool = None
+        if self.workers > 1:
+            pool = Pool(self.workers, initializer=init_worker, initargs=(self.base,))
+        else:
+            init_worker(self.base)
+        try:
+            masks = self._initial_population()
+            masks, scores, rank, crowding = self._select(masks, self._evaluate(masks, pool))
+            front_sizes = []
+            for generation in range(generations):
+                children = self._offspring(masks, rank, crowding)
+                scores = np.concatenate([scores, self._evaluate(children, pool)])
+                masks, scores, rank, crowding = self._select(np.concatenate([masks, children]), scores)
+                front_sizes.append(int((rank == 0).sum()))
+                if verbose and generation % 10 == 0:
+                    best = scores[rank == 0]
+                    print(f"   Generation {generation}: front of {front_sizes[-1]} designs, "
+                          f"latency {best[:, 0].min():.2f}-{best[:, 0].max():.2f}, "
+                          f"links {best[:, 1].min():.0f}-{best[:, 1].max():.0f}")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        front = []
+        for row in np.flatnonzero((rank == 0) & (scores[:, 3] == 0)):
+            self.state.toggle_links(np.flatnonzero(masks[row] != self.state.present))
+            front.append({
+                'links': self.state.link_list(),
+                'num_links': int(scores[row, 1]),
+                'average_latency': float(scores[row, 0]),
+                'disconnected_pairs': int(scores[row, 2]),
+            })
+        front.sort(key=lambda design: (design['num_links'], design['average_latency']))
+        return {
+            'front': front,
+            'front_sizes': front_sizes,
+            'generations': generations,
+            'evaluations': self.evaluations,
+            'elapsed': time.perf_counter() - started,
+        }
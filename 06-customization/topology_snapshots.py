@@ -0,0 +1,577 @@
+"""
+Topology Snapshots - cheap copy-on-write versions of a network and fast diffs.
+
+What-if design work means trying a change, measuring it, and going back.
+Copying the whole graph for every version is wasteful when a version only
+touches a handful of links. Here a snapshot stores nodes and links in a
+persistent hash trie:
+
+- Taking a snapshot copies only the trie paths leading to nodes/links that
+  changed since the previous snapshot; every unchanged subtree is shared.
+  Hundreds of versions cost little more than one graph.
+- Diffing two related snapshots skips shared subtrees, so it runs in time
+  proportional to the change, not to the size of the network.
+
+Changes are tracked by TrackedGraph, an nx.Graph that records which nodes
+and links were added, removed or had attributes modified (including
+in-place edits such as G.edges[u, v]['weight'] = 5). Plain nx.Graphs work
+too - their snapshots just need one full comparison pass.
+
+Example:
+    before = take_snapshot(G)
+    G.remove_edge("A", "B")
+    after = take_snapshot(G)
+    changes = diff_snapshots(before, after)
+    print(changes['removed_links'])          # [('A', 'B')]
+"""
+
+from typing import Dict, Hashable, Iterator, Optional, Tuple
+
+import networkx as nx
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+_MISSING = object()
+
+
+def _hash(key: Hashable) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _same(a, b) -> bool:
+    """Equality that treats incomparable values (e.g. arrays) as different."""
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+class _Leaf:
+    __slots__ = ('hash', 'key', 'value')
+
+    def __init__(self, h: int, key, value):
+        self.hash, self.key, self.value = h, key, value
+
+
+class _Collision:
+    """Several keys whose full 64-bit hashes are equal."""
+    __slots__ = ('hash', 'entries')
+
+    def __init__(self, h: int, entries: Tuple[Tuple[Hashable, object], ...]):
+        self.hash, self.entries = h, entries
+
+
+class _Branch:
+    """Inner trie node: bitmap of occupied slots + compact tuple of children."""
+    __slots__ = ('bitmap', 'children')
+
+    def __init__(self, bitmap: int, children: tuple):
+        self.bitmap, self.children = bitmap, children
+
+
+def _entries(node) -> Iterator[Tuple[Hashable, object]]:
+    if node is None:
+        return
+    if isinstance(node, _Leaf):
+        yield node.key, node.value
+    elif isinstance(node, _Collision):
+        yield from node.entries
+    else:
+        for child in node.children:
+            yield from _entries(child)
+
+
+def _merge(a, b, shift: int) -> _Branch:
+    """Branch holding two leaves/collisions with different hashes."""
+    ia, ib = (a.hash >> shift) & _MASK, (b.hash >> shift) & _MASK
+    if ia == ib:
+        return _Branch(1 << ia, (_merge(a, b, shift + _BITS),))
+    children = (a, b) if ia < ib else (b, a)
+    return _Branch((1 << ia) | (1 << ib), children)
+
+
+def _set(node, shift: int, h: int, key, value):
+    """Path-copying insert; returns the same node object when nothing changes."""
+    if node is None:
+        return _Leaf(h, key, value)
+    if isinstance(node, _Leaf):
+        if node.hash == h and node.key == key:
+            return node if _same(node.value, value) else _Leaf(h, key, value)
+        if node.hash == h:
+            return _Collision(h, ((node.key, node.value), (key, value)))
+        return _merge(node, _Leaf(h, key, value), shift)
+    if isinstance(node, _Collision):
+        if node.hash != h:
+            return _merge(node, _Leaf(h, key, value), shift)
+        for i, (k, v) in enumerate(node.entries):
+            if k == key:
+                if _same(v, value):
+                    return node
+                return _Collision(h, node.entries[:i] + ((key, value),) + node.entries[i + 1:])
+        return _Collision(h, node.entries + ((key, value),))
+
+    bit = 1 << ((h >> shift) & _MASK)
+    idx = (node.bitmap & (bit - 1)).bit_count()
+    if node.bitmap & bit:
+        child = node.children[idx]
+        new_child = _set(child, shift + _BITS, h, key, value)
+        if new_child is child:
+            return node
+        return _Branch(node.bitmap, node.children[:idx] + (new_child,) + node.children[idx + 1:])
+    return _Branch(node.bitmap | bit, node.children[:idx] + (_Leaf(h, key, value),) + node.children[idx:])
+
+
+def _delete(node, shift: int, h: int, key):
+    """Path-copying delete; returns None for an emptied subtree."""
+    if node is None:
+        return None
+    if isinstance(node, _Leaf):
+        return None if node.hash == h and node.key == key else node
+    if isinstance(node, _Collision):
+        if node.hash != h:
+            return node
+        remaining = tuple((k, v) for k, v in node.entries if k != key)
+        if len(remaining) == len(node.entries):
+            return node
+        return _Leaf(h, *remaining[0]) if len(remaining) == 1 else _Collision(h, remaining)
+
+    bit = 1 << ((h >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node
+    idx = (node.bitmap & (bit - 1)).bit_count()
+    child = node.children[idx]
+    new_child = _delete(child, shift + _BITS, h, key)
+    if new_child is child:
+        return node
+    if new_child is not None:
+        return _Branch(node.bitmap, node.children[:idx] + (new_child,) + node.children[idx + 1:])
+    children = node.children[:idx] + node.children[idx + 1:]
+    if not children:
+        return None
+    if len(children) == 1 and not isinstance(children[0], _Branch):
+        return children[0]  # a lone leaf can move up: lookups check keys at any depth
+    return _Branch(node.bitmap & ~bit, children)
+
+
+def _build(entries: list, shift: int):
+    """Build a trie from (hash, key, value) entries with distinct keys."""
+    if len(entries) == 1:
+        return _Leaf(*entries[0])
+    if shift >= 64:
+        return _Collision(entries[0][0], tuple((k, v) for _, k, v in entries))
+    groups: Dict[int, list] = {}
+    for entry in entries:
+        groups.setdefault((entry[0] >> shift) & _MASK, []).append(entry)
+    bitmap = 0
+    children = []
+    for idx in sorted(groups):
+        bitmap |= 1 << idx
+        children.append(_build(groups[idx], shift + _BITS))
+    return _Branch(bitmap, tuple(children))
+
+
+def _diff(a, b, shift: int) -> Iterator[Tuple[Hashable, object, object]]:
+    """Yield (key, old, new) for differing entries, skipping shared subtrees."""
+    if a is b:
+        return
+    if isinstance(a, _Branch) and isinstance(b, _Branch):
+        a_children = dict(zip(_bit_indices(a.bitmap), a.children))
+        b_children = dict(zip(_bit_indices(b.bitmap), b.children))
+        for idx in sorted(a_children.keys() | b_children.keys()):
+            yield from _diff(a_children.get(idx), b_children.get(idx), shift + _BITS)
+        return
+    old, new = dict(_entries(a)), dict(_entries(b))
+    for key, value in old.items():
+        other = new.get(key, _MISSING)
+        if other is _MISSING or not _same(value, other):
+            yield key, value, other
+    for key, value in new.items():
+        if key not in old:
+            yield key, _MISSING, value
+
+
+def _bit_indices(bitmap: int) -> Iterator[int]:
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+class PersistentMap:
+    """
+    Immutable hash-trie mapping. set() and delete() return new maps that
+    share all untouched structure with the original.
+    """
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self, _root=None, _size: int = 0):
+        self._root = _root
+        self._size = _size
+
+    @classmethod
+    def from_items(cls, items) -> 'PersistentMap':
+        """Build a map in one pass (faster than repeated set())."""
+        entries = {}
+        for key, value in items:
+            entries[key] = value
+        if not entries:
+            return cls()
+        return cls(_build([(_hash(k), k, v) for k, v in entries.items()], 0), len(entries))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self):
+        return (key for key, _ in _entries(self._root))
+
+    def __reduce__(self):
+        # Trie layout depends on per-process string hashing: rebuild on unpickle
+        return PersistentMap.from_items, (list(self.items()),)
+
+    def items(self) -> Iterator[Tuple[Hashable, object]]:
+        return _entries(self._root)
+
+    def get(self, key, default=None):
+        h = _hash(key)
+        node = self._root
+        shift = 0
+        while isinstance(node, _Branch):
+            bit = 1 << ((h >> shift) & _MASK)
+            if not node.bitmap & bit:
+                return default
+            node = node.children[(node.bitmap & (bit - 1)).bit_count()]
+            shift += _BITS
+        if isinstance(node, _Leaf):
+            return node.value if node.hash == h and node.key == key else default
+        if isinstance(node, _Collision) and node.hash == h:
+            for k, v in node.entries:
+                if k == key:
+                    return v
+        return default
+
+    def set(self, key, value) -> 'PersistentMap':
+        h = _hash(key)
+        root = _set(self._root, 0, h, key, value)
+        if root is self._root:
+            return self
+        return PersistentMap(root, self._size + (0 if key in self else 1))
+
+    def delete(self, key) -> 'PersistentMap':
+        root = _delete(self._root, 0, _hash(key), key)
+        if root is self._root:
+            return self
+        return PersistentMap(root, self._size - 1)
+
+    def diff(self, other: 'PersistentMap') -> Iterator[Tuple[Hashable, object, object]]:
+        """
+        Yield (key, old_value, new_value) for every key that differs between
+        self (old) and other (new). Missing values are MISSING.
+        """
+        return _diff(self._root, other._root, 0)
+
+
+MISSING = _MISSING
+
+
+def link_key(u: Hashable, v: Hashable) -> Tuple[Hashable, Hashable]:
+    """Canonical (order-independent) key for an undirected link."""
+    try:
+        return (u, v) if u <= v else (v, u)
+    except TypeError:
+        return (u, v) if repr(u) <= repr(v) else (v, u)
+
+
+class _TrackedDict(dict):
+    """Attribute dict that reports in-place edits to its TrackedGraph."""
+
+    _owner = None
+
+    def _touch(self):
+        if self._owner is not None:
+            graph, kind, key = self._owner
+            graph._mark(kind, key)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._touch()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._touch()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._touch()
+
+    def pop(self, *args):
+        self._touch()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._touch()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self._touch()
+        return super().setdefault(key, default)
+
+    def clear(self):
+        super().clear()
+        self._touch()
+
+
+class TrackedGraph(nx.Graph):
+    """
+    nx.Graph that remembers which nodes and links changed since its last
+    snapshot, so the next snapshot only copies those.
+
+    Behaves exactly like nx.Graph otherwise.
+    """
+
+    node_attr_dict_factory = _TrackedDict
+    edge_attr_dict_factory = _TrackedDict
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self.base: Optional['TopologySnapshot'] = None
+        self._dirty_nodes = set()
+        self._dirty_links = set()
+        self._cleared = False
+        super().__init__(incoming_graph_data, **attr)
+
+    # --- change tracking -------------------------------------------------
+
+    def _mark(self, kind: str, key):
+        if self.base is not None:
+            (self._dirty_nodes if kind == 'node' else self._dirty_links).add(key)
+
+    def _mark_node(self, n):
+        self._dirty_nodes.add(n)
+        self._node[n]._owner = (self, 'node', n)
+
+    def _mark_link(self, u, v):
+        key = link_key(u, v)
+        self._dirty_links.add(key)
+        self._adj[u][v]._owner = (self, 'link', key)
+
+    def _mark_incident(self, n):
+        if n in self._adj:
+            self._dirty_nodes.add(n)
+            for nbr in self._adj[n]:
+                self._dirty_links.add(link_key(n, nbr))
+
+    def _bind_all(self):
+        """Point every attribute dict back at this graph (one pass)."""
+        for n, attrs in self._node.items():
+            attrs._owner = (self, 'node', n)
+        for u, nbrs in self._adj.items():
+            for v, attrs in nbrs.items():
+                attrs._owner = (self, 'link', link_key(u, v))
+
+    def track_from(self, snapshot: Optional['TopologySnapshot']):
+        """Start recording changes relative to `snapshot`."""
+        if self.base is None and snapshot is not None:
+            self._bind_all()  # nothing is tracked (or bound) before the first snapshot
+        self.base = snapshot
+        self._dirty_nodes = set()
+        self._dirty_links = set()
+        self._cleared = False
+
+    def changes(self) -> Tuple[set, set, bool]:
+        """(dirty node keys, dirty link keys, whether clear() was called)."""
+        return self._dirty_nodes, self._dirty_links, self._cleared
+
+    # --- mutators (tracking only starts with the first snapshot) ---------
+
+    def add_node(self, node_for_adding, **attr):
+        super().add_node(node_for_adding, **attr)
+        if self.base is not None:
+            self._mark_node(node_for_adding)
+
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        if self.base is None:
+            return super().add_nodes_from(nodes_for_adding, **attr)
+        nodes_for_adding = list(nodes_for_adding)
+        super().add_nodes_from(nodes_for_adding, **attr)
+        for item in nodes_for_adding:
+            try:
+                hash(item)
+                n = item
+            except TypeError:
+                n = item[0]  # (node, attr_dict) pair
+            self._mark_node(n)
+
+    def remove_node(self, n):
+        if self.base is not None:
+            self._mark_incident(n)
+        super().remove_node(n)
+
+    def remove_nodes_from(self, nodes):
+        if self.base is None:
+            return super().remove_nodes_from(nodes)
+        nodes = list(nodes)
+        for n in nodes:
+            self._mark_incident(n)
+        super().remove_nodes_from(nodes)
+
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        super().add_edge(u_of_edge, v_of_edge, **attr)
+        if self.base is not None:
+            self._mark_node(u_of_edge)
+            self._mark_node(v_of_edge)
+            self._mark_link(u_of_edge, v_of_edge)
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        if self.base is None:
+            return super().add_edges_from(ebunch_to_add, **attr)
+        ebunch_to_add = list(ebunch_to_add)
+        new_nodes = {n for e in ebunch_to_add for n in e[:2] if n not in self._node}
+        super().add_edges_from(ebunch_to_add, **attr)
+        for n in new_nodes:
+            self._mark_node(n)
+        for e in ebunch_to_add:
+            self._mark_link(e[0], e[1])
+
+    def remove_edge(self, u, v):
+        super().remove_edge(u, v)
+        self._mark('link', link_key(u, v))
+
+    def remove_edges_from(self, ebunch):
+        if self.base is None:
+            return super().remove_edges_from(ebunch)
+        ebunch = list(ebunch)
+        super().remove_edges_from(ebunch)
+        for e in ebunch:
+            self._mark('link', link_key(e[0], e[1]))
+
+    def clear(self):
+        super().clear()
+        self._cleared = True
+
+    def clear_edges(self):
+        super().clear_edges()
+        self._cleared = True
+
+
+class TopologySnapshot:
+    """
+    Immutable version of a topology (nodes, links and their attributes).
+
+    Snapshots derived from each other share unchanged structure.
+    """
+
+    __slots__ = ('nodes', 'links', 'graph', 'label')
+
+    def __init__(self, nodes: PersistentMap, links: PersistentMap,
+                 graph: Optional[Dict] = None, label: Optional[str] = None):
+        self.nodes = nodes    # node -> attribute dict
+        self.links = links    # link_key(u, v) -> attribute dict
+        self.graph = dict(graph or {})
+        self.label = label
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_links(self) -> int:
+        return len(self.links)
+
+    def __repr__(self) -> str:
+        name = f" '{self.label}'" if self.label else ""
+        return f"<TopologySnapshot{name}: {self.num_nodes} nodes, {self.num_links} links>"
+
+    def to_networkx(self, create_using=nx.Graph) -> nx.Graph:
+        """Materialize this version as a new graph (attribute dicts are copied)."""
+        G = create_using()
+        G.graph.update(self.graph)
+        G.add_nodes_from((n, dict(attrs)) for n, attrs in self.nodes.items())
+        G.add_edges_from((u, v, dict(attrs)) for (u, v), attrs in self.links.items())
+        return G
+
+
+def _attr_changes(old: Dict, new: Dict) -> Dict:
+    return {key: (old.get(key), new.get(key)) for key in old.keys() | new.keys()
+            if not _same(old.get(key, _MISSING), new.get(key, _MISSING))}
+
+
+def take_snapshot(G: nx.Graph, base: Optional[TopologySnapshot] = None,
+                  label: Optional[str] = None) -> TopologySnapshot:
+    """
+    Snapshot a graph, sharing structure with a previous snapshot.
+
+    For a TrackedGraph the previous snapshot is remembered and only the
+    recorded changes are copied. For other graphs pass `base` to share
+    structure with it (this costs one comparison pass over the graph).
+
+    Args:
+        G: Network to snapshot
+        base: Snapshot to derive from (default: the TrackedGraph's last one)
+        label: Optional name for the snapshot
+
+    Returns:
+        TopologySnapshot
+    """
+    tracked = isinstance(G, TrackedGraph)
+    if tracked and base is None:
+        base = G.base
+
+    if base is None:
+        nodes = PersistentMap.from_items((n, dict(attrs)) for n, attrs in G.nodes(data=True))
+        links = PersistentMap.from_items((link_key(u, v), dict(attrs)) for u, v, attrs in G.edges(data=True))
+    elif tracked and G.base is base and not G.changes()[2]:
+        dirty_nodes, dirty_links, _ = G.changes()
+        nodes, links = base.nodes, base.links
+        for n in dirty_nodes:
+            nodes = nodes.set(n, dict(G._node[n])) if n in G._node else nodes.delete(n)
+        for key in dirty_links:
+            u, v = key
+            links = links.set(key, dict(G._adj[u][v])) if G.has_edge(u, v) else links.delete(key)
+    else:
+        nodes, links = base.nodes, base.links
+        for n, attrs in G.nodes(data=True):
+            nodes = nodes.set(n, dict(attrs))
+        for n in [n for n in base.nodes if n not in G]:
+            nodes = nodes.delete(n)
+        for u, v, attrs in G.edges(data=True):
+            links = links.set(link_key(u, v), dict(attrs))
+        for key in [key for key in base.links if not G.has_edge(*key)]:
+            links = links.delete(key)
+
+    snapshot = TopologySnapshot(nodes, links, G.graph, label)
+    if tracked:
+        G.track_from(snapshot)
+    return snapshot
+
+
+def diff_snapshots(old: TopologySnapshot, new: TopologySnapshot) -> Dict:
+    """
+    Differences between two snapshots.
+
+    Runs in time proportional to the change when the snapshots share
+    history (e.g. successive snapshots of one network).
+
+    Returns:
+        Dictionary with 'added_nodes', 'removed_nodes', 'added_links',
+        'removed_links' (lists) and 'changed_nodes' / 'changed_links'
+        ({node or link: {attribute: (old, new)}})
+    """
+    result = {
+        'added_nodes': [], 'removed_nodes': [], 'changed_nodes': {},
+        'added_links': [], 'removed_links': [], 'changed_links': {},
+    }
+    for kind, old_map, new_map in (('nodes', old.nodes, new.nodes), ('links', old.links, new.links)):
+        for key, before, after in old_map.diff(new_map):
+            if before is _MISSING:
+                result[f'added_{kind}'].append(key)
+            elif after is _MISSING:
+                result[f'removed_{kind}'].append(key)
+            else:
+                result[f'changed_{kind}'][key] = _attr_changes(before, after)
+    return result
@@ -0,0 +1,352 @@
+"""
+Topology Store - compact binary persistence for mesh topologies.
+
+JSON is fine for a 10-router design, but a million-link topology spends
+most of its load time parsing text and creating Python objects. This module
+saves a topology as one binary file:
+
+    magic + header length | JSON header | array sections (64-byte aligned)
+
+- Node names are interned once (UTF-8 bytes + offsets); links refer to
+  nodes by integer id.
+- Links are stored in CSR form: each link once, grouped by its lower
+  endpoint id (indptr + indices arrays).
+- Node and link attributes are stored column by column: numbers as typed
+  arrays, strings interned into a table plus integer codes, anything else
+  as JSON strings (tuples and NumPy arrays are tagged, so they load back
+  as tuples and arrays, e.g. a 'pos' tuple stays a tuple).
+
+Opening a file memory-maps it, so it is nearly instant regardless of size;
+array pages are read from disk only when touched.
+
+Example:
+    builder.save("campus.mesh")
+    topo = open_topology("campus.mesh")        # instant, lazy
+    print(topo.num_nodes, topo.num_links)
+    latency = topo.link_column('weight')        # memory-mapped array
+    builder2 = CustomNetworkBuilder.load("campus.mesh")
+"""
+
+import json
+import os
+import tempfile
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from graph_arrays import CSRGraph, csr_from_edges
+
+MAGIC = b'AMESH\x00\x01\x00'  # format name + version 1
+ALIGN = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _encode_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """UTF-8 encode strings into (offsets, bytes) arrays."""
+    encoded = [v.encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def _decode_strings(offsets: np.ndarray, data: np.ndarray) -> List[str]:
+    raw = data.tobytes()
+    bounds = offsets.tolist()
+    return [raw[bounds[i]:bounds[i + 1]].decode('utf-8') for i in range(len(bounds) - 1)]
+
+
+def _to_json(value):
+    """JSON-ready copy of an attribute value; tuples and arrays are tagged."""
+    if isinstance(value, tuple):
+        return {'__tuple__': [_to_json(v) for v in value]}
+    if isinstance(value, np.ndarray):
+        return {'__ndarray__': _to_json(value.tolist()), 'dtype': value.dtype.str}
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _from_json(value):
+    """Inverse of _to_json: rebuild tagged tuples and arrays."""
+    if isinstance(value, list):
+        return [_from_json(v) for v in value]
+    if isinstance(value, dict):
+        if '__tuple__' in value:
+            return tuple(_from_json(v) for v in value['__tuple__'])
+        if '__ndarray__' in value:
+            return np.array(_from_json(value['__ndarray__']), dtype=np.dtype(value['dtype']))
+        return {k: _from_json(v) for k, v in value.items()}
+    return value
+
+
+def default_file_mode(path: str):
+    """
+    Give a file made by tempfile.mkstemp (always 0600) the permissions a
+    plain open() would have: 0666 minus the process umask.
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(path, 0o666 & ~umask)
+
+
+def _encode_column(values: list) -> Tuple[str, Dict[str, np.ndarray]]:
+    """
+    Encode one attribute column (None = attribute absent).
+
+    Returns:
+        Tuple of (kind, arrays) where kind is 'bool', 'int', 'float', 'str'
+        or 'json'
+    """
+    present = [v for v in values if v is not None]
+    arrays: Dict[str, np.ndarray] = {}
+    if len(present) < len(values):
+        arrays['mask'] = np.array([v is not None for v in values], dtype=np.uint8)
+
+    if all(isinstance(v, (bool, np.bool_)) for v in present):
+        kind = 'bool'
+        arrays['data'] = np.array([bool(v) if v is not None else False for v in values], dtype=np.uint8)
+    elif all(isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in present):
+        kind = 'int'
+        arrays['data'] = np.array([v if v is not None else 0 for v in values], dtype=np.int64)
+    elif all(isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool) for v in present):
+        kind = 'float'
+        arrays['data'] = np.array([v if v is not None else np.nan for v in values], dtype=np.float64)
+    else:
+        kind = 'str' if all(isinstance(v, str) for v in present) else 'json'
+        text = [v if kind == 'str' else json.dumps(_to_json(v)) for v in values]
+        table = sorted({t for t, v in zip(text, values) if v is not None})
+        code_of = {t: i for i, t in enumerate(table)}
+        arrays['codes'] = np.array([code_of[t] if v is not None else -1 for t, v in zip(text, values)],
+                                   dtype=np.int32)
+        arrays['table_offsets'], arrays['table_bytes'] = _encode_strings(table)
+    return kind, arrays
+
+
+def save_topology(G: nx.Graph, path: str):
+    """
+    Write a graph to the binary topology format (atomically).
+
+    Args:
+        G: Undirected network
+        path: Output file path
+    """
+    nodes = list(G.nodes())
+    index = {u: i for i, u in enumerate(nodes)}
+    if all(isinstance(u, str) for u in nodes):
+        name_kind = 'str'
+    elif all(isinstance(u, (int, np.integer)) and not isinstance(u, bool) for u in nodes):
+        name_kind = 'int'
+    else:
+        name_kind = 'json'
+
+    m = G.number_of_edges()
+    lo = np.empty(m, dtype=np.int64)
+    hi = np.empty(m, dtype=np.int64)
+    edge_data = []
+    for k, (u, v, data) in enumerate(G.edges(data=True)):
+        i, j = index[u], index[v]
+        lo[k], hi[k] = min(i, j), max(i, j)
+        edge_data.append(data)
+    order = np.lexsort((hi, lo))
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(lo, minlength=len(nodes)), out=indptr[1:])
+
+    sections: Dict[str, np.ndarray] = {'indptr': indptr, 'indices': hi[order]}
+    if name_kind == 'int':
+        sections['names'] = np.array(nodes, dtype=np.int64)
+    else:
+        text = nodes if name_kind == 'str' else [json.dumps(u) for u in nodes]
+        sections['name_offsets'], sections['name_bytes'] = _encode_strings(text)
+
+    columns = {'node': {}, 'link': {}}
+    for scope, records in (('node', [G.nodes[u] for u in nodes]),
+                           ('link', [edge_data[k] for k in order.tolist()])):
+        keys = sorted({key for attrs in records for key in attrs}, key=str)
+        for key in keys:
+            kind, arrays = _encode_column([attrs.get(key) for attrs in records])
+            columns[scope][key] = kind
+            for part, array in arrays.items():
+                sections[f"{scope}:{key}:{part}"] = array
+
+    layout = {}
+    offset = 0
+    for name, array in sections.items():
+        array = np.ascontiguousarray(array)
+        sections[name] = array
+        layout[name] = {'offset': offset, 'dtype': array.dtype.str, 'length': int(array.size)}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({
+        'num_nodes': len(nodes),
+        'num_links': m,
+        'name_kind': name_kind,
+        'graph': G.graph,
+        'columns': columns,
+        'sections': layout,
+    }, default=str).encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(np.uint64(len(header)).tobytes())
+            f.write(header)
+            data_start = _align(len(MAGIC) + 8 + len(header))
+            f.write(b'\0' * (data_start - f.tell()))
+            for name, array in sections.items():
+                f.write(b'\0' * (data_start + layout[name]['offset'] - f.tell()))
+                f.write(array.tobytes())
+        default_file_mode(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class TopologyFile:
+    """
+    Read-only, memory-mapped view of a saved topology.
+
+    Arrays are slices of the mapped file; nothing is read until used.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(self._map[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not an AutoMesh topology file")
+        header_len = int(self._map[len(MAGIC):len(MAGIC) + 8].view(np.uint64)[0])
+        start = len(MAGIC) + 8
+        self.header = json.loads(bytes(self._map[start:start + header_len]).decode('utf-8'))
+        self._data_start = _align(start + header_len)
+        self._names: Optional[List[Hashable]] = None
+
+    @property
+    def num_nodes(self) -> int:
+        return self.header['num_nodes']
+
+    @property
+    def num_links(self) -> int:
+        return self.header['num_links']
+
+    def section(self, name: str) -> np.ndarray:
+        """Memory-mapped array stored under `name`."""
+        info = self.header['sections'][name]
+        dtype = np.dtype(info['dtype'])
+        start = self._data_start + info['offset']
+        return self._map[start:start + info['length'] * dtype.itemsize].view(dtype)
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self.section('indptr')
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self.section('indices')
+
+    @property
+    def node_names(self) -> List[Hashable]:
+        """Node names (decoded on first access)."""
+        if self._names is None:
+            kind = self.header['name_kind']
+            if kind == 'int':
+                self._names = self.section('names').tolist()
+            else:
+                text = _decode_strings(self.section('name_offsets'), self.section('name_bytes'))
+                self._names = text if kind == 'str' else [_json_key(json.loads(t)) for t in text]
+        return self._names
+
+    def link_endpoints(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Node ids of both endpoints of every link (in storage order)."""
+        src = np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.indptr))
+        return src, np.asarray(self.indices)
+
+    def _column(self, scope: str, key: str) -> Tuple[str, np.ndarray, Optional[np.ndarray]]:
+        kind = self.header['columns'][scope][key]
+        prefix = f"{scope}:{key}:"
+        mask = self.section(prefix + 'mask') if prefix + 'mask' in self.header['sections'] else None
+        return kind, prefix, mask
+
+    def _values(self, scope: str, key: str) -> list:
+        """Python values of a column (None where the attribute is absent)."""
+        kind, prefix, mask = self._column(scope, key)
+        if kind in ('str', 'json'):
+            table = _decode_strings(self.section(prefix + 'table_offsets'), self.section(prefix + 'table_bytes'))
+            if kind == 'json':
+                table = [_from_json(json.loads(t)) for t in table]
+            return [table[c] if c >= 0 else None for c in self.section(prefix + 'codes').tolist()]
+        data = self.section(prefix + 'data')
+        values = data.astype(bool).tolist() if kind == 'bool' else data.tolist()
+        if mask is not None:
+            values = [v if present else None for v, present in zip(values, mask.tolist())]
+        return values
+
+    def link_column(self, key: str) -> np.ndarray:
+        """
+        Link attribute as an array in storage order. Numeric columns are
+        memory-mapped (missing values are NaN for floats); string/JSON
+        columns are decoded into an object array.
+        """
+        kind, prefix, mask = self._column('link', key)
+        if kind in ('int', 'float', 'bool'):
+            return self.section(prefix + 'data')
+        return np.array(self._values('link', key), dtype=object)
+
+    def node_column(self, key: str) -> np.ndarray:
+        """Node attribute as an array in node-id order (see link_column)."""
+        kind, prefix, mask = self._column('node', key)
+        if kind in ('int', 'float', 'bool'):
+            return self.section(prefix + 'data')
+        return np.array(self._values('node', key), dtype=object)
+
+    def to_csr(self, weight: str = 'weight') -> CSRGraph:
+        """Symmetric CSR arrays for the analysis tools (weights = latency column)."""
+        src, dst = self.link_endpoints()
+        weights = None
+        if weight in self.header['columns']['link']:
+            weights = np.nan_to_num(np.asarray(self.link_column(weight), dtype=np.float64), nan=1.0)
+        return csr_from_edges(self.num_nodes, src, dst, weights, nodes=self.node_names)
+
+    def iter_links(self) -> Iterator[Tuple[Hashable, Hashable, Dict]]:
+        """Yield (u, v, attributes) for every link."""
+        names = self.node_names
+        src, dst = self.link_endpoints()
+        keys = list(self.header['columns']['link'])
+        columns = [self._values('link', key) for key in keys]
+        for k, (i, j) in enumerate(zip(src.tolist(), dst.tolist())):
+            attrs = {key: column[k] for key, column in zip(keys, columns) if column[k] is not None}
+            yield names[i], names[j], attrs
+
+    def to_networkx(self, create_using=nx.Graph) -> nx.Graph:
+        """Materialize the topology as a graph (nx.Graph unless create_using is given)."""
+        G = create_using()
+        G.graph.update(self.header['graph'])
+        names = self.node_names
+        keys = list(self.header['columns']['node'])
+        columns = [self._values('node', key) for key in keys]
+        G.add_nodes_from(
+            (name, {key: column[i] for key, column in zip(keys, columns) if column[i] is not None})
+            for i, name in enumerate(names)
+        )
+        G.add_edges_from(self.iter_links())
+        return G
+
+
+def _json_key(value):
+    """JSON lists come back as lists; node names must be hashable."""
+    return tuple(_json_key(v) for v in value) if isinstance(value, list) else value
+
+
+def open_topology(path: str) -> TopologyFile:
+    """Memory-map a saved topology (nearly instant, reads lazily)."""
+    return TopologyFile(path)
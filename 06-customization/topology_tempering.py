@@ -0,0 +1,194 @@
+"""
+Topology Tempering - parallel tempering (replica exchange) for topology annealing.
+
+A single annealing chain (topology_annealing.TopologyAnnealer) uses one core
+and can get stuck in a local optimum once it has cooled down. Parallel
+tempering runs one chain per temperature, each in its own process:
+
+- Hot chains wander freely, cold chains refine what they are given.
+- Every `exchange_interval` moves, neighbouring temperatures try to swap
+  states with the replica-exchange rule
+      accept with probability min(1, exp((1/T_i - 1/T_j) * (E_i - E_j)))
+  so good topologies found by hot chains migrate down the ladder.
+
+Chains never send whole graphs. After each round a worker reports which
+candidate links it flipped since the last report (an int32 index array);
+the coordinator replays those diffs on its own bit masks, and a swap sends
+each of the two workers only the links on which their states differ.
+
+Swap-acceptance rates per temperature pair are reported to tune the ladder:
+rates near 0 mean neighbouring temperatures are too far apart, rates near
+1 mean replicas are wasted.
+
+Example:
+    result = parallel_tempering(builder.G, replicas=8, rounds=200, seed=1)
+    print(result['best_cost'], result['swap_rates'])
+"""
+
+import math
+import os
+import time
+from multiprocessing import Pipe, Process
+from typing import Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+
+from topology_annealing import TopologyAnnealer, TopologyState
+
+
+def temperature_ladder(t_min: float, t_max: float, replicas: int) -> List[float]:
+    """Geometrically spaced temperatures from t_min to t_max."""
+    if replicas == 1:
+        return [t_min]
+    return [float(t) for t in np.geomspace(t_min, t_max, replicas)]
+
+
+def _replica_worker(conn, G: nx.Graph, temperature: float, seed, options: Dict):
+    """One chain at a fixed temperature, driven by commands over a pipe."""
+    annealer = TopologyAnnealer(G, seed=seed, **options)
+    state = annealer.state
+    reported = state.present.copy()
+    best_cost = state.cost
+    while True:
+        command, argument = conn.recv()
+        if command == 'run':
+            accepted, improved = 0, None
+            for _ in range(argument):
+                moved = annealer.step(temperature)
+                if moved is None:
+                    break  # no legal move left, further proposals would only spin
+                if moved:
+                    accepted += 1
+                    if state.cost < best_cost:
+                        best_cost, improved = state.cost, state.present.copy()
+            changed = np.flatnonzero(state.present != reported).astype(np.int32)
+            reported = state.present.copy()
+            # The round's best, as a diff against the state just reported
+            best = None
+            if improved is not None:
+                best = (best_cost, np.flatnonzero(improved != reported).astype(np.int32))
+            conn.send((state.cost, changed, best, accepted, (annealer.cache.hits, annealer.cache.misses)))
+        elif command == 'toggle':
+            state.toggle_links(argument)
+            reported = state.present.copy()
+            conn.send(state.cost)
+        else:
+            conn.close()
+            return
+
+
+def parallel_tempering(G: nx.Graph, replicas: Optional[int] = None, rounds: int = 100,
+                       exchange_interval: int = 50, t_min: Optional[float] = None,
+                       t_max: Optional[float] = None, seed: Optional[int] = None,
+                       verbose: bool = True, **options) -> Dict:
+    """
+    Optimize a topology with one annealing chain per temperature, in parallel.
+
+    Args:
+        G: Starting network (not modified)
+        replicas: Number of chains/processes (default: all cores)
+        rounds: Number of exchange rounds
+        exchange_interval: Moves per chain between swap attempts
+        t_min, t_max: Coldest/hottest temperature (default: estimated from
+                      sample moves, t_max accepts ~80% of worsening moves and
+                      t_min = t_max / 100)
+        seed: Random seed (each chain gets its own SeedSequence child)
+        verbose: Print progress
+        **options: TopologyAnnealer options (cache_size, candidate_links,
+                   link_cost, min_degree, degree_penalty, bridge_penalty, ...)
+
+    Returns:
+        Dictionary with 'initial_cost', 'best_cost', 'best_average_latency',
+        'links' (best link list), 'temperatures', 'swap_rates' (per adjacent
+        pair, coldest first), 'swap_attempts', 'move_acceptance' (per
+        replica), 'iterations' (moves per chain), 'cache_hit_rate' (cost
+        cache hits over all chains) and 'elapsed'
+    """
+    started = time.perf_counter()
+    replicas = replicas or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).spawn(replicas + 1)
+    rng = np.random.default_rng(seeds[0])
+
+    # The coordinator keeps a state of its own to decode results
+    probe = TopologyAnnealer(G, seed=seeds[0], **options)
+    if t_max is None:
+        t_max = probe.initial_temperature()
+    if t_min is None:
+        t_min = t_max / 100
+    temperatures = temperature_ladder(t_min, t_max, replicas)
+    state: TopologyState = probe.state
+    start_present = state.present.copy()
+    initial_cost = state.cost
+
+    pipes, workers = [], []
+    for k in range(replicas):
+        parent, child = Pipe()
+        worker = Process(target=_replica_worker, args=(child, G, temperatures[k], seeds[k + 1], options),
+                         daemon=True)
+        worker.start()
+        child.close()
+        pipes.append(parent)
+        workers.append(worker)
+
+    present = [start_present.copy() for _ in range(replicas)]
+    costs = [initial_cost] * replicas
+    best_cost, best_present = initial_cost, start_present.copy()
+    attempts = np.zeros(max(replicas - 1, 0), dtype=np.int64)
+    swaps = np.zeros(max(replicas - 1, 0), dtype=np.int64)
+    accepted = np.zeros(replicas, dtype=np.int64)
+    cache = [(0, 0)] * replicas
+
+    try:
+        for round_index in range(rounds):
+            for pipe in pipes:
+                pipe.send(('run', exchange_interval))
+            for k, pipe in enumerate(pipes):
+                costs[k], changed, best, moves, cache[k] = pipe.recv()
+                present[k][changed] ^= True
+                accepted[k] += moves
+                if best is not None and best[0] < best_cost:
+                    best_cost = best[0]
+                    best_present = present[k].copy()
+                    best_present[best[1]] ^= True
+
+            # Swap attempts between neighbours, alternating even/odd pairs
+            for k in range(round_index % 2, replicas - 1, 2):
+                attempts[k] += 1
+                exponent = (1 / temperatures[k] - 1 / temperatures[k + 1]) * (costs[k] - costs[k + 1])
+                if exponent >= 0 or rng.random() < math.exp(exponent):
+                    swaps[k] += 1
+                    diff = np.flatnonzero(present[k] != present[k + 1]).astype(np.int32)
+                    pipes[k].send(('toggle', diff))
+                    pipes[k + 1].send(('toggle', diff))
+                    costs[k], costs[k + 1] = pipes[k].recv(), pipes[k + 1].recv()
+                    present[k], present[k + 1] = present[k + 1], present[k]
+
+            if verbose and round_index % 10 == 0:
+                print(f"   Round {round_index}: coldest = {costs[0]:.2f}, best = {best_cost:.2f}")
+    finally:
+        # A dead worker must not hide the exception that got us here
+        for pipe in pipes:
+            try:
+                pipe.send(('stop', None))
+            except OSError:
+                pass
+        for worker in workers:
+            worker.join()
+
+    state.toggle_links(np.flatnonzero(best_present != state.present))
+    iterations = rounds * exchange_interval
+    hits, misses = (sum(counts) for counts in zip(*cache))
+    return {
+        'initial_cost': initial_cost,
+        'best_cost': best_cost,
+        'best_average_latency': state.average_latency(),
+        'links': state.link_list(),
+        'temperatures': temperatures,
+        'swap_rates': (swaps / np.maximum(attempts, 1)).tolist(),
+        'swap_attempts': attempts.tolist(),
+        'move_acceptance': (accepted / max(iterations, 1)).tolist(),
+        'iterations': iterations,
+        'cache_hit_rate': hits / max(hits + misses, 1),
+        'elapsed': time.perf_counter() - started,
+    }
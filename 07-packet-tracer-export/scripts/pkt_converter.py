@@ -15,7 +15,8 @@ import zipfile
 import json
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Optional, Sequence, Tuple
+from xml.sax.saxutils import quoteattr
 import os
 from datetime import datetime
 import uuid
@@ -151,6 +152,11 @@ class PacketTracerConverter:
         # Track port usage for each device
         port_counters = {f"device_{i}": 0 for i in range(len(nodes))}
         
+        # Name -> device index (first node with that name wins)
+        node_index = {}
+        for j, n in enumerate(nodes):
+            node_index.setdefault(n['name'], j)
+        
         # Add each link as a connection
         for i, link in enumerate(links):
             conn = ET.SubElement(connections, "connection")
@@ -159,9 +165,9 @@ class PacketTracerConverter:
             
             # Find device IDs
             try:
-                from_idx = next(j for j, n in enumerate(nodes) if n['name'] == link['from'])
-                to_idx = next(j for j, n in enumerate(nodes) if n['name'] == link['to'])
-            except StopIteration:
+                from_idx = node_index[link['from']]
+                to_idx = node_index[link['to']]
+            except KeyError:
                 continue
             
             from_device_id = f"device_{from_idx}"
@@ -214,14 +220,15 @@ class PacketTracerConverter:
     
     def _calculate_positions(self, nodes: List[Dict]) -> List[Dict]:
         """Calculate positions for devices in Packet Tracer workspace."""
-        positions = []
-        num_nodes = len(nodes)
+        return [self._position(i, len(nodes)) for i in range(len(nodes))]
+    
+    @staticmethod
+    def _position(i: int, num_nodes: int) -> Dict:
+        """Position of device i out of num_nodes (grid for <= 4 devices, else a circle)."""
+        import math
         
         if num_nodes == 1:
-            return [{'x': 960, 'y': 540}]  # Center
-        
-        # Arrange in a grid or circle
-        import math
+            return {'x': 960, 'y': 540}  # Center
         
         if num_nodes <= 4:
             # Small grid
@@ -231,53 +238,121 @@ class PacketTracerConverter:
             spacing_y = 300
             start_x = 960 - (cols - 1) * spacing_x / 2
             start_y = 540 - (rows - 1) * spacing_y / 2
-            
-            for i in range(num_nodes):
-                col = i % cols
-                row = i // cols
-                positions.append({
-                    'x': int(start_x + col * spacing_x),
-                    'y': int(start_y + row * spacing_y)
-                })
-        else:
-            # Circular arrangement
-            radius = min(400, 200 + num_nodes * 20)
-            center_x, center_y = 960, 540
-            
-            for i in range(num_nodes):
-                angle = 2 * math.pi * i / num_nodes
-                x = center_x + radius * math.cos(angle)
-                y = center_y + radius * math.sin(angle)
-                positions.append({
-                    'x': int(x),
-                    'y': int(y)
-                })
+            return {
+                'x': int(start_x + (i % cols) * spacing_x),
+                'y': int(start_y + (i // cols) * spacing_y)
+            }
         
-        return positions
+        # Circular arrangement
+        radius = min(400, 200 + num_nodes * 20)
+        center_x, center_y = 960, 540
+        angle = 2 * math.pi * i / num_nodes
+        return {
+            'x': int(center_x + radius * math.cos(angle)),
+            'y': int(center_y + radius * math.sin(angle))
+        }
     
     def _generate_device_configs(self, nodes: List[Dict], links: List[Dict], 
                                 project_files_dir: str):
         """Generate individual device configuration files."""
         for i, node in enumerate(nodes):
             config_file = os.path.join(project_files_dir, f"device_{i}.cfg")
-            
-            # Generate basic Cisco IOS configuration
-            config_lines = [
-                f"hostname {node['name']}",
-                "!",
-                "interface FastEthernet0/0",
-                " no shutdown",
-                "!",
-                "interface FastEthernet0/1",
-                " no shutdown",
-                "!",
-                "ip routing",
-                "!",
-                "end"
-            ]
-            
             with open(config_file, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(config_lines))
+                f.write(self._device_config(node['name']))
+    
+    @staticmethod
+    def _device_config(name: str) -> str:
+        """Basic Cisco IOS configuration for a router."""
+        config_lines = [
+            f"hostname {name}",
+            "!",
+            "interface FastEthernet0/0",
+            " no shutdown",
+            "!",
+            "interface FastEthernet0/1",
+            " no shutdown",
+            "!",
+            "ip routing",
+            "!",
+            "end"
+        ]
+        return '\n'.join(config_lines)
+    
+    def convert_stream_to_pkt(self, node_names: Sequence[str],
+                              links: Iterable[Tuple[int, int, float, Optional[float]]],
+                              output_path: str, network_name: str = "AutoMesh Network"):
+        """
+        Convert a topology too large to hold in memory to .pkt format.
+        
+        Unlike convert_network_to_pkt(), nothing is built up in memory: the
+        XML and device configs are written straight into the ZIP archive as
+        links arrive. Only a per-device port counter is kept.
+        
+        Args:
+            node_names: Sequence of device names, indexed by node id
+                        (only len() and indexing are used)
+            links: Iterable of (from_id, to_id, latency, bandwidth) tuples;
+                   bandwidth may be None (defaults to 100)
+            output_path: Path where the .pkt file will be saved
+            network_name: Name of the network project
+        
+        Returns:
+            Path to the created .pkt file
+        
+        Example:
+            converter.convert_stream_to_pkt(names, link_iter, "big.pkt")
+        """
+        import numpy as np
+        
+        num_nodes = len(node_names)
+        if num_nodes == 0:
+            raise ValueError("Network must have at least one node")
+        port_counters = np.zeros(num_nodes, dtype=np.int32)
+        
+        def element(tag: str, attrs: Dict, properties: List[Tuple[str, str]], level: int) -> bytes:
+            elem = ET.Element(tag, attrs)
+            props = ET.SubElement(elem, "properties")
+            for name, value in properties:
+                ET.SubElement(props, "property", {"name": name, "value": value})
+            ET.indent(elem, space="  ", level=level)
+            xml = ET.tostring(elem, encoding='utf-8').replace(b" />", b"/>")  # minidom style
+            return b"  " * level + xml + b"\n"
+        
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED, allowZip64=True) as zipf:
+            with zipf.open("project.xml", 'w', force_zip64=True) as f:
+                f.write(b'<?xml version="1.0" encoding="utf-8"?>\n')
+                f.write(f'<project xmlns="http://www.cisco.com/PacketTracer" version="1.0" '
+                        f'name={quoteattr(network_name)}>\n'.encode('utf-8'))
+                f.write(b'  <workspace width="1920" height="1080" gridSize="25" '
+                        b'snapToGrid="true" showGrid="true"/>\n')
+                
+                f.write(b"  <devices>\n")
+                for i in range(num_nodes):
+                    name = str(node_names[i])
+                    pos = self._position(i, num_nodes)
+                    attrs = {"id": f"device_{i}", "type": "router", "name": name,
+                             "x": str(pos['x']), "y": str(pos['y']), "z": "0"}
+                    f.write(element("device", attrs, [("hostname", name), ("model", "1841"),
+                                                      ("state", "on")], 2))
+                f.write(b"  </devices>\n")
+                
+                f.write(b"  <connections>\n")
+                for i, (u, v, latency, bandwidth) in enumerate(links):
+                    attrs = {"id": f"conn_{i}", "fromDevice": f"device_{u}", "toDevice": f"device_{v}",
+                             "fromPort": f"FastEthernet0/{port_counters[u]}",
+                             "toPort": f"FastEthernet0/{port_counters[v]}"}
+                    port_counters[u] += 1
+                    port_counters[v] += 1
+                    bandwidth = 100 if bandwidth is None or bandwidth is False else bandwidth
+                    f.write(element("connection", attrs, [("bandwidth", str(bandwidth)),
+                                                          ("delay", str(latency)),
+                                                          ("type", "copper")], 2))
+                f.write(b"  </connections>\n</project>\n")
+            
+            for i in range(num_nodes):
+                zipf.writestr(f"project_files/device_{i}.cfg", self._device_config(str(node_names[i])))
+        
+        return output_path
 
 
 def convert_from_json(json_path: str, output_path: str, create_guide: bool = True):